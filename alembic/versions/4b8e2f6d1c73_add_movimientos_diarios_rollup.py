@@ -0,0 +1,38 @@
+"""Add movimientos_diarios rollup table
+
+Revision ID: 4b8e2f6d1c73
+Revises: 9d6f0b3a8e21
+Create Date: 2026-10-18 18:47:26.093551
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8e2f6d1c73'
+down_revision: Union[str, None] = '9d6f0b3a8e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('movimientos_diarios',
+    sa.Column('dia', sa.Date(), nullable=False),
+    sa.Column('producto_id', sa.Integer(), nullable=False),
+    sa.Column('tipo_movimiento', sa.String(length=50), nullable=False),
+    sa.Column('unidades', sa.Integer(), nullable=False),
+    sa.Column('movimientos', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['producto_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('dia', 'producto_id', 'tipo_movimiento')
+    )
+    op.create_index('ix_movimientos_diarios_producto_id_dia', 'movimientos_diarios', ['producto_id', 'dia'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_movimientos_diarios_producto_id_dia', table_name='movimientos_diarios')
+    op.drop_table('movimientos_diarios')
@@ -0,0 +1,35 @@
+"""Add stock_ledger_balances table for stock reconciliation
+
+Revision ID: 7a41c9d2e5b3
+Revises: 2f3568ba181c
+Create Date: 2026-10-18 09:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a41c9d2e5b3'
+down_revision: Union[str, None] = '2f3568ba181c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stock_ledger_balances',
+    sa.Column('producto_id', sa.Integer(), nullable=False),
+    sa.Column('saldo', sa.Integer(), nullable=False),
+    sa.Column('ultimo_movimiento_id', sa.Integer(), nullable=False),
+    sa.Column('actualizado_en', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['producto_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('producto_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stock_ledger_balances')
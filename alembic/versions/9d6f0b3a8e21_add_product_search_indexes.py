@@ -0,0 +1,77 @@
+"""Add product search indexes (tsvector / pg_trgm on PostgreSQL, FTS5 on SQLite)
+
+Revision ID: 9d6f0b3a8e21
+Revises: e5b27d9c4f10
+Create Date: 2026-10-18 16:21:09.554380
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d6f0b3a8e21'
+down_revision: Union[str, None] = 'e5b27d9c4f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(codigo_sku, '') || ' ' || coalesce(numero_serie, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_products_search_document ON products USING gin (({SEARCH_DOCUMENT}))")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING gin (name gin_trgm_ops)")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_products_codigo_sku_trgm ON products USING gin (codigo_sku gin_trgm_ops)")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_products_numero_serie_trgm ON products USING gin (numero_serie gin_trgm_ops)")
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+            "name, description, codigo_sku, numero_serie, "
+            "content='products', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+            "INSERT INTO products_fts(rowid, name, description, codigo_sku, numero_serie) "
+            "VALUES (new.id, new.name, new.description, new.codigo_sku, new.numero_serie); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+            "INSERT INTO products_fts(products_fts, rowid, name, description, codigo_sku, numero_serie) "
+            "VALUES ('delete', old.id, old.name, old.description, old.codigo_sku, old.numero_serie); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description, codigo_sku, numero_serie ON products BEGIN "
+            "INSERT INTO products_fts(products_fts, rowid, name, description, codigo_sku, numero_serie) "
+            "VALUES ('delete', old.id, old.name, old.description, old.codigo_sku, old.numero_serie); "
+            "INSERT INTO products_fts(rowid, name, description, codigo_sku, numero_serie) "
+            "VALUES (new.id, new.name, new.description, new.codigo_sku, new.numero_serie); END"
+        )
+        # Indexar los productos existentes
+        op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_products_numero_serie_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_products_codigo_sku_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_products_name_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_products_search_document")
+        # La extensión pg_trgm se mantiene: puede usarla otro esquema
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS products_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ai")
+        op.execute("DROP TABLE IF EXISTS products_fts")
@@ -0,0 +1,56 @@
+"""Add foreign key and access path indexes (products.category_id / proveedor_id, movement history)
+
+Revision ID: a6c4e9f27b18
+Revises: 4b8e2f6d1c73
+Create Date: 2026-10-18 21:05:37.218604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c4e9f27b18'
+down_revision: Union[str, None] = '4b8e2f6d1c73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (producto_id, fecha, id) sustituye a (producto_id, fecha): el historial ordena por
+# fecha DESC, id DESC (recorrido inverso del índice, sin ordenación) y el cursor compara
+# (fecha, id); el stock a una fecha y la exportación siguen usando el prefijo (producto_id, fecha).
+NEW_INDEXES = (
+    ('ix_products_category_id', 'products', ['category_id']),
+    ('ix_products_proveedor_id', 'products', ['proveedor_id']),
+    ('ix_movimientos_inventario_producto_id_fecha_id', 'movimientos_inventario', ['producto_id', 'fecha', 'id']),
+)
+REPLACED_INDEX = ('ix_movimientos_inventario_producto_id_fecha', 'movimientos_inventario', ['producto_id', 'fecha'])
+
+
+def _concurrently() -> bool:
+    # En PostgreSQL, CREATE / DROP INDEX CONCURRENTLY no bloquea las escrituras en la tabla,
+    # pero no puede ejecutarse dentro de una transacción (ver autocommit_block).
+    # Si falla a medias deja un índice INVALID: borrarlo (DROP INDEX) y repetir la migración.
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    concurrently = _concurrently()
+    with op.get_context().autocommit_block():
+        for name, table, columns in NEW_INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=concurrently)
+        name, table, _ = REPLACED_INDEX
+        op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=concurrently)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    concurrently = _concurrently()
+    with op.get_context().autocommit_block():
+        name, table, columns = REPLACED_INDEX
+        op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=concurrently)
+        for name, table, _ in reversed(NEW_INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=concurrently)
@@ -0,0 +1,36 @@
+"""Add stock_snapshots table and movimientos (producto_id, fecha) index
+
+Revision ID: c3e8f1a6b2d4
+Revises: 7a41c9d2e5b3
+Create Date: 2026-10-18 11:40:05.118264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8f1a6b2d4'
+down_revision: Union[str, None] = '7a41c9d2e5b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stock_snapshots',
+    sa.Column('producto_id', sa.Integer(), nullable=False),
+    sa.Column('fecha_corte', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('stock', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['producto_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('producto_id', 'fecha_corte')
+    )
+    op.create_index('ix_movimientos_inventario_producto_id_fecha', 'movimientos_inventario', ['producto_id', 'fecha'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_movimientos_inventario_producto_id_fecha', table_name='movimientos_inventario')
+    op.drop_table('stock_snapshots')
@@ -0,0 +1,116 @@
+"""Partition movimientos_inventario by month on PostgreSQL and add movimientos_archivados
+
+Revision ID: d2f7a1c8e945
+Revises: a6c4e9f27b18
+Create Date: 2026-10-18 23:12:48.530417
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f7a1c8e945'
+down_revision: Union[str, None] = 'a6c4e9f27b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLE = 'movimientos_inventario'
+OLD_TABLE = 'movimientos_inventario_anterior'
+SEQUENCE = 'movimientos_inventario_id_seq'
+COLUMNS = 'id, producto_id, tipo_movimiento, cantidad, fecha, responsable_id, notas'
+INDEXES = (
+    ('ix_movimientos_inventario_id', ['id']),
+    ('ix_movimientos_inventario_producto_id_fecha_id', ['producto_id', 'fecha', 'id']),
+)
+# Particiones creadas por adelantado (después las mantiene mantener_movimientos.py)
+MONTHS_AHEAD = 3
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _columns() -> list:
+    return [
+        sa.Column('id', sa.Integer(), server_default=sa.text(f"nextval('{SEQUENCE}'::regclass)"), autoincrement=False, nullable=False),
+        sa.Column('producto_id', sa.Integer(), nullable=False),
+        sa.Column('tipo_movimiento', sa.String(length=50), nullable=False),
+        sa.Column('cantidad', sa.Integer(), nullable=False),
+        sa.Column('fecha', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('responsable_id', sa.Integer(), nullable=True),
+        sa.Column('notas', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['producto_id'], ['products.id']),
+        sa.ForeignKeyConstraint(['responsable_id'], ['users.id']),
+    ]
+
+
+def _set_aside_table(table: str) -> None:
+    # La tabla actual pasa a OLD_TABLE sin sus índices (los nombres se reutilizan) y la
+    # secuencia de los ids se desvincula para que sobreviva al borrarla.
+    op.rename_table(table, OLD_TABLE)
+    op.execute(f'ALTER TABLE {OLD_TABLE} RENAME CONSTRAINT {TABLE}_pkey TO {OLD_TABLE}_pkey')
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name=OLD_TABLE, if_exists=True)
+    op.execute(f'ALTER SEQUENCE {SEQUENCE} OWNED BY NONE')
+
+
+def _move_rows_and_drop_old_table() -> None:
+    for name, columns in INDEXES:
+        op.create_index(name, TABLE, columns, unique=False)
+    op.execute(f'INSERT INTO {TABLE} ({COLUMNS}) SELECT {COLUMNS} FROM {OLD_TABLE}')
+    op.execute(f'ALTER SEQUENCE {SEQUENCE} OWNED BY {TABLE}.id')
+    op.drop_table(OLD_TABLE)
+    op.execute(f'ANALYZE {TABLE}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('movimientos_archivados',
+    sa.Column('mes', sa.Date(), nullable=False),
+    sa.Column('fecha_corte', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('filas', sa.Integer(), nullable=False),
+    sa.Column('archivo', sa.String(length=500), nullable=False),
+    sa.Column('archivado_en', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False), # Vale también en SQLite
+    sa.PrimaryKeyConstraint('mes', 'fecha_corte')
+    )
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # Particionado por rango mensual de fecha. La clave primaria de una tabla particionada
+    # debe incluir la columna de partición: (id, fecha). Reescribe la tabla entera con un
+    # bloqueo exclusivo: en bases de datos grandes, aplicar en una ventana de mantenimiento.
+    first_month = op.get_bind().execute(sa.text(f"SELECT min(date_trunc('month', fecha AT TIME ZONE 'UTC'))::date FROM {TABLE}")).scalar()
+    today = datetime.now(timezone.utc).date()
+    last_month = date(today.year, today.month, 1)
+    for _ in range(MONTHS_AHEAD):
+        last_month = _next_month(last_month)
+
+    _set_aside_table(TABLE)
+    op.create_table(TABLE, *_columns(), sa.PrimaryKeyConstraint('id', 'fecha', name=f'{TABLE}_pkey'),
+                    postgresql_partition_by='RANGE (fecha)')
+    # DEFAULT: recoge las fechas sin partición (no se rechazan inserciones si falta la del mes)
+    op.execute(f'CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT')
+    month = min(first_month or last_month, date(today.year, today.month, 1))
+    while month <= last_month:
+        op.execute(
+            f"CREATE TABLE {TABLE}_p{month:%Y_%m} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{_next_month(month).isoformat()} 00:00:00+00')"
+        )
+        month = _next_month(month)
+    _move_rows_and_drop_old_table()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # Vuelve a una tabla sin particionar (borra las particiones con la tabla anterior).
+        # Los movimientos ya archivados siguen en sus ficheros: no se restauran.
+        _set_aside_table(TABLE)
+        op.create_table(TABLE, *_columns(), sa.PrimaryKeyConstraint('id', name=f'{TABLE}_pkey'))
+        _move_rows_and_drop_old_table()
+    op.drop_table('movimientos_archivados')
@@ -0,0 +1,40 @@
+"""Add partial indexes for low-stock products
+
+Revision ID: e5b27d9c4f10
+Revises: c3e8f1a6b2d4
+Create Date: 2026-10-18 14:05:52.730914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b27d9c4f10'
+down_revision: Union[str, None] = 'c3e8f1a6b2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Índices parciales: solo productos con stock_actual <= stock_minimo
+    op.create_index(
+        'ix_products_low_stock_deficit', 'products',
+        [sa.text('(stock_minimo - stock_actual) DESC'), 'id'], unique=False,
+        postgresql_where=sa.text('stock_actual <= stock_minimo'),
+        sqlite_where=sa.text('stock_actual <= stock_minimo'),
+    )
+    op.create_index(
+        'ix_products_low_stock_category', 'products', ['category_id'], unique=False,
+        postgresql_where=sa.text('stock_actual <= stock_minimo'),
+        sqlite_where=sa.text('stock_actual <= stock_minimo'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_low_stock_category', table_name='products')
+    op.drop_index('ix_products_low_stock_deficit', table_name='products')
@@ -0,0 +1,66 @@
+"""Seed an opening balance movement for products whose stock is not backed by movements
+
+Revision ID: f4a9c2d7b631
+Revises: d2f7a1c8e945
+Create Date: 2026-10-19 09:41:05.318270
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a9c2d7b631'
+down_revision: Union[str, None] = 'd2f7a1c8e945'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Hasta esta versión, el alta de productos con stock, la importación y la edición de
+# stock_actual no registraban movimiento: la reconciliación lo veía como drift y --fix
+# borraba ese stock. Desde ahora esas escrituras registran su movimiento, y los productos
+# existentes reciben un movimiento (fecha de la migración) por la diferencia entre
+# stock_actual y la suma de sus movimientos: SALDO_APERTURA si falta stock por respaldar y
+# AJUSTE_CONTEO_MENOS si sobra (p. ej. un PUT que bajó stock_actual sin movimiento), siempre
+# con cantidad positiva como el resto de movimientos. Un drift real previo queda absorbido en
+# ese saldo: si se quiere revisar, ejecutar reconcile_stock.py --full antes de migrar.
+# El stock a una fecha anterior a la migración no incluye el saldo.
+TIPOS_ENTRADA = (
+    'ENTRADA', 'ENTRADA_PROVEEDOR', 'AJUSTE_POSITIVO', 'AJUSTE_INICIAL',
+    'AJUSTE_CONTEO_MAS', 'DEVOLUCION', 'DEVOLUCION_CLIENTE', 'SALDO_APERTURA',
+)
+TIPOS_SALIDA = ('SALIDA', 'SALIDA_VENTA', 'AJUSTE_NEGATIVO', 'AJUSTE_CONTEO_MENOS', 'SALDO_APERTURA_NEGATIVO')
+NOTAS = 'Saldo inicial: stock_actual sin movimientos que lo respalden (migración f4a9c2d7b631)'
+
+
+def _in(tipos: tuple) -> str:
+    return ', '.join(f"'{tipo}'" for tipo in tipos)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    saldo = (
+        f"COALESCE(SUM(CASE WHEN UPPER(m.tipo_movimiento) IN ({_in(TIPOS_ENTRADA)}) THEN m.cantidad "
+        f"WHEN UPPER(m.tipo_movimiento) IN ({_in(TIPOS_SALIDA)}) THEN -m.cantidad ELSE 0 END), 0)"
+    )
+    diferencia = f"p.stock_actual - {saldo}"
+    op.execute(sa.text(
+        "INSERT INTO movimientos_inventario (producto_id, tipo_movimiento, cantidad, notas) "
+        f"SELECT p.id, CASE WHEN {diferencia} > 0 THEN 'SALDO_APERTURA' ELSE 'AJUSTE_CONTEO_MENOS' END, "
+        f"ABS({diferencia}), :notas "
+        "FROM products p LEFT JOIN movimientos_inventario m ON m.producto_id = p.id "
+        f"GROUP BY p.id, p.stock_actual HAVING p.stock_actual <> {saldo} "
+        "ORDER BY p.id"
+    ).bindparams(notas=NOTAS))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(sa.text(
+        "DELETE FROM movimientos_inventario "
+        "WHERE tipo_movimiento IN ('SALDO_APERTURA', 'AJUSTE_CONTEO_MENOS') AND notas = :notas"
+    ).bindparams(notas=NOTAS))
+    # Los checkpoints de la reconciliación pueden incluir los saldos borrados: se recalculan
+    op.execute('DELETE FROM stock_ledger_balances')
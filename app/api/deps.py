@@ -5,13 +5,16 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer # Esquema de seguridad para Bearer Tokens
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError # Para capturar errores de decodificación de JWT
 
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db
 from app.db import models # Para tipar el objeto User que devolvemos
 from app.schemas import token_schemas # Para TokenData (payload del token)
 from app.security.auth_security import decode_access_token # Nuestra función para decodificar tokens
+from app.security.principal_cache import principal_cache, UserSnapshot # Caché del usuario por token
 from app.crud import user_crud # Para obtener el usuario de la BD
+from app.crud.aio import user_crud as async_user_crud # Versión asíncrona (DB_ASYNC_MODE)
 from app.core.config import settings # Para obtener la URL del endpoint de token
 
 # --- OAuth2PasswordBearer ---
@@ -26,12 +29,18 @@ oauth2_scheme = OAuth2PasswordBearer(
 async def get_current_user(
     db: Session = Depends(get_db), # Inyectamos la sesión de BD
     token: str = Depends(oauth2_scheme) # FastAPI extraerá el token de la cabecera Authorization
-) -> models.User: # Esperamos devolver un objeto models.User
+) -> UserSnapshot: # Copia ligera del usuario (mismos atributos que models.User que usan los endpoints)
     """
     Dependencia para obtener el usuario actual a partir de un token JWT.
     Verifica el token, lo decodifica y obtiene el usuario de la base de datos.
+    Si el token ya se verificó recientemente, se sirve desde principal_cache
+    (sin jwt.decode ni consulta a la BD).
     Lanza HTTPException si el token es inválido, ha expirado o el usuario no se encuentra.
     """
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached[1]
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -53,12 +62,14 @@ async def get_current_user(
     if user is None:
         raise credentials_exception # Usuario no encontrado en la BD (quizás fue eliminado después de emitir el token)
     
-    return user
+    snapshot = UserSnapshot.from_user(user)
+    principal_cache.put(token, payload, snapshot)
+    return snapshot
 
 
 async def get_current_active_user(
-    current_user: models.User = Depends(get_current_user) # Esta dependencia llama a la anterior
-) -> models.User:
+    current_user: UserSnapshot = Depends(get_current_user) # Esta dependencia llama a la anterior
+) -> UserSnapshot:
     """
     Dependencia para obtener el usuario actual que también está activo.
     Lanza HTTPException si el usuario está inactivo.
@@ -67,6 +78,53 @@ async def get_current_active_user(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
     return current_user
 
+# --- Versiones asíncronas (DB_ASYNC_MODE) ---
+# Mismo contrato que las dependencias anteriores, pero usando AsyncSession.
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> UserSnapshot:
+    """
+    Igual que get_current_user, pero consulta al usuario con una AsyncSession.
+    """
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached[1]
+
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    payload = decode_access_token(token)
+    if payload is None:
+        raise credentials_exception
+
+    username: Optional[str] = payload.get("sub")
+    if username is None:
+        raise credentials_exception
+
+    user = await async_user_crud.get_user_by_username(db, username=username)
+    if user is None:
+        raise credentials_exception
+
+    snapshot = UserSnapshot.from_user(user)
+    principal_cache.put(token, payload, snapshot)
+    return snapshot
+
+
+async def get_current_active_user_async(
+    current_user: UserSnapshot = Depends(get_current_user_async)
+) -> UserSnapshot:
+    """
+    Igual que get_current_active_user, sobre get_current_user_async.
+    """
+    if not current_user.is_active:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
+    return current_user
+
 # Podrías añadir más dependencias aquí si necesitaras roles o permisos más granulares.
 # Ejemplo:
 # async def get_current_admin_user(
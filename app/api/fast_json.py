@@ -0,0 +1,56 @@
+# app/api/fast_json.py
+# Serialización rápida de los listados (settings.FAST_LIST_SERIALIZATION).
+#
+# En lugar de hidratar objetos ORM y dejar que FastAPI valide cada uno contra el
+# response_model y después lo codifique con json.dumps, el CRUD devuelve las filas como
+# dicts y aquí se validan en bloque y se codifican a JSON en una sola pasada con un
+# TypeAdapter de pydantic (en Rust), cacheado por tipo.
+#
+# La salida es idéntica byte a byte a la de la respuesta por defecto (JSONResponse), salvo
+# en la notación de algunos floats (|x| < 1e-4 o >= 1e16), que json.dumps escribe con
+# exponente ("1e-05", "1e+16") y pydantic no. Si aparece alguno, se usa el camino de
+# FastAPI para esa respuesta.
+
+import json
+import re
+from functools import lru_cache
+from typing import Any
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+# Floats que pydantic escribe distinto que json.dumps: con exponente ("1e16", "1e-7") o
+# con cuatro ceros tras el punto ("0.00005"). Se buscan como valores de un objeto (tras ':'),
+# que es como aparecen en los schemas de la API. Si coincide con texto dentro de una cadena
+# solo se usa el camino lento: el resultado es el mismo.
+_FLOAT_CON_EXPONENTE = re.compile(rb":-?[0-9][0-9.]*e")
+_FLOAT_PEQUENO = b"0.0000"
+
+
+@lru_cache(maxsize=None)
+def _adapter(tipo: Any) -> TypeAdapter:
+    return TypeAdapter(tipo)
+
+
+def render(tipo: Any, payload: Any) -> bytes:
+    """
+    Valida payload (dicts / listas de dicts) contra tipo y lo codifica como JSON, igual que
+    lo haría FastAPI con response_model=tipo.
+    """
+    adapter = _adapter(tipo)
+    valor = adapter.validate_python(payload)
+    body = adapter.dump_json(valor)
+    if _FLOAT_PEQUENO in body or _FLOAT_CON_EXPONENTE.search(body):
+        # Mismos argumentos que JSONResponse.render
+        return json.dumps(
+            adapter.dump_python(valor, mode="json"),
+            ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"),
+        ).encode("utf-8")
+    return body
+
+
+def json_response(tipo: Any, payload: Any, status_code: int = 200) -> Response:
+    """
+    Respuesta JSON de un listado ya validado y codificado (FastAPI no vuelve a procesarla).
+    """
+    return Response(content=render(tipo, payload), status_code=status_code, media_type="application/json")
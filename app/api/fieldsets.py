@@ -0,0 +1,105 @@
+# app/api/fieldsets.py
+# Sparse fieldsets: parámetro fields= de los listados (ej: fields=id,codigo_sku,stock_actual,category.name).
+#
+# La selección se valida contra el schema de respuesta y se representa como una tupla
+# ((campo, None), (relación, (subcampo, ...)), ...) en el orden del schema. El CRUD la
+# traduce a una proyección SQL (app/crud/fieldsets.py) y la respuesta se valida y codifica
+# con un schema parcial con solo esos campos (mismo formato que la respuesta completa).
+
+import typing
+from functools import lru_cache
+from typing import Optional, Type
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, create_model
+
+from app.crud.fieldsets import Seleccion
+
+
+def _schema_anidado(anotacion) -> Optional[Type[BaseModel]]:
+    """Schema de un campo anidado (Model u Optional[Model]); None si el campo es escalar."""
+    candidatos = typing.get_args(anotacion) if typing.get_origin(anotacion) is typing.Union else (anotacion,)
+    for candidato in candidatos:
+        if isinstance(candidato, type) and issubclass(candidato, BaseModel):
+            return candidato
+    return None
+
+
+def campos_disponibles(schema: Type[BaseModel]) -> str:
+    nombres = []
+    for nombre, info in schema.model_fields.items():
+        anidado = _schema_anidado(info.annotation)
+        nombres.append(nombre)
+        if anidado is not None:
+            nombres.extend(f"{nombre}.{sub}" for sub in anidado.model_fields)
+    return ", ".join(nombres)
+
+
+def parse_fields(fields: str, schema: Type[BaseModel]) -> Seleccion:
+    """
+    Convierte 'a,b,rel.c' en una selección del schema. 'rel' sin subcampo selecciona el objeto
+    anidado completo. Lanza ValueError si algún campo no existe.
+    """
+    pedidos = {}
+    for campo in (parte.strip() for parte in fields.split(",")):
+        if not campo:
+            continue
+        nombre, _, sub = campo.partition(".")
+        info = schema.model_fields.get(nombre)
+        anidado = _schema_anidado(info.annotation) if info is not None else None
+        if info is None or (sub and (anidado is None or sub not in anidado.model_fields)):
+            raise ValueError(f"Campo desconocido en fields: '{campo}'. Campos disponibles: {campos_disponibles(schema)}")
+        if anidado is None:
+            pedidos[nombre] = None
+        elif not sub:
+            pedidos[nombre] = tuple(anidado.model_fields)
+        elif pedidos.get(nombre) is None or sub not in pedidos[nombre]:
+            pedidos[nombre] = (*(pedidos.get(nombre) or ()), sub)
+    if not pedidos:
+        raise ValueError(f"fields no puede estar vacío. Campos disponibles: {campos_disponibles(schema)}")
+
+    seleccion = []
+    for nombre, info in schema.model_fields.items():
+        if nombre in pedidos:
+            sub = pedidos[nombre]
+            if sub is not None: # Subcampos en el orden del schema anidado
+                sub = tuple(s for s in _schema_anidado(info.annotation).model_fields if s in sub)
+            seleccion.append((nombre, sub))
+    return tuple(seleccion)
+
+
+@lru_cache(maxsize=256)
+def partial_schema(schema: Type[BaseModel], seleccion: Seleccion) -> Type[BaseModel]:
+    """
+    Schema con solo los campos seleccionados (mismos tipos y validaciones que el original).
+    """
+    campos = {}
+    for nombre, sub in seleccion:
+        info = schema.model_fields[nombre]
+        anotacion = info.annotation
+        if sub is not None:
+            anidado = partial_schema(_schema_anidado(anotacion), tuple((s, None) for s in sub))
+            anotacion = Optional[anidado] if typing.get_origin(anotacion) is typing.Union else anidado
+        campos[nombre] = (anotacion, info)
+    return create_model(f"{schema.__name__}Fields", **campos)
+
+
+def sparse_fields(schema: Type[BaseModel]):
+    """
+    Dependencia de FastAPI para el parámetro fields= de un listado. Devuelve la selección
+    (None si no se indica) o responde 400 si algún campo no existe.
+    """
+    def dependency(
+        fields: Optional[str] = Query(
+            None,
+            description="Campos a devolver, separados por comas (los anidados con punto, ej: category.name). "
+                        f"Disponibles: {campos_disponibles(schema)}",
+        ),
+    ) -> Optional[Seleccion]:
+        if fields is None:
+            return None
+        try:
+            return parse_fields(fields, schema)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return dependency
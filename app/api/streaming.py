@@ -0,0 +1,70 @@
+# app/api/streaming.py
+# Respuestas de exportación en streaming (NDJSON / CSV).
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from fastapi.responses import StreamingResponse
+
+# Filas que se serializan juntas antes de enviar un trozo al cliente
+ROWS_PER_CHUNK = 500
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _iter_ndjson(rows: Iterable[Sequence[Any]], columns: Sequence[str]) -> Iterator[bytes]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False))
+        if len(lines) >= ROWS_PER_CHUNK:
+            yield ("\n".join(lines) + "\n").encode()
+            lines.clear()
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def _iter_csv(rows: Iterable[Sequence[Any]], columns: Sequence[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow(["" if v is None else (v.isoformat() if isinstance(v, (datetime, date)) else v) for v in row])
+        pending += 1
+        if pending >= ROWS_PER_CHUNK:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode()
+
+
+def export_response(
+    row_source: Callable[[], Iterator[Sequence[Any]]],
+    columns: Sequence[str],
+    file_format: str,
+    filename: str,
+) -> StreamingResponse:
+    """
+    Construye una StreamingResponse que serializa las filas de row_source a medida que llegan.
+    row_source es un callable que abre su propio cursor (y su propia sesión) al empezar a iterar:
+    la sesión de la dependencia get_db ya está cerrada cuando se envía el cuerpo.
+    """
+    serializer = _iter_csv if file_format == "csv" else _iter_ndjson
+    return StreamingResponse(
+        serializer(row_source(), columns),
+        media_type=MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{file_format}"'},
+    )
@@ -0,0 +1,3 @@
+# app/api/v1/aio/__init__.py
+# Routers 'async def' que usan AsyncSession y los CRUD de app/crud/aio.
+# main.py los combina con los routers síncronos cuando settings.DB_ASYNC_MODE está activado.
@@ -0,0 +1,65 @@
+# app/api/v1/aio/auth_router.py
+
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import get_async_db
+from app.schemas import token_schemas, user_schemas
+from app.crud.aio import user_crud
+from app.security.auth_security import create_access_token
+
+router = APIRouter()
+
+@router.post(
+    "/token",
+    response_model=token_schemas.Token,
+    summary="Obtener Token de Acceso (Login)",
+    description="Autentica a un usuario con nombre de usuario y contraseña, y devuelve un token de acceso JWT."
+)
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+) -> token_schemas.Token:
+    user = await user_crud.authenticate_user(
+        db, username=form_data.username, password=form_data.password
+    )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Nombre de usuario o contraseña incorrectos",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Usuario inactivo"
+        )
+
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user.username, "user_id": user.id},
+        expires_delta=access_token_expires
+    )
+    return token_schemas.Token(access_token=access_token, token_type="bearer")
+
+
+@router.post(
+    "/register",
+    response_model=user_schemas.User,
+    status_code=status.HTTP_201_CREATED,
+    summary="Registrar un nuevo usuario (Opcional)",
+    description="Crea una nueva cuenta de usuario. Verificar si este endpoint es requerido por el proyecto."
+)
+async def register_new_user(
+    user_in: user_schemas.UserCreate,
+    db: AsyncSession = Depends(get_async_db)
+) -> dict:
+    # Los duplicados (nombre de usuario / correo) los detectan las restricciones UNIQUE
+    try:
+        return await user_crud.create_user(db=db, user=user_in)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
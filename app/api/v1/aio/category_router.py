@@ -0,0 +1,119 @@
+# app/api/v1/aio/category_router.py
+
+from typing import List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_async_db
+from app.schemas import category_schemas
+from app.crud.aio import category_crud
+from app.db import models
+from app.api.deps import get_current_active_user_async
+from app.api import fast_json, fieldsets
+
+router = APIRouter()
+
+@router.post(
+    "/",
+    response_model=category_schemas.Category,
+    status_code=status.HTTP_201_CREATED,
+    summary="Crear una nueva categoría",
+    description="Crea una nueva categoría en la base de datos. Requiere autenticación."
+)
+async def create_category_endpoint(
+    category_in: category_schemas.CategoryCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_active_user_async)
+):
+    # El nombre duplicado lo detecta la restricción UNIQUE de la base de datos
+    try:
+        return await category_crud.create_category(db=db, category=category_in)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get(
+    "/",
+    response_model=Union[List[category_schemas.Category], List[category_schemas.CategoryWithStats]],
+    summary="Obtener lista de categorías",
+    description="Con include=stats cada categoría incluye product_count, total_units y stock_value, "
+                "calculados en una sola consulta."
+)
+async def read_categories_endpoint(
+    skip: int = 0,
+    limit: int = 100,
+    include: Optional[Literal["stats"]] = Query(None, description="stats: añade los agregados de los productos de cada categoría"),
+    seleccion: Optional[fieldsets.Seleccion] = Depends(fieldsets.sparse_fields(category_schemas.Category)),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if include == "stats": # Un solo GROUP BY sobre products, sin una consulta por categoría
+        if seleccion is not None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="fields no se puede combinar con include=stats.")
+        rows = await category_crud.get_categories_stats(db, skip=skip, limit=limit)
+        return fast_json.json_response(List[category_schemas.CategoryWithStats], rows)
+    if seleccion is not None: # fields=: solo las columnas pedidas
+        rows = await category_crud.get_categories_fields(db, seleccion, skip=skip, limit=limit)
+        return fast_json.json_response(List[fieldsets.partial_schema(category_schemas.Category, seleccion)], rows)
+    return await category_crud.get_categories(db, skip=skip, limit=limit)
+
+
+@router.get(
+    "/{category_id}",
+    response_model=category_schemas.Category,
+    summary="Obtener una categoría por ID"
+)
+async def read_category_endpoint(
+    category_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_category = await category_crud.get_category(db, category_id=category_id)
+    if db_category is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Category with ID {category_id} not found"
+        )
+    return db_category
+
+
+@router.put(
+    "/{category_id}",
+    response_model=category_schemas.Category,
+    summary="Actualizar una categoría existente",
+    description="Actualiza los detalles de una categoría existente. Requiere autenticación."
+)
+async def update_category_endpoint(
+    category_id: int,
+    category_in: category_schemas.CategoryUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_active_user_async)
+):
+    try:
+        updated_category = await category_crud.update_category(db=db, category_id=category_id, category_update=category_in)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if updated_category is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Category with ID {category_id} not found, cannot update."
+        )
+    return updated_category
+
+
+@router.delete(
+    "/{category_id}",
+    response_model=Optional[category_schemas.Category],
+    status_code=status.HTTP_200_OK,
+    summary="Eliminar una categoría",
+    description="Elimina una categoría existente. Requiere autenticación."
+)
+async def delete_category_endpoint(
+    category_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_active_user_async)
+):
+    deleted_category = await category_crud.delete_category(db=db, category_id=category_id)
+    if deleted_category is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Category with ID {category_id} not found, cannot delete."
+        )
+    return deleted_category
@@ -0,0 +1,88 @@
+# app/api/v1/aio/movimiento_inventario_router.py
+from typing import List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
+from app.schemas import movimiento_inventario_schemas
+from app.schemas.pagination_schemas import Page
+from app.crud.aio import movimiento_inventario_crud, product_crud
+from app.db import models
+from app.api.deps import get_current_active_user_async
+from app.api import fast_json, fieldsets
+
+router = APIRouter()
+
+@router.post(
+    "/",
+    response_model=movimiento_inventario_schemas.MovimientoInventario,
+    status_code=status.HTTP_201_CREATED,
+    summary="Registrar un nuevo movimiento de inventario",
+)
+async def create_new_movimiento(
+    movimiento_in: movimiento_inventario_schemas.MovimientoInventarioCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_active_user_async),
+):
+    # La existencia del producto la comprueba el propio UPDATE del stock (404 si no existe)
+    try:
+        return await movimiento_inventario_crud.create_movimiento_inventario(
+            db=db, movimiento=movimiento_in, responsable_id=current_user.id
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e: # Captura errores de lógica de negocio del CRUD
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get(
+    "/producto/{producto_id}",
+    response_model=Union[
+        List[movimiento_inventario_schemas.MovimientoInventario],
+        Page[movimiento_inventario_schemas.MovimientoInventario],
+    ],
+    summary="Obtener movimientos de inventario para un producto específico",
+    description="Paginación por offset (skip/limit, devuelve una lista) o por cursor "
+                "(pagination=cursor o cursor=..., devuelve {items, next_cursor})."
+)
+async def read_movimientos_for_product(
+    producto_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    pagination: Literal["offset", "cursor"] = Query("offset", description="Modo de paginación"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en 'next_cursor' por la página anterior"),
+    seleccion: Optional[fieldsets.Seleccion] = Depends(fieldsets.sparse_fields(movimiento_inventario_schemas.MovimientoInventario)),
+    db: AsyncSession = Depends(get_async_db),
+):
+    db_producto = await product_crud.get_product(db, product_id=producto_id)
+    if not db_producto:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Producto con ID {producto_id} no encontrado."
+        )
+    if seleccion is not None: # fields=: solo las columnas pedidas (producto y responsable solo si se piden)
+        schema = fieldsets.partial_schema(movimiento_inventario_schemas.MovimientoInventario, seleccion)
+        if pagination == "cursor" or cursor:
+            try:
+                movimientos, next_cursor = await movimiento_inventario_crud.get_movimientos_por_producto_fields_keyset(
+                    db, seleccion, producto_id=producto_id, limit=limit, cursor=cursor
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            return fast_json.json_response(Page[schema], {"items": movimientos, "next_cursor": next_cursor})
+        rows = await movimiento_inventario_crud.get_movimientos_por_producto_fields(
+            db, seleccion, producto_id=producto_id, skip=skip, limit=limit
+        )
+        return fast_json.json_response(List[schema], rows)
+
+    if pagination == "cursor" or cursor:
+        try:
+            movimientos, next_cursor = await movimiento_inventario_crud.get_movimientos_por_producto_keyset(
+                db, producto_id=producto_id, limit=limit, cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return {"items": movimientos, "next_cursor": next_cursor}
+
+    return await movimiento_inventario_crud.get_movimientos_por_producto(
+        db, producto_id=producto_id, skip=skip, limit=limit
+    )
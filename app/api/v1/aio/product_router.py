@@ -0,0 +1,143 @@
+# app/api/v1/aio/product_router.py
+
+import functools
+from typing import List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import get_async_db
+from app.schemas import product_schemas
+from app.schemas.pagination_schemas import Page
+from app.crud.aio import product_crud
+from app.db import models
+from app.api.deps import get_current_active_user_async
+from app.api import fast_json, fieldsets
+
+router = APIRouter()
+
+@router.post(
+    "/",
+    response_model=product_schemas.Product,
+    status_code=status.HTTP_201_CREATED,
+    summary="Crear un nuevo producto",
+    description="Crea un nuevo producto. Requiere autenticación."
+)
+async def create_product_endpoint(
+    product_in: product_schemas.ProductCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_active_user_async)
+):
+    try:
+        return await product_crud.create_product(db=db, product=product_in, responsable_id=current_user.id)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get(
+    "/",
+    response_model=Union[List[product_schemas.Product], Page[product_schemas.Product]],
+    summary="Obtener lista de productos",
+    description="Paginación por offset (skip/limit, devuelve una lista) o por cursor "
+                "(pagination=cursor o cursor=..., devuelve {items, next_cursor})."
+)
+async def read_products_endpoint(
+    skip: int = 0,
+    limit: int = 100,
+    category_id: Optional[int] = Query(None, description="Filtrar productos por ID de categoría"),
+    pagination: Literal["offset", "cursor"] = Query("offset", description="Modo de paginación"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en 'next_cursor' por la página anterior"),
+    seleccion: Optional[fieldsets.Seleccion] = Depends(fieldsets.sparse_fields(product_schemas.Product)),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Con fields= las filas solo traen las columnas pedidas y se validan con un schema parcial
+    schema = product_schemas.Product if seleccion is None else fieldsets.partial_schema(product_schemas.Product, seleccion)
+    fast = settings.FAST_LIST_SERIALIZATION or seleccion is not None
+    if pagination == "cursor" or cursor:
+        if seleccion is not None:
+            get_page = functools.partial(product_crud.get_products_fields_keyset, seleccion=seleccion)
+        else:
+            get_page = product_crud.get_products_keyset_rows if fast else product_crud.get_products_keyset
+        try:
+            products, next_cursor = await get_page(db, limit=limit, cursor=cursor, category_id=category_id)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        page = {"items": products, "next_cursor": next_cursor}
+        return fast_json.json_response(Page[schema], page) if fast else page
+
+    if seleccion is not None:
+        rows = await product_crud.get_products_fields(db, seleccion, skip=skip, limit=limit, category_id=category_id)
+        return fast_json.json_response(List[schema], rows)
+    if fast:
+        rows = await product_crud.get_products_rows(db, skip=skip, limit=limit, category_id=category_id)
+        return fast_json.json_response(List[schema], rows)
+    return await product_crud.get_products(db, skip=skip, limit=limit, category_id=category_id)
+
+
+@router.get(
+    "/{product_id}",
+    response_model=product_schemas.Product,
+    summary="Obtener un producto por ID"
+)
+async def read_product_endpoint(
+    product_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_product = await product_crud.get_product(db, product_id=product_id)
+    if db_product is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product with ID {product_id} not found"
+        )
+    return db_product
+
+
+@router.put(
+    "/{product_id}",
+    response_model=product_schemas.Product,
+    summary="Actualizar un producto existente",
+    description="Actualiza un producto existente. Requiere autenticación."
+)
+async def update_product_endpoint(
+    product_id: int,
+    product_in: product_schemas.ProductUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_active_user_async)
+):
+    try:
+        updated_product = await product_crud.update_product(
+            db=db, product_id=product_id, product_update=product_in, responsable_id=current_user.id
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if updated_product is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product with ID {product_id} not found, cannot update."
+        )
+    return updated_product
+
+
+@router.delete(
+    "/{product_id}",
+    response_model=Optional[product_schemas.Product],
+    status_code=status.HTTP_200_OK,
+    summary="Eliminar un producto",
+    description="Elimina un producto existente. Requiere autenticación."
+)
+async def delete_product_endpoint(
+    product_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_active_user_async)
+):
+    deleted_product = await product_crud.delete_product(db=db, product_id=product_id)
+    if deleted_product is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product with ID {product_id} not found, cannot delete."
+        )
+    return deleted_product
@@ -0,0 +1,63 @@
+# app/api/v1/aio/proveedor_router.py
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
+from app.schemas import proveedor_schemas
+from app.crud.aio import proveedor_crud
+from app.db import models
+from app.api.deps import get_current_active_user_async
+from app.api import fast_json, fieldsets
+
+router = APIRouter()
+
+@router.post("/", response_model=proveedor_schemas.Proveedor, status_code=status.HTTP_201_CREATED)
+async def create_new_proveedor(
+    proveedor_in: proveedor_schemas.ProveedorCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_active_user_async),
+):
+    return await proveedor_crud.create_proveedor(db=db, proveedor=proveedor_in)
+
+@router.get("/", response_model=List[proveedor_schemas.Proveedor])
+async def read_all_proveedores(
+    skip: int = 0, limit: int = 100,
+    seleccion: Optional[fieldsets.Seleccion] = Depends(fieldsets.sparse_fields(proveedor_schemas.Proveedor)),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if seleccion is not None: # fields=: solo las columnas pedidas
+        rows = await proveedor_crud.get_proveedores_fields(db, seleccion, skip=skip, limit=limit)
+        return fast_json.json_response(List[fieldsets.partial_schema(proveedor_schemas.Proveedor, seleccion)], rows)
+    return await proveedor_crud.get_proveedores(db, skip=skip, limit=limit)
+
+@router.get("/{proveedor_id}", response_model=proveedor_schemas.Proveedor)
+async def read_single_proveedor(proveedor_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_proveedor = await proveedor_crud.get_proveedor(db, proveedor_id=proveedor_id)
+    if db_proveedor is None:
+        raise HTTPException(status_code=404, detail="Proveedor not found")
+    return db_proveedor
+
+@router.put("/{proveedor_id}", response_model=proveedor_schemas.Proveedor)
+async def update_existing_proveedor(
+    proveedor_id: int,
+    proveedor_in: proveedor_schemas.ProveedorUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_active_user_async),
+):
+    updated_proveedor = await proveedor_crud.update_proveedor(
+        db, proveedor_id=proveedor_id, proveedor_update=proveedor_in
+    )
+    if updated_proveedor is None:
+        raise HTTPException(status_code=404, detail="Proveedor not found")
+    return updated_proveedor
+
+@router.delete("/{proveedor_id}", response_model=proveedor_schemas.Proveedor)
+async def delete_existing_proveedor(
+    proveedor_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_active_user_async),
+):
+    deleted_proveedor = await proveedor_crud.delete_proveedor(db, proveedor_id=proveedor_id)
+    if deleted_proveedor is None:
+        raise HTTPException(status_code=404, detail="Proveedor not found")
+    return deleted_proveedor
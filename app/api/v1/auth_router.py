@@ -5,6 +5,7 @@ from typing import Any # Any se usa a veces para form_data, pero se puede ser m
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm # Para el formulario de login estándar
+from starlette.concurrency import run_in_threadpool # Para la consulta síncrona a la BD desde un endpoint async
 from sqlalchemy.orm import Session
 
 from app.core.config import settings # Para ACCESS_TOKEN_EXPIRE_MINUTES
@@ -12,7 +13,7 @@ from app.db.database import get_db
 from app.schemas import token_schemas, user_schemas # Schemas para Token y User
 from app.crud import user_crud # Funciones CRUD y de autenticación de usuario
 from app.security.auth_security import create_access_token # Para crear el JWT
-from app.db import models
+from app.security.password_pool import get_password_hash_async, verify_password_async # bcrypt fuera del event loop
 
 router = APIRouter()
 
@@ -29,10 +30,12 @@ async def login_for_access_token(
     """
     Endpoint de login.
     Recibe `username` y `password` como datos de formulario.
+    La consulta a la BD va al threadpool y bcrypt al pool de contraseñas,
+    así el event loop no se bloquea (503 si el pool de contraseñas está saturado).
     """
-    user = user_crud.authenticate_user(
-        db, username=form_data.username, password=form_data.password
-    )
+    user = await run_in_threadpool(user_crud.get_user_by_username, db, username=form_data.username)
+    if user and not await verify_password_async(form_data.password, user.hashed_password):
+        user = None
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,25 +70,15 @@ async def login_for_access_token(
     summary="Registrar un nuevo usuario (Opcional)",
     description="Crea una nueva cuenta de usuario. Verificar si este endpoint es requerido por el proyecto."
 )
-def register_new_user(
+async def register_new_user(
     user_in: user_schemas.UserCreate,
     db: Session = Depends(get_db)
-) -> models.User: # Ahora 'models' está definido
-    # ... (lógica de la función) ...
-    db_user_by_username = user_crud.get_user_by_username(db, username=user_in.username)
-    if db_user_by_username:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"El nombre de usuario '{user_in.username}' ya está registrado."
-        )
-    
-    if user_in.email:
-        db_user_by_email = user_crud.get_user_by_email(db, email=user_in.email)
-        if db_user_by_email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"El correo electrónico '{user_in.email}' ya está registrado."
-            )
-            
-    created_user = user_crud.create_user(db=db, user=user_in)
-    return created_user
\ No newline at end of file
+) -> dict:
+    # Los duplicados (nombre de usuario / correo) los detectan las restricciones UNIQUE.
+    # Como en el login: el hash va al pool de contraseñas (503 si está saturado) y el INSERT
+    # al threadpool, así ni bcrypt ni la BD bloquean el event loop ni ocupan un hilo esperando.
+    hashed_password = await get_password_hash_async(user_in.password)
+    try:
+        return await run_in_threadpool(user_crud.create_user, db=db, user=user_in, hashed_password=hashed_password)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
\ No newline at end of file
@@ -1,7 +1,7 @@
 # app/api/v1/category_router.py
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
@@ -9,6 +9,7 @@ from app.schemas import category_schemas
 from app.crud import category_crud
 from app.db import models # ¡NUEVA IMPORTACIÓN!
 from app.api.deps import get_current_active_user # ¡NUEVA IMPORTACIÓN!
+from app.api import fast_json, fieldsets
 
 router = APIRouter()
 
@@ -24,28 +25,35 @@ def create_category_endpoint(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user) # ¡AÑADIDO!
 ):
-    # ... (lógica existente para crear categoría) ...
-    db_category_by_name = category_crud.get_category_by_name(db, name=category_in.name)
-    if db_category_by_name:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Category with name '{category_in.name}' already exists."
-        )
-    created_category = category_crud.create_category(db=db, category=category_in)
-    return created_category
+    # El nombre duplicado lo detecta la restricción UNIQUE de la base de datos
+    try:
+        return category_crud.create_category(db=db, category=category_in)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get(
     "/",
-    response_model=List[category_schemas.Category],
-    summary="Obtener lista de categorías"
+    response_model=Union[List[category_schemas.Category], List[category_schemas.CategoryWithStats]],
+    summary="Obtener lista de categorías",
+    description="Con include=stats cada categoría incluye product_count, total_units y stock_value, "
+                "calculados en una sola consulta."
     # No protegemos el listado por ahora
 )
 def read_categories_endpoint(
     skip: int = 0,
     limit: int = 100,
+    include: Optional[Literal["stats"]] = Query(None, description="stats: añade los agregados de los productos de cada categoría"),
+    seleccion: Optional[fieldsets.Seleccion] = Depends(fieldsets.sparse_fields(category_schemas.Category)),
     db: Session = Depends(get_db)
 ):
-    # ... (lógica existente) ...
+    if include == "stats": # Un solo GROUP BY sobre products, sin una consulta por categoría
+        if seleccion is not None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="fields no se puede combinar con include=stats.")
+        rows = category_crud.get_categories_stats(db, skip=skip, limit=limit)
+        return fast_json.json_response(List[category_schemas.CategoryWithStats], rows)
+    if seleccion is not None: # fields=: solo las columnas pedidas
+        rows = category_crud.get_categories_fields(db, seleccion, skip=skip, limit=limit)
+        return fast_json.json_response(List[fieldsets.partial_schema(category_schemas.Category, seleccion)], rows)
     categories = category_crud.get_categories(db, skip=skip, limit=limit)
     return categories
 
@@ -82,23 +90,15 @@ def update_category_endpoint(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user) # ¡AÑADIDO!
 ):
-    # ... (lógica existente para actualizar categoría, incluyendo verificaciones) ...
-    db_category_to_update = category_crud.get_category(db, category_id=category_id) # Renombrado para claridad
-    if db_category_to_update is None:
+    try:
+        updated_category = category_crud.update_category(db=db, category_id=category_id, category_update=category_in)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if updated_category is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Category with ID {category_id} not found, cannot update."
         )
-
-    if category_in.name is not None and category_in.name != db_category_to_update.name:
-        existing_category_with_new_name = category_crud.get_category_by_name(db, name=category_in.name)
-        if existing_category_with_new_name and existing_category_with_new_name.id != category_id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Another category with name '{category_in.name}' already exists."
-            )
-            
-    updated_category = category_crud.update_category(db=db, category_id=category_id, category_update=category_in)
     return updated_category
 
 
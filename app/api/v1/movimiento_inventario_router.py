@@ -1,12 +1,16 @@
 # app/api/v1/movimiento_inventario_router.py
-from typing import List, Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Literal, Optional, Union
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.schemas import movimiento_inventario_schemas
-from app.crud import movimiento_inventario_crud, product_crud # Necesario para validar producto
+from app.schemas.pagination_schemas import Page
+from app.crud import movimiento_inventario_crud, movimiento_rollup_crud, product_crud # Necesario para validar producto
 from app.db import models
 from app.api.deps import get_current_active_user
+from app.api.streaming import export_response
+from app.api import fast_json, fieldsets
 
 router = APIRouter()
 
@@ -21,31 +25,59 @@ def create_new_movimiento(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user),
 ):
-    # Validar que el producto existe antes de llamar al CRUD
-    # (Aunque el CRUD también lo valida, es bueno tenerlo aquí para un error HTTP más claro)
-    db_producto = product_crud.get_product(db, product_id=movimiento_in.producto_id) # Corregido
-    if not db_producto:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Producto con ID {movimiento_in.producto_id} no encontrado. No se puede crear movimiento."
-        )
+    # La existencia del producto la comprueba el propio UPDATE del stock (404 si no existe)
     try:
         return movimiento_inventario_crud.create_movimiento_inventario(
             db=db, movimiento=movimiento_in, responsable_id=current_user.id
         )
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except ValueError as e: # Captura errores de lógica de negocio del CRUD
-         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post(
+    "/batch",
+    response_model=movimiento_inventario_schemas.MovimientoInventarioBatchResult,
+    status_code=status.HTTP_201_CREATED,
+    summary="Registrar un lote de movimientos de inventario",
+    description="Registra muchos movimientos en una sola transacción (todo o nada) "
+                "y devuelve la variación neta y el stock final de cada producto afectado. "
+                "La guarda contra stock negativo se aplica al stock final de cada producto, "
+                "no a cada movimiento del lote por separado.",
+)
+def create_movimientos_batch(
+    batch_in: movimiento_inventario_schemas.MovimientoInventarioBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user),
+):
+    try:
+        return movimiento_inventario_crud.create_movimientos_batch(
+            db=db, movimientos=batch_in.movimientos, responsable_id=current_user.id
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e: # Stock insuficiente: 400, como el alta de un movimiento
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.get(
     "/producto/{producto_id}",
-    response_model=List[movimiento_inventario_schemas.MovimientoInventario],
+    response_model=Union[
+        List[movimiento_inventario_schemas.MovimientoInventario],
+        Page[movimiento_inventario_schemas.MovimientoInventario],
+    ],
     summary="Obtener movimientos de inventario para un producto específico",
+    description="Paginación por offset (skip/limit, devuelve una lista) o por cursor "
+                "(pagination=cursor o cursor=..., devuelve {items, next_cursor})."
 )
 def read_movimientos_for_product(
     producto_id: int,
     skip: int = 0,
     limit: int = 100,
+    pagination: Literal["offset", "cursor"] = Query("offset", description="Modo de paginación"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en 'next_cursor' por la página anterior"),
+    seleccion: Optional[fieldsets.Seleccion] = Depends(fieldsets.sparse_fields(movimiento_inventario_schemas.MovimientoInventario)),
     db: Session = Depends(get_db),
     # current_user: models.User = Depends(get_current_active_user), # Opcional proteger este listado
 ):
@@ -56,9 +88,86 @@ def read_movimientos_for_product(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Producto con ID {producto_id} no encontrado."
         )
+    if seleccion is not None: # fields=: solo las columnas pedidas (producto y responsable solo si se piden)
+        schema = fieldsets.partial_schema(movimiento_inventario_schemas.MovimientoInventario, seleccion)
+        if pagination == "cursor" or cursor:
+            try:
+                movimientos, next_cursor = movimiento_inventario_crud.get_movimientos_por_producto_fields_keyset(
+                    db, seleccion, producto_id=producto_id, limit=limit, cursor=cursor
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            return fast_json.json_response(Page[schema], {"items": movimientos, "next_cursor": next_cursor})
+        rows = movimiento_inventario_crud.get_movimientos_por_producto_fields(
+            db, seleccion, producto_id=producto_id, skip=skip, limit=limit
+        )
+        return fast_json.json_response(List[schema], rows)
+
+    if pagination == "cursor" or cursor:
+        try:
+            movimientos, next_cursor = movimiento_inventario_crud.get_movimientos_por_producto_keyset(
+                db, producto_id=producto_id, limit=limit, cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return {"items": movimientos, "next_cursor": next_cursor}
+
     return movimiento_inventario_crud.get_movimientos_por_producto(
         db, producto_id=producto_id, skip=skip, limit=limit
     )
 
+@router.get(
+    "/producto/{producto_id}/export",
+    summary="Exportar el historial de movimientos de un producto (NDJSON / CSV)",
+    description="Exporta en streaming todos los movimientos del producto en orden cronológico.",
+)
+def export_movimientos_for_product(
+    producto_id: int,
+    file_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="Formato de salida"),
+    db: Session = Depends(get_db),
+):
+    db_producto = product_crud.get_product(db, product_id=producto_id)
+    if not db_producto:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Producto con ID {producto_id} no encontrado."
+        )
+    return export_response(
+        lambda: movimiento_inventario_crud.iter_movimientos_export(producto_id=producto_id),
+        columns=movimiento_inventario_crud.EXPORT_COLUMNS,
+        file_format=file_format,
+        filename=f"movimientos_producto_{producto_id}",
+    )
+
 # GET individual y DELETE para movimientos suelen ser menos comunes o tener lógica de negocio especial.
-# Por ahora, nos centramos en crear y listar por producto.
\ No newline at end of file
+# Por ahora, nos centramos en crear y listar por producto.
+
+
+@router.get(
+    "/stats",
+    response_model=movimiento_inventario_schemas.MovimientoStats,
+    summary="Estadísticas de movimientos por día, semana o mes",
+    description="Unidades de entrada / salida por periodo para un producto, una categoría, un proveedor "
+                "o todo el inventario, a partir del resumen diario (movimientos_diarios). "
+                "max_points agrupa periodos consecutivos para no superar ese número de puntos."
+)
+def read_movimientos_stats(
+    desde: Optional[date] = Query(None, description="Primer día (por defecto, hace 30 días)"),
+    hasta: Optional[date] = Query(None, description="Último día (por defecto, hoy UTC)"),
+    bucket: Literal["day", "week", "month"] = Query("day", description="Tamaño del periodo"),
+    producto_id: Optional[int] = Query(None, description="Filtrar por producto"),
+    category_id: Optional[int] = Query(None, description="Filtrar por categoría"),
+    proveedor_id: Optional[int] = Query(None, description="Filtrar por proveedor"),
+    max_points: Optional[int] = Query(None, ge=1, le=1000, description="Número máximo de puntos"),
+    db: Session = Depends(get_db),
+):
+    hasta = hasta or datetime.now(timezone.utc).date()
+    desde = desde or hasta - timedelta(days=30)
+    if desde > hasta:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'desde' no puede ser posterior a 'hasta'.")
+    if (hasta - desde).days > 366 * 10:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El rango no puede superar los 10 años.")
+    return movimiento_rollup_crud.get_stats(
+        db, desde=desde, hasta=hasta, bucket=bucket, producto_id=producto_id,
+        category_id=category_id, proveedor_id=proveedor_id, max_points=max_points,
+    )
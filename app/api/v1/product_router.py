@@ -1,14 +1,24 @@
 # app/api/v1/product_router.py
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import csv
+import functools
+import io
+import json
+from datetime import datetime, timezone
+from typing import Iterator, List, Literal, Optional, Tuple, Union
+from fastapi import APIRouter, Depends, File, HTTPException, status, Query, UploadFile
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db.database import get_db
 from app.schemas import product_schemas
-from app.crud import product_crud, category_crud
+from app.schemas.pagination_schemas import Page
+from app.crud import product_crud, stock_snapshot_crud
 from app.db import models # ¡NUEVA IMPORTACIÓN!
 from app.api.deps import get_current_active_user # ¡NUEVA IMPORTACIÓN!
+from app.api.streaming import export_response
+from app.api import fast_json, fieldsets
 
 router = APIRouter()
 
@@ -24,42 +34,233 @@ def create_product_endpoint(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user) # ¡AÑADIDO!
 ):
-    # ... (lógica existente para crear producto) ...
-    if product_in.category_id is not None:
-        category = category_crud.get_category(db, category_id=product_in.category_id)
-        if not category:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Category with ID {product_in.category_id} not found. Cannot create product."
-            )
-    
-    if product_in.codigo_sku:
-        existing_product_by_sku = product_crud.get_product_by_sku(db, sku=product_in.codigo_sku)
-        if existing_product_by_sku:
+    # La categoría y los duplicados los comprueban las restricciones de la base de datos
+    try:
+        return product_crud.create_product(db=db, product=product_in, responsable_id=current_user.id)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+# --- Importación masiva (CSV / NDJSON) ---
+
+def _iter_import_rows(upload: UploadFile, file_format: str) -> Iterator[Tuple[int, object]]:
+    """
+    Recorre el fichero subido fila a fila (sin cargarlo entero en memoria).
+    Produce (número de fila, dict con los campos) o (número de fila, Exception) si la fila no se puede leer.
+    """
+    text_stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    if file_format == "csv":
+        for row_number, row in enumerate(csv.DictReader(text_stream), start=1):
+            # Las celdas vacías se tratan como "no informadas" (se aplican los valores por defecto)
+            yield row_number, {k.strip(): v for k, v in row.items() if k and v not in (None, "")}
+    else:
+        row_number = 0
+        for line in text_stream:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                yield row_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_number, e
+
+
+@router.post(
+    "/import",
+    response_model=product_schemas.ProductImportResult,
+    summary="Importación masiva de productos (CSV / NDJSON)",
+    description="Importa productos desde un fichero CSV (con cabecera) o NDJSON (un objeto JSON por línea). "
+                "Las filas se validan contra ProductCreate y se escriben por lotes; "
+                "las filas inválidas se devuelven en 'errors' sin detener la importación. Requiere autenticación."
+)
+def import_products_endpoint(
+    file: UploadFile = File(..., description="Fichero .csv o .ndjson"),
+    file_format: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format", description="Formato del fichero (por defecto se deduce de la extensión)"),
+    on_duplicate: Literal["error", "update"] = Query("error", description="Qué hacer si el SKU ya existe"),
+    chunk_size: int = Query(1000, ge=1, le=10000, description="Filas por lote/transacción"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    if file_format is None:
+        filename = (file.filename or "").lower()
+        if filename.endswith(".csv"):
+            file_format = "csv"
+        elif filename.endswith((".ndjson", ".jsonl")):
+            file_format = "ndjson"
+        else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Product with SKU '{product_in.codigo_sku}' already exists."
+                detail="Cannot infer file format from the file name. Use format=csv or format=ndjson."
             )
-            
-    created_product = product_crud.create_product(db=db, product=product_in)
-    return created_product
+
+    result = product_schemas.ProductImportResult(total_rows=0, created=0, updated=0)
+    seen_skus: set = set()
+    seen_series: set = set()
+    chunk: List[Tuple[int, product_schemas.ProductCreate]] = []
+
+    def flush() -> None:
+        created, updated, errors = product_crud.import_products_chunk(
+            db, chunk, on_duplicate=on_duplicate, seen_skus=seen_skus, seen_series=seen_series,
+            responsable_id=current_user.id,
+        )
+        result.created += created
+        result.updated += updated
+        result.errors.extend(errors)
+        chunk.clear()
+
+    try:
+        for row_number, data in _iter_import_rows(file, file_format):
+            result.total_rows += 1
+            if isinstance(data, Exception) or not isinstance(data, dict):
+                result.errors.append(product_schemas.ProductImportError(row=row_number, error="Invalid row: not a JSON object."))
+                continue
+            try:
+                chunk.append((row_number, product_schemas.ProductCreate.model_validate(data)))
+            except ValidationError as e:
+                message = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                sku = data.get("codigo_sku") # En NDJSON puede no ser una cadena (ej: un número)
+                result.errors.append(product_schemas.ProductImportError(
+                    row=row_number, codigo_sku=None if sku is None else str(sku), error=message
+                ))
+                continue
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not read the file at row {result.total_rows + 1}: {e}"
+        )
+
+    return result
 
 
 @router.get(
     "/",
-    response_model=List[product_schemas.Product],
-    summary="Obtener lista de productos"
-    # No protegemos el listado por ahora
+    response_model=Union[List[product_schemas.Product], Page[product_schemas.Product]],
+    summary="Obtener lista de productos",
+    description="Paginación por offset (skip/limit, devuelve una lista) o por cursor "
+                "(pagination=cursor o cursor=..., devuelve {items, next_cursor})."
 )
 def read_products_endpoint(
     skip: int = 0,
     limit: int = 100,
     category_id: Optional[int] = Query(None, description="Filtrar productos por ID de categoría"),
+    pagination: Literal["offset", "cursor"] = Query("offset", description="Modo de paginación"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en 'next_cursor' por la página anterior"),
+    seleccion: Optional[fieldsets.Seleccion] = Depends(fieldsets.sparse_fields(product_schemas.Product)),
     db: Session = Depends(get_db)
 ):
-    # ... (lógica existente) ...
-    products = product_crud.get_products(db, skip=skip, limit=limit, category_id=category_id)
-    return products
+    # Con fields= las filas solo traen las columnas pedidas y se validan con un schema parcial
+    schema = product_schemas.Product if seleccion is None else fieldsets.partial_schema(product_schemas.Product, seleccion)
+    fast = settings.FAST_LIST_SERIALIZATION or seleccion is not None
+    if pagination == "cursor" or cursor:
+        if seleccion is not None:
+            get_page = functools.partial(product_crud.get_products_fields_keyset, seleccion=seleccion)
+        else:
+            get_page = product_crud.get_products_keyset_rows if fast else product_crud.get_products_keyset
+        try:
+            products, next_cursor = get_page(db, limit=limit, cursor=cursor, category_id=category_id)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        page = {"items": products, "next_cursor": next_cursor}
+        return fast_json.json_response(Page[schema], page) if fast else page
+
+    if seleccion is not None:
+        rows = product_crud.get_products_fields(db, seleccion, skip=skip, limit=limit, category_id=category_id)
+        return fast_json.json_response(List[schema], rows)
+    if fast:
+        rows = product_crud.get_products_rows(db, skip=skip, limit=limit, category_id=category_id)
+        return fast_json.json_response(List[schema], rows)
+    return product_crud.get_products(db, skip=skip, limit=limit, category_id=category_id)
+
+
+@router.get(
+    "/export",
+    summary="Exportar el catálogo de productos (NDJSON / CSV)",
+    description="Exporta todos los productos en streaming: la memoria del servidor no depende "
+                "del tamaño del catálogo y los primeros bytes se envían de inmediato."
+)
+def export_products_endpoint(
+    file_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="Formato de salida"),
+    category_id: Optional[int] = Query(None, description="Exportar solo los productos de esta categoría"),
+):
+    return export_response(
+        lambda: product_crud.iter_products_export(category_id=category_id),
+        columns=product_crud.EXPORT_COLUMNS,
+        file_format=file_format,
+        filename="products",
+    )
+
+
+@router.get(
+    "/search",
+    response_model=List[product_schemas.Product],
+    summary="Buscar productos",
+    description="Búsqueda por nombre, descripción, SKU y número de serie, ordenada por relevancia. "
+                "Cada término se busca como prefijo; una coincidencia exacta de SKU o número de serie va primero."
+)
+def search_products_endpoint(
+    q: str = Query(..., min_length=1, max_length=200, description="Texto a buscar"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    return product_crud.search_products(db, q=q, limit=limit)
+
+
+@router.get(
+    "/low-stock",
+    response_model=product_schemas.LowStockReport,
+    summary="Productos con stock bajo o agotados",
+    description="Productos en o por debajo de su stock mínimo, ordenados por déficit "
+                "(stock_minimo - stock_actual), con el recuento por categoría."
+)
+def read_low_stock_products_endpoint(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    category_id: Optional[int] = Query(None, description="Filtrar por ID de categoría"),
+    proveedor_id: Optional[int] = Query(None, description="Filtrar por ID de proveedor"),
+    solo_agotados: bool = Query(False, description="Solo productos sin stock (stock_actual <= 0)"),
+    db: Session = Depends(get_db)
+):
+    filtros = dict(category_id=category_id, proveedor_id=proveedor_id, solo_agotados=solo_agotados)
+    por_categoria = [
+        product_schemas.LowStockCategoryCount(
+            category_id=cat_id, category_name=cat_name, productos=productos, agotados=agotados
+        )
+        for cat_id, cat_name, productos, agotados in product_crud.count_low_stock_by_category(db, **filtros)
+    ]
+    return {
+        "total": sum(c.productos for c in por_categoria),
+        "agotados": sum(c.agotados for c in por_categoria),
+        "por_categoria": por_categoria,
+        "items": product_crud.get_low_stock_products(db, skip=skip, limit=limit, **filtros),
+    }
+
+
+@router.get(
+    "/stock",
+    response_model=List[product_schemas.ProductStock],
+    summary="Stock de los productos a una fecha",
+    description="Calcula el stock de una página de productos a la fecha as_of (por defecto, ahora) "
+                "a partir del último cierre de stock y los movimientos posteriores."
+)
+def read_products_stock_endpoint(
+    as_of: Optional[datetime] = Query(None, description="Fecha/hora de consulta (ISO 8601; sin zona = UTC)"),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    category_id: Optional[int] = Query(None, description="Filtrar productos por ID de categoría"),
+    db: Session = Depends(get_db)
+):
+    try:
+        return stock_snapshot_crud.get_stocks_as_of(
+            db, as_of=as_of or datetime.now(timezone.utc), skip=skip, limit=limit, category_id=category_id
+        )
+    except ValueError as e: # Fecha anterior al corte de la retención
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.get(
@@ -82,6 +283,28 @@ def read_product_endpoint(
     return db_product
 
 
+@router.get(
+    "/{product_id}/stock",
+    response_model=product_schemas.ProductStock,
+    summary="Stock de un producto a una fecha"
+)
+def read_product_stock_endpoint(
+    product_id: int,
+    as_of: Optional[datetime] = Query(None, description="Fecha/hora de consulta (ISO 8601; sin zona = UTC)"),
+    db: Session = Depends(get_db)
+):
+    try:
+        stock = stock_snapshot_crud.get_stock_as_of(db, product_id, as_of or datetime.now(timezone.utc))
+    except ValueError as e: # Fecha anterior al corte de la retención
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if stock is None: # La existencia del producto se comprueba en la misma consulta
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product with ID {product_id} not found"
+        )
+    return stock
+
+
 @router.put(
     "/{product_id}",
     response_model=product_schemas.Product,
@@ -94,31 +317,19 @@ def update_product_endpoint(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user) # ¡AÑADIDO!
 ):
-    # ... (lógica existente para actualizar producto, incluyendo verificaciones) ...
-    db_product_to_update = product_crud.get_product(db, product_id=product_id)
-    if db_product_to_update is None:
+    try:
+        updated_product = product_crud.update_product(
+            db=db, product_id=product_id, product_update=product_in, responsable_id=current_user.id
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if updated_product is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with ID {product_id} not found, cannot update."
         )
-
-    if product_in.category_id is not None and product_in.category_id != db_product_to_update.category_id:
-        category = category_crud.get_category(db, category_id=product_in.category_id)
-        if not category:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"New category with ID {product_in.category_id} not found. Cannot update product."
-            )
-
-    if product_in.codigo_sku is not None and product_in.codigo_sku != db_product_to_update.codigo_sku:
-        existing_product_by_sku = product_crud.get_product_by_sku(db, sku=product_in.codigo_sku)
-        if existing_product_by_sku and existing_product_by_sku.id != product_id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Another product with SKU '{product_in.codigo_sku}' already exists."
-            )
-            
-    updated_product = product_crud.update_product(db=db, product_id=product_id, product_update=product_in)
     return updated_product
 
 @router.delete(
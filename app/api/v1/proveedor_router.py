@@ -7,6 +7,7 @@ from app.schemas import proveedor_schemas
 from app.crud import proveedor_crud
 from app.db import models
 from app.api.deps import get_current_active_user
+from app.api import fast_json, fieldsets
 
 router = APIRouter()
 
@@ -20,9 +21,14 @@ def create_new_proveedor(
 
 @router.get("/", response_model=List[proveedor_schemas.Proveedor])
 def read_all_proveedores(
-    skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
+    skip: int = 0, limit: int = 100,
+    seleccion: Optional[fieldsets.Seleccion] = Depends(fieldsets.sparse_fields(proveedor_schemas.Proveedor)),
+    db: Session = Depends(get_db)
     # current_user: models.User = Depends(get_current_active_user), # Opcional proteger listado
 ):
+    if seleccion is not None: # fields=: solo las columnas pedidas
+        rows = proveedor_crud.get_proveedores_fields(db, seleccion, skip=skip, limit=limit)
+        return fast_json.json_response(List[fieldsets.partial_schema(proveedor_schemas.Proveedor, seleccion)], rows)
     return proveedor_crud.get_proveedores(db, skip=skip, limit=limit)
 
 @router.get("/{proveedor_id}", response_model=proveedor_schemas.Proveedor)
@@ -28,6 +28,53 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256" 
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30 
 
+    # Caché del usuario autenticado por token (ver app/security/principal_cache.py).
+    # AUTH_CACHE_TTL_SECONDS=0 o AUTH_CACHE_MAX_SIZE=0 la desactivan.
+    AUTH_CACHE_TTL_SECONDS: float = 60.0
+    AUTH_CACHE_MAX_SIZE: int = 10000
+
+    # Pool dedicado para bcrypt (ver app/security/password_pool.py).
+    # Con más de WORKERS + MAX_QUEUE operaciones en curso, login/registro responden 503.
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+
+    # --- Modo asíncrono de base de datos (AsyncEngine + asyncpg) ---
+    # Si DB_ASYNC_MODE es True, los endpoints usan AsyncSession y los CRUD de app/crud/aio.
+    # ASYNC_DATABASE_URL es opcional: si no se indica, se deriva de DATABASE_URL
+    # (postgresql:// -> postgresql+asyncpg://, sqlite:// -> sqlite+aiosqlite://).
+    DB_ASYNC_MODE: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # --- Caché HTTP del catálogo (ETag / If-None-Match, ver app/core/response_cache.py) ---
+    CATALOG_CACHE_ENABLED: bool = True
+    CATALOG_CACHE_MAX_AGE: int = 0  # Segundos en Cache-Control; 0 = el cliente revalida siempre con el ETag
+    # GET /categories/?include=stats: segundos durante los que se sirven los agregados cacheados
+    # aunque haya escrituras en el catálogo (0 = se recalculan tras cada escritura; requiere CATALOG_CACHE_ENABLED).
+    CATEGORY_STATS_CACHE_TTL_SECONDS: float = 0.0
+
+    # --- Serialización rápida de los listados (filas -> TypeAdapter -> JSON, ver app/api/fast_json.py) ---
+    FAST_LIST_SERIALIZATION: bool = True
+
+    # --- Métricas (endpoint /metrics en formato Prometheus, ver app/core/metrics.py) ---
+    METRICS_ENABLED: bool = True
+
+    # --- Inspector de consultas para desarrollo (N+1 y presupuesto, ver app/db/query_inspector.py) ---
+    QUERY_INSPECTOR_ENABLED: bool = False
+    QUERY_BUDGET: int = 0               # Máximo de consultas por petición (0 = sin límite)
+    N_PLUS_ONE_THRESHOLD: int = 5       # Repeticiones de una misma sentencia para avisar de un N+1
+
+    # --- Inventario ---
+    # Si es True, los movimientos que dejarían el stock de un producto en negativo se rechazan.
+    STOCK_NEGATIVE_GUARD: bool = False
+
+    # --- Pool de conexiones (aplica al motor síncrono y al asíncrono) ---
+    # Los valores por defecto son los de SQLAlchemy. Con SQLite se ignoran.
+    DB_POOL_SIZE: int = 5           # Conexiones persistentes en el pool
+    DB_MAX_OVERFLOW: int = 10       # Conexiones temporales extra por encima de DB_POOL_SIZE
+    DB_POOL_TIMEOUT: float = 30.0   # Segundos de espera por una conexión libre antes de fallar
+    DB_POOL_RECYCLE: int = -1       # Segundos tras los que se recicla una conexión (-1 = nunca)
+    DB_POOL_PRE_PING: bool = False  # Verifica la conexión (SELECT 1) antes de entregarla
+
     BACKEND_CORS_ORIGINS: Optional[Union[str, List[str]]] = None
 
     @field_validator("BACKEND_CORS_ORIGINS", mode='before')
@@ -0,0 +1,257 @@
+# app/core/metrics.py
+# Métricas de ejecución en formato de texto de Prometheus (endpoint /metrics).
+#
+# MetricsMiddleware mide cada petición HTTP por plantilla de ruta (ej: /api/v1/products/{product_id}):
+# número de peticiones por clase de estado, histograma de latencia, peticiones en curso y
+# consultas SQL por petición. Las consultas se cuentan con los eventos del motor de
+# SQLAlchemy (instrument_engine) y se asocian a la petición mediante una ContextVar.
+# Los valores son locales al proceso (Procfile arranca un solo worker).
+
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Límites (segundos) de los histogramas de latencia
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Límites del histograma de consultas SQL por petición
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Ruta usada para las peticiones que no coinciden con ninguna plantilla (limita la cardinalidad)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}" for labels, v in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Por etiquetas: [contadores por límite (no acumulados) + desbordamiento, suma, total]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, ([*state[0]], state[1], state[2])) for labels, state in self._values.items())
+        lines = self._header()
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts):
+                cumulative += n
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "Peticiones HTTP atendidas.", ("method", "route", "status_class")))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP (segundos).", ("method", "route")))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Peticiones HTTP en curso.", ("method",)))
+http_request_db_queries = registry.register(Histogram(
+    "http_request_db_queries", "Consultas SQL ejecutadas por petición HTTP.", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS))
+db_queries_total = registry.register(Counter(
+    "db_queries_total", "Consultas SQL ejecutadas.", ("engine",)))
+db_query_duration_seconds = registry.register(Histogram(
+    "db_query_duration_seconds", "Duración de las consultas SQL (segundos).", ("engine",)))
+db_pool_connections = registry.register(Gauge(
+    "db_pool_connections", "Conexiones del pool por estado (se actualiza al consultar /metrics).", ("engine", "state")))
+
+
+# --- Consultas SQL por petición ---
+
+class RequestStats:
+    """Contador de consultas SQL de la petición en curso."""
+    __slots__ = ("queries", "query_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+
+
+# Objeto mutable compartido: las copias del contexto (threadpool, greenlets) ven los mismos contadores
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Registra los eventos del motor que cuentan y cronometran las consultas SQL.
+    Para un AsyncEngine, pasar async_engine.sync_engine.
+    """
+    labels = (name,)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+        db_queries_total.inc(labels)
+        db_query_duration_seconds.observe(labels, elapsed)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        # La consulta falló: after_cursor_execute no se llamará para ella
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("metrics_query_start"):
+            conn.info["metrics_query_start"].pop()
+
+
+# --- Middleware ---
+
+def _route_template(scope: Scope) -> str:
+    # FastAPI deja la ruta que ha coincidido en scope["route"] durante el enrutado
+    route = scope.get("route")
+    if route is None and scope.get("app") is not None:
+        # La respuesta no pasó por el router (ej: 304 de CatalogCacheMiddleware): se busca la ruta
+        for candidate in scope["app"].router.routes:
+            if candidate.matches(scope)[0] == Match.FULL:
+                route = candidate
+                break
+    path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    return path or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que registra las métricas de cada petición HTTP.
+    Debe ser el más externo para medir también el resto de middlewares.
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        http_requests_in_flight.inc((method,))
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request_stats.reset(token)
+            http_requests_in_flight.dec((method,))
+            route = _route_template(scope)
+            http_requests_total.inc((method, route, f"{status_code // 100}xx"))
+            http_request_duration_seconds.observe((method, route), elapsed)
+            http_request_db_queries.observe((method, route), stats.queries)
@@ -0,0 +1,191 @@
+# app/core/response_cache.py
+# Caché de respuestas con ETag para los listados del catálogo (productos, categorías, proveedores).
+#
+# Cada recurso tiene un contador de generación en memoria que los CRUD de escritura
+# incrementan tras el commit (invalidate). El ETag se deriva de las generaciones de los
+# recursos de los que depende la ruta, de la URL y de un identificador del arranque del
+# proceso, de modo que una petición con If-None-Match vigente se responde con 304 sin
+# tocar la base de datos. Los contadores son locales al proceso: con varios workers,
+# las escrituras hechas en otro proceso no invalidan esta caché (Procfile arranca uno solo).
+# Tampoco las de los scripts: tras reconcile_stock.py --fix, que cambia stock_actual, hay que
+# reiniciar la API (o desactivar la caché con CATALOG_CACHE_ENABLED=false) para que deje de
+# servir el stock anterior. mantener_movimientos.py no cambia ninguna respuesta cacheada
+# (solo movimientos, que no forman parte de los listados del catálogo).
+
+import hashlib
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+PRODUCTS = "products"
+CATEGORIES = "categories"
+PROVEEDORES = "proveedores"
+
+_BOOT_ID = uuid.uuid4().hex
+_generations: Dict[str, int] = {PRODUCTS: 0, CATEGORIES: 0, PROVEEDORES: 0}
+_generations_lock = threading.Lock()
+
+
+def invalidate(*resources: str) -> None:
+    """
+    Marca como obsoletas las respuestas cacheadas de los recursos indicados.
+    Debe llamarse después del commit de la escritura.
+    """
+    with _generations_lock:
+        for resource in resources:
+            _generations[resource] = _generations.get(resource, 0) + 1
+
+
+def _generation_of(resources: Iterable[str]) -> Tuple[int, ...]:
+    with _generations_lock:
+        return tuple(_generations.get(resource, 0) for resource in resources)
+
+
+# Rutas cacheables -> recursos de los que depende su respuesta.
+# Los productos incluyen su categoría anidada, así que dependen también de las categorías.
+_CACHEABLE_ROUTES: List[Tuple[re.Pattern, Tuple[str, ...]]] = [
+    (re.compile(rf"^{re.escape(settings.API_V1_STR)}/products/$"), (PRODUCTS, CATEGORIES)),
+    (re.compile(rf"^{re.escape(settings.API_V1_STR)}/products/\d+$"), (PRODUCTS, CATEGORIES)),
+    (re.compile(rf"^{re.escape(settings.API_V1_STR)}/categories/$"), (CATEGORIES,)),
+    (re.compile(rf"^{re.escape(settings.API_V1_STR)}/proveedores/$"), (PROVEEDORES,)),
+]
+
+
+# Variantes de una ruta según la query: (ruta, parámetro, valor) -> (recursos adicionales, TTL).
+# Con TTL > 0 la respuesta cacheada se sigue sirviendo hasta TTL segundos después de guardarse
+# aunque cambie la generación: los agregados de categorías dependen del stock de los productos,
+# que cambia con cada movimiento.
+_QUERY_VARIANTS: Dict[Tuple[str, str, str], Tuple[Tuple[str, ...], float]] = {
+    (f"{settings.API_V1_STR}/categories/", "include", "stats"): ((PRODUCTS,), settings.CATEGORY_STATS_CACHE_TTL_SECONDS),
+}
+
+
+def _resources_for(path: str, params: List[Tuple[str, str]]) -> Tuple[Optional[Tuple[str, ...]], float]:
+    for pattern, resources in _CACHEABLE_ROUTES:
+        if pattern.match(path):
+            ttl = 0.0
+            for name, value in params:
+                variant = _QUERY_VARIANTS.get((path, name, value))
+                if variant is not None:
+                    resources, ttl = resources + variant[0], max(ttl, variant[1])
+            return resources, ttl
+    return None, 0.0
+
+
+class _CachedResponse:
+    __slots__ = ("generation", "etag", "status", "headers", "body", "stored_at")
+
+    def __init__(self, generation, etag, status, headers, body, stored_at):
+        self.generation = generation
+        self.etag = etag
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+
+class CatalogCacheMiddleware:
+    """
+    Middleware ASGI para los GET del catálogo:
+    - If-None-Match coincide con el ETag vigente -> 304 sin ejecutar el endpoint.
+    - Respuesta 200 ya cacheada para la misma generación (o dentro del TTL de su variante,
+      ver _QUERY_VARIANTS) -> se sirve desde memoria.
+    - En otro caso se ejecuta el endpoint y se guarda su respuesta (LRU acotada).
+    Todas las respuestas llevan ETag y Cache-Control.
+    """
+
+    def __init__(self, app: ASGIApp, max_entries: int = 512, max_body_bytes: int = 2 * 1024 * 1024):
+        self.app = app
+        self.max_entries = max_entries
+        self.max_body_bytes = max_body_bytes
+        self.cache_control = f"public, max-age={settings.CATALOG_CACHE_MAX_AGE}"
+        self._entries: "OrderedDict[str, _CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        params = sorted(parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True))
+        resources, ttl = _resources_for(scope["path"], params)
+        if resources is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = f"{scope['path']}?{urlencode(params)}"
+        generation = _generation_of(resources)
+        etag = '"' + hashlib.sha256(f"{_BOOT_ID}:{generation}:{key}".encode()).hexdigest()[:32] + '"'
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and (
+                cached.generation == generation or time.monotonic() - cached.stored_at < ttl
+            ):
+                self._entries.move_to_end(key)
+            else:
+                cached = None
+        if cached is not None: # Dentro del TTL el ETag vigente es el de la respuesta cacheada
+            etag = cached.etag
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+            await self._send_not_modified(send, etag)
+            return
+
+        if cached is not None:
+            await send({"type": "http.response.start", "status": cached.status, "headers": cached.headers})
+            await send({"type": "http.response.body", "body": cached.body})
+            return
+
+        start_message: Optional[Message] = None
+        body_parts: List[bytes] = []
+        body_size = 0
+        cacheable = True
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, body_size, cacheable
+            if message["type"] == "http.response.start":
+                start_message = message
+                if message["status"] == 200:
+                    headers = MutableHeaders(scope=message)
+                    headers["ETag"] = etag
+                    headers["Cache-Control"] = self.cache_control
+                else:
+                    cacheable = False
+            elif message["type"] == "http.response.body" and cacheable:
+                body_size += len(message.get("body", b""))
+                if body_size > self.max_body_bytes:
+                    cacheable = False
+                    body_parts.clear()
+                else:
+                    body_parts.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+        # Solo se guarda si no hubo escrituras mientras se generaba la respuesta
+        if cacheable and start_message is not None and _generation_of(resources) == generation:
+            entry = _CachedResponse(
+                generation, etag, 200, list(start_message["headers"]), b"".join(body_parts), time.monotonic()
+            )
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    async def _send_not_modified(self, send: Send, etag: str) -> None:
+        headers = MutableHeaders()
+        headers["ETag"] = etag
+        headers["Cache-Control"] = self.cache_control
+        await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,3 @@
+# app/crud/aio/__init__.py
+# Versiones asíncronas (AsyncSession) de los módulos CRUD de app/crud.
+# Se usan cuando settings.DB_ASYNC_MODE está activado.
@@ -0,0 +1,123 @@
+# app/crud/aio/category_crud.py
+
+from typing import List, Optional
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import models
+from app.schemas import category_schemas
+from app.core import response_cache # Invalidación de la caché HTTP del catálogo
+from app.crud.fieldsets import Projection, Seleccion
+from app.crud.category_crud import CATEGORY_RETURNING, categories_stats_stmt, raise_category_conflict
+
+# --- Operaciones de Lectura (Read) ---
+
+async def get_category(db: AsyncSession, category_id: int) -> Optional[models.Category]:
+    """
+    Obtiene una categoría específica por su ID.
+    Retorna el objeto Category o None si no se encuentra.
+    """
+    result = await db.execute(select(models.Category).where(models.Category.id == category_id))
+    return result.scalars().first()
+
+async def get_category_by_name(db: AsyncSession, name: str) -> Optional[models.Category]:
+    """
+    Obtiene una categoría específica por su nombre.
+    Retorna el objeto Category o None si no se encuentra.
+    """
+    result = await db.execute(select(models.Category).where(models.Category.name == name))
+    return result.scalars().first()
+
+async def get_categories(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[models.Category]:
+    """
+    Obtiene una lista de categorías, con paginación opcional.
+    """
+    result = await db.execute(select(models.Category).offset(skip).limit(limit))
+    return list(result.scalars().all())
+
+async def get_categories_fields(db: AsyncSession, seleccion: Seleccion, skip: int = 0, limit: int = 100) -> List[dict]:
+    """
+    Como get_categories, pero solo con los campos seleccionados (fields=).
+    """
+    proyeccion = Projection(models.Category, seleccion)
+    result = await db.execute(proyeccion.select().offset(skip).limit(limit))
+    return [proyeccion.to_dict(row) for row in result.all()]
+
+async def get_categories_stats(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[dict]:
+    """
+    Como get_categories, pero con product_count, total_units y stock_value por categoría (un solo GROUP BY).
+    """
+    result = await db.execute(categories_stats_stmt().offset(skip).limit(limit))
+    return [row._asdict() for row in result.all()]
+
+# --- Operación de Creación (Create) ---
+# Como en category_crud: INSERT / UPDATE / DELETE ... RETURNING, retornan dicts.
+
+async def create_category(db: AsyncSession, category: category_schemas.CategoryCreate) -> dict:
+    """
+    Crea una nueva categoría en la base de datos.
+    Lanza ValueError si ya existe una categoría con ese nombre.
+    """
+    try:
+        row = (await db.execute(
+            insert(models.Category).values(name=category.name, description=category.description)
+            .returning(*CATEGORY_RETURNING)
+        )).one()
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise_category_conflict(e, category.name)
+    response_cache.invalidate(response_cache.CATEGORIES)
+    return row._asdict()
+
+# --- Operación de Actualización (Update) ---
+
+async def update_category(
+    db: AsyncSession,
+    category_id: int,
+    category_update: category_schemas.CategoryUpdate
+) -> Optional[dict]:
+    """
+    Actualiza una categoría existente.
+    Retorna la categoría actualizada o None si no se encuentra.
+    Lanza ValueError si el nuevo nombre ya lo tiene otra categoría.
+    """
+    update_data = category_update.model_dump(exclude_unset=True)
+    if not update_data:
+        row = (await db.execute(select(*CATEGORY_RETURNING).where(models.Category.id == category_id))).one_or_none()
+        return row._asdict() if row is not None else None
+    try:
+        row = (await db.execute(
+            update(models.Category).where(models.Category.id == category_id).values(**update_data)
+            .returning(*CATEGORY_RETURNING).execution_options(synchronize_session=False)
+        )).one_or_none()
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise_category_conflict(e, update_data.get("name"), updating=True)
+    if row is None:
+        return None
+    response_cache.invalidate(response_cache.CATEGORIES)
+    return row._asdict()
+
+# --- Operación de Eliminación (Delete) ---
+
+async def delete_category(db: AsyncSession, category_id: int) -> Optional[dict]:
+    """
+    Elimina una categoría existente. Sus productos quedan sin categoría (category_id NULL).
+    Retorna la categoría eliminada o None si no se encuentra.
+    """
+    await db.execute(
+        update(models.Product).where(models.Product.category_id == category_id).values(category_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    row = (await db.execute(
+        delete(models.Category).where(models.Category.id == category_id)
+        .returning(*CATEGORY_RETURNING).execution_options(synchronize_session=False)
+    )).one_or_none()
+    await db.commit()
+    if row is None:
+        return None
+    response_cache.invalidate(response_cache.CATEGORIES) # Los listados de productos también dependen de CATEGORIES
+    return row._asdict()
@@ -0,0 +1,157 @@
+# app/crud/aio/movimiento_inventario_crud.py
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.core.config import settings
+from app.db import models
+from app.schemas import movimiento_inventario_schemas
+from app.core import response_cache # Invalidación de la caché HTTP del catálogo
+from app.crud.movimiento_inventario_crud import (
+    ajuste_producto_stmt, anterior_al_cursor, calcular_ajuste_stock, error_ajuste_rechazado, filas_stock_inicial,
+    insert_ajustes_a_stock_stmt, insert_movimiento_stmt, insert_stock_inicial_stmt, movimiento_creado_to_dict,
+    movimientos_producto_fields_stmt, movimientos_producto_fields_keyset_stmt,
+)
+from app.crud.fieldsets import Seleccion
+from app.crud.movimiento_rollup_crud import filas_incremento, incremento_stmt
+from app.crud.pagination import encode_cursor, decode_fecha_id_cursor
+
+async def get_movimiento(db: AsyncSession, movimiento_id: int) -> Optional[models.MovimientoInventario]:
+    result = await db.execute(
+        select(models.MovimientoInventario)
+        .options(
+            joinedload(models.MovimientoInventario.producto),
+            joinedload(models.MovimientoInventario.responsable)
+        )
+        .where(models.MovimientoInventario.id == movimiento_id)
+    )
+    return result.scalars().first()
+
+async def get_movimientos_por_producto(
+    db: AsyncSession, producto_id: int, skip: int = 0, limit: int = 100
+) -> List[models.MovimientoInventario]:
+    result = await db.execute(
+        select(models.MovimientoInventario)
+        .options(
+            joinedload(models.MovimientoInventario.producto),
+            joinedload(models.MovimientoInventario.responsable)
+        )
+        .where(models.MovimientoInventario.producto_id == producto_id)
+        .order_by(models.MovimientoInventario.fecha.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+async def get_movimientos_por_producto_keyset(
+    db: AsyncSession, producto_id: int, limit: int = 100, cursor: Optional[str] = None
+) -> Tuple[List[models.MovimientoInventario], Optional[str]]:
+    """
+    Movimientos de un producto, del más reciente al más antiguo, paginados por cursor (fecha, id).
+    Retorna (movimientos, next_cursor). Lanza ValueError si el cursor no es válido.
+    """
+    after = decode_fecha_id_cursor(cursor)
+    query = (
+        select(models.MovimientoInventario)
+        .options(
+            joinedload(models.MovimientoInventario.producto),
+            joinedload(models.MovimientoInventario.responsable)
+        )
+        .where(models.MovimientoInventario.producto_id == producto_id)
+    )
+    if after is not None:
+        query = query.where(anterior_al_cursor(after, db.get_bind().dialect.name))
+
+    result = await db.execute(
+        query.order_by(models.MovimientoInventario.fecha.desc(), models.MovimientoInventario.id.desc())
+        .limit(limit + 1)
+    )
+    movimientos = list(result.scalars().all())
+    if len(movimientos) <= limit:
+        return movimientos, None
+    movimientos = movimientos[:limit]
+    return movimientos, encode_cursor(fecha=movimientos[-1].fecha, id=movimientos[-1].id)
+
+async def get_movimientos_por_producto_fields(
+    db: AsyncSession, seleccion: Seleccion, producto_id: int, skip: int = 0, limit: int = 100
+) -> List[dict]:
+    proyeccion, stmt = movimientos_producto_fields_stmt(seleccion, producto_id)
+    result = await db.execute(stmt.order_by(models.MovimientoInventario.fecha.desc()).offset(skip).limit(limit))
+    return [proyeccion.to_dict(row) for row in result.all()]
+
+async def get_movimientos_por_producto_fields_keyset(
+    db: AsyncSession, seleccion: Seleccion, producto_id: int, limit: int = 100, cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Como get_movimientos_por_producto_keyset, pero solo con los campos seleccionados.
+    Lanza ValueError si el cursor no es válido.
+    """
+    proyeccion, stmt = movimientos_producto_fields_keyset_stmt(
+        seleccion, producto_id, limit, cursor, db.get_bind().dialect.name
+    )
+    return proyeccion.page((await db.execute(stmt)).all(), limit, "fecha", "id")
+
+async def _registrar_en_rollup(db: AsyncSession, movimientos) -> None:
+    """Versión asíncrona de movimiento_rollup_crud.registrar_movimientos. No hace commit."""
+    rollup_stmt = incremento_stmt(db.get_bind().dialect.name)
+    filas = filas_incremento(movimientos)
+    if rollup_stmt is not None and filas:
+        await db.execute(rollup_stmt, filas)
+
+async def registrar_stock_inicial(
+    db: AsyncSession, productos: Iterable[Tuple[int, int]], responsable_id: Optional[int]
+) -> None:
+    """
+    Versión asíncrona de movimiento_inventario_crud.registrar_stock_inicial. No hace commit.
+    """
+    filas = filas_stock_inicial(productos, responsable_id)
+    if filas:
+        creados = (await db.execute(insert_stock_inicial_stmt(), filas)).all()
+        await _registrar_en_rollup(db, creados)
+
+async def registrar_ajustes_a_stock(db: AsyncSession, stocks: Dict[int, int], responsable_id: Optional[int]) -> None:
+    """
+    Versión asíncrona de movimiento_inventario_crud.registrar_ajustes_a_stock.
+    Llamar antes del UPDATE que fija stock_actual. No hace commit.
+    """
+    if stocks:
+        creados = (await db.execute(insert_ajustes_a_stock_stmt(stocks, responsable_id))).all()
+        await _registrar_en_rollup(db, creados)
+
+async def create_movimiento_inventario(
+    db: AsyncSession,
+    movimiento: movimiento_inventario_schemas.MovimientoInventarioCreate,
+    responsable_id: int,
+    guard_negative: Optional[bool] = None
+) -> dict:
+    """
+    Versión asíncrona de movimiento_inventario_crud.create_movimiento_inventario:
+    ajuste de stock atómico y alta del movimiento en la misma transacción, con RETURNING.
+    Lanza LookupError si el producto no existe y ValueError si la guarda contra stock negativo lo impide.
+    """
+    if guard_negative is None:
+        guard_negative = settings.STOCK_NEGATIVE_GUARD
+
+    cantidad_a_ajustar = calcular_ajuste_stock(movimiento.tipo_movimiento, movimiento.cantidad)
+    try:
+        # 1. Ajustar el stock (y validar que el producto existe) de forma atómica
+        producto = (await db.execute(
+            ajuste_producto_stmt(movimiento.producto_id, cantidad_a_ajustar, guard_negative)
+        )).one_or_none()
+        if producto is None:
+            stock_actual = await db.scalar(
+                select(models.Product.stock_actual).where(models.Product.id == movimiento.producto_id)
+            )
+            raise error_ajuste_rechazado(movimiento.producto_id, cantidad_a_ajustar, stock_actual)
+
+        # 2. Crear el movimiento y sumarlo al resumen diario
+        fila = (await db.execute(insert_movimiento_stmt(movimiento, responsable_id))).one()
+        await _registrar_en_rollup(db, [fila])
+        await db.commit()
+        response_cache.invalidate(response_cache.PRODUCTS)
+    except Exception:
+        await db.rollback()
+        raise
+
+    return movimiento_creado_to_dict(movimiento, responsable_id, producto, fila)
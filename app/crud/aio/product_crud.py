@@ -0,0 +1,209 @@
+# app/crud/aio/product_crud.py
+
+from typing import List, Optional, Tuple
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.db import models
+from app.schemas import product_schemas
+from app.core import response_cache # Invalidación de la caché HTTP del catálogo
+from app.crud.pagination import encode_cursor, decode_id_cursor
+from app.crud.product_crud import (
+    PRODUCT_RETURNING, category_row_stmt, product_row_to_dict, product_write_to_dict, products_rows_stmt,
+    products_fields_stmt, products_fields_keyset_stmt, raise_product_conflict,
+)
+from app.crud.fieldsets import Seleccion
+from app.crud.aio import movimiento_inventario_crud # Movimientos de los cambios de stock (libro de movimientos)
+
+# --- Operaciones de Lectura (Read) ---
+
+async def get_product(db: AsyncSession, product_id: int) -> Optional[models.Product]:
+    """
+    Obtiene un producto específico por su ID, incluyendo su categoría.
+    """
+    result = await db.execute(
+        select(models.Product)
+        .options(joinedload(models.Product.category))
+        .where(models.Product.id == product_id)
+    )
+    return result.scalars().first()
+
+async def get_products(
+    db: AsyncSession, skip: int = 0, limit: int = 100, category_id: Optional[int] = None
+) -> List[models.Product]:
+    """
+    Obtiene una lista de productos, con paginación opcional y filtro por category_id.
+    Incluye las categorías de los productos.
+    """
+    query = select(models.Product).options(joinedload(models.Product.category))
+
+    if category_id is not None:
+        query = query.where(models.Product.category_id == category_id)
+
+    result = await db.execute(query.offset(skip).limit(limit))
+    return list(result.scalars().all())
+
+async def get_products_keyset(
+    db: AsyncSession, limit: int = 100, cursor: Optional[str] = None, category_id: Optional[int] = None
+) -> Tuple[List[models.Product], Optional[str]]:
+    """
+    Obtiene una página de productos usando paginación por cursor (keyset) sobre el id.
+    Retorna (productos, next_cursor). Lanza ValueError si el cursor no es válido.
+    """
+    after_id = decode_id_cursor(cursor)
+    query = select(models.Product).options(joinedload(models.Product.category))
+
+    if category_id is not None:
+        query = query.where(models.Product.category_id == category_id)
+    if after_id is not None:
+        query = query.where(models.Product.id > after_id)
+
+    result = await db.execute(query.order_by(models.Product.id).limit(limit + 1))
+    products = list(result.scalars().all())
+    if len(products) <= limit:
+        return products, None
+    products = products[:limit]
+    return products, encode_cursor(id=products[-1].id)
+
+async def get_products_rows(
+    db: AsyncSession, skip: int = 0, limit: int = 100, category_id: Optional[int] = None
+) -> List[dict]:
+    """
+    Como get_products, pero devuelve dicts listos para validar contra product_schemas.Product.
+    """
+    result = await db.execute(products_rows_stmt(category_id).offset(skip).limit(limit))
+    return [product_row_to_dict(row) for row in result.all()]
+
+async def get_products_keyset_rows(
+    db: AsyncSession, limit: int = 100, cursor: Optional[str] = None, category_id: Optional[int] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Como get_products_keyset, pero devuelve dicts. Lanza ValueError si el cursor no es válido.
+    """
+    after_id = decode_id_cursor(cursor)
+    stmt = products_rows_stmt(category_id)
+    if after_id is not None:
+        stmt = stmt.where(models.Product.id > after_id)
+    rows = (await db.execute(stmt.order_by(models.Product.id).limit(limit + 1))).all()
+    products = [product_row_to_dict(row) for row in rows[:limit]]
+    if len(rows) <= limit:
+        return products, None
+    return products, encode_cursor(id=products[-1]["id"])
+
+async def get_products_fields(
+    db: AsyncSession, seleccion: Seleccion, skip: int = 0, limit: int = 100, category_id: Optional[int] = None
+) -> List[dict]:
+    """
+    Como get_products, pero solo con los campos seleccionados.
+    """
+    proyeccion, stmt = products_fields_stmt(seleccion, category_id)
+    result = await db.execute(stmt.offset(skip).limit(limit))
+    return [proyeccion.to_dict(row) for row in result.all()]
+
+async def get_products_fields_keyset(
+    db: AsyncSession, seleccion: Seleccion, limit: int = 100, cursor: Optional[str] = None, category_id: Optional[int] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Como get_products_keyset, pero solo con los campos seleccionados. Lanza ValueError si el cursor no es válido.
+    """
+    proyeccion, stmt = products_fields_keyset_stmt(seleccion, limit, cursor, category_id)
+    return proyeccion.page((await db.execute(stmt)).all(), limit, "id")
+
+async def get_product_by_sku(db: AsyncSession, sku: str) -> Optional[models.Product]:
+    """
+    Obtiene un producto específico por su código SKU.
+    """
+    if not sku:
+        return None
+    result = await db.execute(select(models.Product).where(models.Product.codigo_sku == sku))
+    return result.scalars().first()
+
+# --- Operación de Creación (Create) ---
+
+async def create_product(db: AsyncSession, product: product_schemas.ProductCreate, responsable_id: Optional[int] = None) -> dict:
+    """
+    Versión asíncrona de product_crud.create_product: INSERT ... RETURNING, sin comprobaciones
+    previas, y el movimiento AJUSTE_INICIAL del stock inicial. Lanza LookupError si la
+    categoría no existe y ValueError si el SKU o el número de serie ya existen.
+    """
+    data = product.model_dump()
+    try:
+        row = (await db.execute(insert(models.Product).values(**data).returning(*PRODUCT_RETURNING))).one()
+        await movimiento_inventario_crud.registrar_stock_inicial(db, [(row.id, row.stock_actual)], responsable_id)
+        category = (await db.execute(category_row_stmt(row.category_id))).one() if row.category_id is not None else None
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise_product_conflict(e, data)
+    response_cache.invalidate(response_cache.PRODUCTS)
+    return product_write_to_dict(row, category)
+
+# --- Ajuste Atómico de Stock ---
+
+async def adjust_stock(db: AsyncSession, product_id: int, delta: int, guard_negative: bool = False) -> Optional[int]:
+    """
+    Versión asíncrona de product_crud.adjust_stock: UPDATE ... SET stock_actual = stock_actual + :delta
+    ... RETURNING, con guarda opcional contra stock negativo. No hace commit.
+    Retorna el nuevo stock, o None si el producto no existe o la guarda lo impidió.
+    """
+    query = update(models.Product).where(models.Product.id == product_id)
+    if guard_negative:
+        query = query.where(models.Product.stock_actual + delta >= 0)
+    result = await db.execute(
+        query.values(stock_actual=models.Product.stock_actual + delta)
+        .returning(models.Product.stock_actual)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none()
+
+# --- Operación de Actualización (Update) ---
+
+async def update_product(
+    db: AsyncSession, product_id: int, product_update: product_schemas.ProductUpdate, responsable_id: Optional[int] = None
+) -> Optional[dict]:
+    """
+    Versión asíncrona de product_crud.update_product: UPDATE ... RETURNING, con el movimiento
+    de ajuste si cambia stock_actual. Retorna None si el producto no existe.
+    """
+    data = product_update.model_dump(exclude_unset=True)
+    if not data:
+        row = (await db.execute(products_rows_stmt().where(models.Product.id == product_id))).one_or_none()
+        return product_row_to_dict(row) if row is not None else None
+    try:
+        if data.get("stock_actual") is not None:
+            await movimiento_inventario_crud.registrar_ajustes_a_stock(db, {product_id: data["stock_actual"]}, responsable_id)
+        row = (await db.execute(
+            update(models.Product).where(models.Product.id == product_id).values(**data)
+            .returning(*PRODUCT_RETURNING).execution_options(synchronize_session=False)
+        )).one_or_none()
+        if row is None:
+            await db.rollback()
+            return None
+        category = (await db.execute(category_row_stmt(row.category_id))).one() if row.category_id is not None else None
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise_product_conflict(e, data, updating=True)
+    response_cache.invalidate(response_cache.PRODUCTS)
+    return product_write_to_dict(row, category)
+
+# --- Operación de Eliminación (Delete) ---
+
+async def delete_product(db: AsyncSession, product_id: int) -> Optional[dict]:
+    """
+    Elimina un producto existente y su historial de movimientos, sin cargarlos en la sesión.
+    Retorna el producto eliminado como dict, o None si no existe.
+    """
+    row = (await db.execute(products_rows_stmt().where(models.Product.id == product_id))).one_or_none()
+    if row is None:
+        return None
+    await db.execute(
+        delete(models.MovimientoInventario).where(models.MovimientoInventario.producto_id == product_id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(delete(models.Product).where(models.Product.id == product_id).execution_options(synchronize_session=False))
+    await db.commit()
+    response_cache.invalidate(response_cache.PRODUCTS)
+    return product_row_to_dict(row)
@@ -0,0 +1,64 @@
+# app/crud/aio/proveedor_crud.py
+from typing import List, Optional
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import models
+from app.schemas import proveedor_schemas
+from app.core import response_cache # Invalidación de la caché HTTP del catálogo
+from app.crud.fieldsets import Projection, Seleccion
+from app.crud.proveedor_crud import PROVEEDOR_RETURNING
+
+async def get_proveedor(db: AsyncSession, proveedor_id: int) -> Optional[models.Proveedor]:
+    result = await db.execute(select(models.Proveedor).where(models.Proveedor.id == proveedor_id))
+    return result.scalars().first()
+
+async def get_proveedores(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[models.Proveedor]:
+    result = await db.execute(select(models.Proveedor).offset(skip).limit(limit))
+    return list(result.scalars().all())
+
+async def get_proveedores_fields(db: AsyncSession, seleccion: Seleccion, skip: int = 0, limit: int = 100) -> List[dict]:
+    # Como get_proveedores, pero solo con los campos seleccionados (fields=)
+    proyeccion = Projection(models.Proveedor, seleccion)
+    result = await db.execute(proyeccion.select().offset(skip).limit(limit))
+    return [proyeccion.to_dict(row) for row in result.all()]
+
+# Como en proveedor_crud: INSERT / UPDATE / DELETE ... RETURNING, retornan dicts.
+
+async def create_proveedor(db: AsyncSession, proveedor: proveedor_schemas.ProveedorCreate) -> dict:
+    row = (await db.execute(
+        insert(models.Proveedor).values(**proveedor.model_dump()).returning(*PROVEEDOR_RETURNING)
+    )).one()
+    await db.commit()
+    response_cache.invalidate(response_cache.PROVEEDORES)
+    return row._asdict()
+
+async def update_proveedor(db: AsyncSession, proveedor_id: int, proveedor_update: proveedor_schemas.ProveedorUpdate) -> Optional[dict]:
+    update_data = proveedor_update.model_dump(exclude_unset=True)
+    if not update_data:
+        row = (await db.execute(select(*PROVEEDOR_RETURNING).where(models.Proveedor.id == proveedor_id))).one_or_none()
+        return row._asdict() if row is not None else None
+    row = (await db.execute(
+        update(models.Proveedor).where(models.Proveedor.id == proveedor_id).values(**update_data)
+        .returning(*PROVEEDOR_RETURNING).execution_options(synchronize_session=False)
+    )).one_or_none()
+    await db.commit()
+    if row is None:
+        return None
+    response_cache.invalidate(response_cache.PROVEEDORES)
+    return row._asdict()
+
+async def delete_proveedor(db: AsyncSession, proveedor_id: int) -> Optional[dict]:
+    # Los productos del proveedor quedan sin proveedor (proveedor_id NULL)
+    await db.execute(
+        update(models.Product).where(models.Product.proveedor_id == proveedor_id).values(proveedor_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    row = (await db.execute(
+        delete(models.Proveedor).where(models.Proveedor.id == proveedor_id)
+        .returning(*PROVEEDOR_RETURNING).execution_options(synchronize_session=False)
+    )).one_or_none()
+    await db.commit()
+    if row is None:
+        return None
+    response_cache.invalidate(response_cache.PROVEEDORES)
+    return row._asdict()
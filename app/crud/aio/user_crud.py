@@ -0,0 +1,93 @@
+# app/crud/aio/user_crud.py
+
+from typing import Optional
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import models
+from app.schemas import user_schemas
+from app.security.password_pool import get_password_hash_async, verify_password_async
+from app.security.principal_cache import principal_cache # Para invalidar el usuario cacheado
+from app.crud.user_crud import USER_RETURNING, raise_user_conflict
+
+# --- Operaciones de Lectura (Read) ---
+
+async def get_user(db: AsyncSession, user_id: int) -> Optional[models.User]:
+    """
+    Obtiene un usuario específico por su ID.
+    """
+    result = await db.execute(select(models.User).where(models.User.id == user_id))
+    return result.scalars().first()
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
+    """
+    Obtiene un usuario específico por su correo electrónico.
+    """
+    if not email:
+        return None
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[models.User]:
+    """
+    Obtiene un usuario específico por su nombre de usuario.
+    """
+    result = await db.execute(select(models.User).where(models.User.username == username))
+    return result.scalars().first()
+
+# --- Operación de Creación (Create) ---
+
+async def create_user(db: AsyncSession, user: user_schemas.UserCreate) -> dict:
+    """
+    Crea un nuevo usuario en la base de datos con un INSERT ... RETURNING.
+    La contraseña se hashea en el pool de contraseñas, sin bloquear el event loop.
+    Lanza ValueError si el nombre de usuario o el correo ya están registrados.
+    """
+    hashed_password = await get_password_hash_async(user.password)
+    try:
+        row = (await db.execute(
+            insert(models.User).values(
+                username=user.username,
+                email=user.email,
+                hashed_password=hashed_password,
+                is_active=True
+            ).returning(*USER_RETURNING)
+        )).one()
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise_user_conflict(e, user)
+    return row._asdict()
+
+# --- Operación de Autenticación ---
+
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[models.User]:
+    """
+    Autentica a un usuario.
+    Busca al usuario por nombre de usuario y verifica su contraseña en el pool de contraseñas.
+    Lanza PasswordPoolSaturated si el pool está lleno.
+    """
+    user = await get_user_by_username(db, username=username)
+    if not user:
+        return None
+    if not await verify_password_async(password, user.hashed_password):
+        return None
+    return user
+
+# --- Operaciones de Actualización (Update) ---
+
+async def update_user_activity(db: AsyncSession, user_id: int, is_active: bool) -> Optional[models.User]:
+    """
+    Actualiza el estado 'is_active' de un usuario.
+    """
+    db_user = await get_user(db, user_id=user_id)
+    if not db_user:
+        return None
+
+    db_user.is_active = is_active
+    await db.commit()
+    await db.refresh(db_user)
+    # Los tokens cacheados de este usuario deben volver a leer su estado
+    principal_cache.invalidate_user(db_user.id)
+    return db_user
@@ -1,10 +1,15 @@
 # app/crud/category_crud.py
 
-from typing import List, Optional
+from typing import List, NoReturn, Optional
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.db import models
 from app.schemas import category_schemas
+from app.core import response_cache # Invalidación de la caché HTTP del catálogo
+from app.crud.fieldsets import Projection, Seleccion
+from app.crud import integrity
 
 # --- Operaciones de Lectura (Read) ---
 
@@ -30,21 +35,69 @@ def get_categories(db: Session, skip: int = 0, limit: int = 100) -> List[models.
     """
     return db.query(models.Category).offset(skip).limit(limit).all()
 
+def get_categories_fields(db: Session, seleccion: Seleccion, skip: int = 0, limit: int = 100) -> List[dict]:
+    """
+    Como get_categories, pero solo con los campos seleccionados (fields=).
+    """
+    proyeccion = Projection(models.Category, seleccion)
+    return [proyeccion.to_dict(row) for row in db.execute(proyeccion.select().offset(skip).limit(limit)).all()]
+
+def categories_stats_stmt():
+    """
+    Categorías con sus agregados en un único GROUP BY sobre products (LEFT JOIN: las categorías
+    sin productos salen con ceros). Se comparte con app/crud/aio.
+    """
+    return (
+        select(
+            *CATEGORY_RETURNING,
+            func.count(models.Product.id).label("product_count"),
+            func.coalesce(func.sum(models.Product.stock_actual), 0).label("total_units"),
+            func.coalesce(func.sum(models.Product.price * models.Product.stock_actual), 0.0).label("stock_value"),
+        )
+        .outerjoin(models.Product, models.Product.category_id == models.Category.id)
+        .group_by(*CATEGORY_RETURNING)
+        .order_by(models.Category.id)
+    )
+
+def get_categories_stats(db: Session, skip: int = 0, limit: int = 100) -> List[dict]:
+    """
+    Como get_categories, pero cada categoría incluye product_count, total_units y stock_value
+    (formato de category_schemas.CategoryWithStats). Una sola consulta, sea cual sea el número de categorías.
+    """
+    return [row._asdict() for row in db.execute(categories_stats_stmt().offset(skip).limit(limit)).all()]
+
 # --- Operación de Creación (Create) ---
+# Las escrituras usan INSERT / UPDATE / DELETE ... RETURNING y retornan un dict con el formato de
+# category_schemas.Category; la unicidad del nombre la garantiza la restricción UNIQUE.
 
-def create_category(db: Session, category: category_schemas.CategoryCreate) -> models.Category:
+CATEGORY_RETURNING = (models.Category.id, models.Category.name, models.Category.description)
+
+def raise_category_conflict(error: IntegrityError, name: Optional[str], updating: bool = False) -> NoReturn:
+    """
+    ValueError si el nombre ya lo tiene otra categoría; cualquier otra violación se relanza.
+    Se comparte con app/crud/aio.
+    """
+    if integrity.is_violation(error, integrity.UNIQUE, "name"):
+        prefix = "Another category" if updating else "Category"
+        raise ValueError(f"{prefix} with name '{name}' already exists.")
+    raise error
+
+def create_category(db: Session, category: category_schemas.CategoryCreate) -> dict:
     """
     Crea una nueva categoría en la base de datos.
-    Retorna el objeto Category recién creado.
+    Lanza ValueError si ya existe una categoría con ese nombre.
     """
-    db_category = models.Category(
-        name=category.name,
-        description=category.description
-    )
-    db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
-    return db_category
+    try:
+        row = db.execute(
+            insert(models.Category).values(name=category.name, description=category.description)
+            .returning(*CATEGORY_RETURNING)
+        ).one()
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise_category_conflict(e, category.name)
+    response_cache.invalidate(response_cache.CATEGORIES)
+    return row._asdict()
 
 # --- Operación de Actualización (Update) ---
 
@@ -52,42 +105,48 @@ def update_category(
     db: Session,
     category_id: int,
     category_update: category_schemas.CategoryUpdate
-) -> Optional[models.Category]:
+) -> Optional[dict]:
     """
     Actualiza una categoría existente.
-    Retorna el objeto Category actualizado o None si no se encuentra.
+    Retorna la categoría actualizada o None si no se encuentra.
+    Lanza ValueError si el nuevo nombre ya lo tiene otra categoría.
     """
-    db_category = get_category(db, category_id=category_id)
-    if not db_category:
+    # Solo los campos enviados en la solicitud
+    update_data = category_update.model_dump(exclude_unset=True)
+    if not update_data:
+        row = db.execute(select(*CATEGORY_RETURNING).where(models.Category.id == category_id)).one_or_none()
+        return row._asdict() if row is not None else None
+    try:
+        row = db.execute(
+            update(models.Category).where(models.Category.id == category_id).values(**update_data)
+            .returning(*CATEGORY_RETURNING).execution_options(synchronize_session=False)
+        ).one_or_none()
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise_category_conflict(e, update_data.get("name"), updating=True)
+    if row is None:
         return None
-
-    # Obtiene los datos del schema de Pydantic como un diccionario,
-    # excluyendo los campos que no se establecieron (None por defecto en el schema Update)
-    # o que no se enviaron en la solicitud.
-    update_data = category_update.model_dump(exclude_unset=True) # Para Pydantic v2
-    # Si usaras Pydantic v1, sería: update_data = category_update.dict(exclude_unset=True)
-
-
-    for key, value in update_data.items():
-        setattr(db_category, key, value)
-
-    db.add(db_category) # SQLAlchemy es lo suficientemente inteligente para saber si es un INSERT o UPDATE
-    db.commit()
-    db.refresh(db_category)
-    return db_category
+    response_cache.invalidate(response_cache.CATEGORIES)
+    return row._asdict()
 
 # --- Operación de Eliminación (Delete) ---
 
-def delete_category(db: Session, category_id: int) -> Optional[models.Category]:
+def delete_category(db: Session, category_id: int) -> Optional[dict]:
     """
-    Elimina una categoría existente.
-    Retorna el objeto Category eliminado o None si no se encuentra.
-    (Podrías también retornar solo un booleano o el id si la eliminación fue exitosa).
+    Elimina una categoría existente. Sus productos quedan sin categoría (category_id NULL).
+    Retorna la categoría eliminada o None si no se encuentra.
     """
-    db_category = get_category(db, category_id=category_id)
-    if not db_category:
-        return None
-
-    db.delete(db_category)
+    db.execute(
+        update(models.Product).where(models.Product.category_id == category_id).values(category_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    row = db.execute(
+        delete(models.Category).where(models.Category.id == category_id)
+        .returning(*CATEGORY_RETURNING).execution_options(synchronize_session=False)
+    ).one_or_none()
     db.commit()
-    return db_category # El objeto aún contiene los datos de lo que fue eliminado
\ No newline at end of file
+    if row is None:
+        return None
+    response_cache.invalidate(response_cache.CATEGORIES) # Los listados de productos también dependen de CATEGORIES
+    return row._asdict()
@@ -0,0 +1,69 @@
+# app/crud/fieldsets.py
+# Proyección SQL de una selección de campos (ver app/api/fieldsets.py): solo se seleccionan
+# las columnas pedidas y solo se hace JOIN con las relaciones de las que se pide algún campo.
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+
+from app.crud.pagination import encode_cursor
+
+# (campo, None) para columnas; (relación, (subcampo, ...)) para objetos anidados
+Seleccion = Tuple[Tuple[str, Optional[Tuple[str, ...]]], ...]
+
+
+class Projection:
+    """
+    Columnas de un modelo para una selección de campos y conversión de las filas a dicts.
+
+    relaciones: campo anidado -> (modelo relacionado, condición del JOIN). Los JOIN son
+    externos y se detecta la relación vacía (null) con la clave primaria del relacionado.
+    claves: columnas que se seleccionan siempre al principio de la fila (ej: las del cursor
+    de paginación) aunque no se hayan pedido; no aparecen en el dict.
+    """
+
+    def __init__(self, modelo, seleccion: Seleccion, relaciones: Optional[Dict[str, tuple]] = None, claves: Sequence = ()):
+        self.modelo = modelo
+        self.claves = tuple(claves)
+        self.columnas = list(self.claves)
+        self.joins = []
+        self._plan = [] # (campo, posición en la fila, subcampos)
+        for nombre, sub in seleccion:
+            if sub is None:
+                self._plan.append((nombre, len(self.columnas), None))
+                self.columnas.append(getattr(modelo, nombre))
+            else:
+                relacionado, condicion = relaciones[nombre]
+                self.joins.append((relacionado, condicion))
+                self._plan.append((nombre, len(self.columnas), sub))
+                self.columnas.append(relacionado.id) # Detecta la relación vacía en el JOIN externo
+                self.columnas.extend(getattr(relacionado, s) for s in sub)
+
+    def select(self):
+        stmt = select(*self.columnas).select_from(self.modelo)
+        for relacionado, condicion in self.joins:
+            stmt = stmt.outerjoin(relacionado, condicion)
+        return stmt
+
+    def to_dict(self, row) -> dict:
+        resultado = {}
+        for nombre, i, sub in self._plan:
+            if sub is None:
+                resultado[nombre] = row[i]
+            else:
+                resultado[nombre] = None if row[i] is None else dict(zip(sub, row[i + 1:i + 1 + len(sub)]))
+        return resultado
+
+    def clave(self, row) -> tuple:
+        """Valores de las columnas 'claves' de la fila."""
+        return tuple(row[:len(self.claves)])
+
+    def page(self, rows, limit: int, *nombres_cursor: str) -> Tuple[List[dict], Optional[str]]:
+        """
+        Página (dicts, next_cursor) a partir de las limit + 1 filas de una consulta por cursor.
+        nombres_cursor: nombre en el cursor de cada columna clave, en orden (ej: "fecha", "id").
+        """
+        items = [self.to_dict(row) for row in rows[:limit]]
+        if len(rows) <= limit:
+            return items, None
+        return items, encode_cursor(**dict(zip(nombres_cursor, self.clave(rows[limit - 1]))))
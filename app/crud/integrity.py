@@ -0,0 +1,54 @@
+# app/crud/integrity.py
+# Traducción de los IntegrityError de la base de datos.
+#
+# Las escrituras no consultan antes (SELECT previo) lo que ya garantizan las restricciones
+# UNIQUE y FOREIGN KEY: intentan la escritura y, si falla, identifican la restricción
+# violada para responder con el mismo error que daba la comprobación previa. Además de
+# ahorrar consultas, no hay carrera entre la comprobación y la escritura.
+
+import re
+from typing import NamedTuple, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+UNIQUE = "unique"
+FOREIGN_KEY = "foreign_key"
+
+# SQLSTATE de PostgreSQL (psycopg2: pgcode, asyncpg: sqlstate)
+_SQLSTATES = {"23505": UNIQUE, "23503": FOREIGN_KEY}
+# PostgreSQL: 'DETAIL:  Key (codigo_sku)=(X) already exists.'
+_PG_COLUMN = re.compile(r"Key \(([^)]+)\)=")
+# SQLite: 'UNIQUE constraint failed: products.codigo_sku' (en las FOREIGN KEY no indica la columna)
+_SQLITE_UNIQUE = re.compile(r"UNIQUE constraint failed: \w+\.(\w+)")
+
+
+class Violation(NamedTuple):
+    kind: Optional[str]    # UNIQUE, FOREIGN_KEY o None (otra restricción: NOT NULL, CHECK...)
+    column: Optional[str]  # Columna implicada, si el motor la indica
+
+
+def violation(error: IntegrityError) -> Violation:
+    """
+    Restricción violada en un IntegrityError (PostgreSQL o SQLite).
+    """
+    message = str(error.orig)
+    code = getattr(error.orig, "pgcode", None) or getattr(error.orig, "sqlstate", None)
+    kind = _SQLSTATES.get(code)
+    if kind is None:
+        lowered = message.lower()
+        if "unique constraint" in lowered:
+            kind = UNIQUE
+        elif "foreign key constraint" in lowered:
+            kind = FOREIGN_KEY
+    match = _PG_COLUMN.search(message) or _SQLITE_UNIQUE.search(message)
+    return Violation(kind, match.group(1) if match else None)
+
+
+def is_violation(error: IntegrityError, kind: str, column: str) -> bool:
+    """
+    True si el error es una violación de ese tipo sobre esa columna. Si el motor no indica
+    la columna (FOREIGN KEY en SQLite), basta con el tipo: quien llama debe usarlo solo
+    cuando la escritura no puede violar otra restricción de ese tipo.
+    """
+    found = violation(error)
+    return found.kind == kind and found.column in (None, column)
@@ -1,11 +1,17 @@
 # app/crud/movimiento_inventario_crud.py
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func # Para sumas y lógica de stock
+from sqlalchemy import Integer, case, func, insert, literal, select, tuple_, update # Para sumas y lógica de stock
 
+from app.core.config import settings
 from app.db import models
+from app.db.database import SessionLocal
 from app.schemas import movimiento_inventario_schemas
-from app.crud import product_crud # Para actualizar el stock del producto
+from app.core import response_cache # Invalidación de la caché HTTP del catálogo
+from app.crud import movimiento_rollup_crud # Resumen diario para las estadísticas
+from app.crud.pagination import encode_cursor, decode_fecha_id_cursor
+from app.crud.fieldsets import Projection, Seleccion
 
 def get_movimiento(db: Session, movimiento_id: int) -> Optional[models.MovimientoInventario]:
     return (
@@ -34,45 +40,417 @@ def get_movimientos_por_producto(
         .all()
     )
 
+# strftime normaliza a milisegundos los dos formatos de fecha que puede haber en SQLite
+SQLITE_FECHA_CURSOR = "%Y-%m-%d %H:%M:%f"
+
+def anterior_al_cursor(after: Tuple[datetime, int], dialecto: str):
+    """
+    Condición keyset (fecha, id) < cursor del historial de movimientos.
+    En SQLite fecha es texto y su formato depende de quién la escribió: CURRENT_TIMESTAMP
+    (server_default) la guarda sin microsegundos y SQLAlchemy enlaza el cursor con ellos, así
+    que la comparación directa también aceptaba las filas ya devueltas y la paginación no
+    terminaba nunca. Ahí se comparan los dos lados normalizados. Se comparte con app/crud/aio.
+    """
+    fecha, movimiento_id = after
+    columna_fecha = models.MovimientoInventario.fecha
+    if dialecto == "sqlite":
+        return tuple_(
+            func.strftime(SQLITE_FECHA_CURSOR, columna_fecha), models.MovimientoInventario.id
+        ) < tuple_(func.strftime(SQLITE_FECHA_CURSOR, fecha), movimiento_id)
+    return tuple_(columna_fecha, models.MovimientoInventario.id) < tuple_(fecha, movimiento_id)
+
+def get_movimientos_por_producto_keyset(
+    db: Session, producto_id: int, limit: int = 100, cursor: Optional[str] = None
+) -> Tuple[List[models.MovimientoInventario], Optional[str]]:
+    """
+    Movimientos de un producto, del más reciente al más antiguo, paginados por cursor (fecha, id).
+    Retorna (movimientos, next_cursor); next_cursor es None si no hay más páginas.
+    Lanza ValueError si el cursor no es válido.
+    """
+    after = decode_fecha_id_cursor(cursor)
+    query = (
+        db.query(models.MovimientoInventario)
+        .options(
+            joinedload(models.MovimientoInventario.producto),
+            joinedload(models.MovimientoInventario.responsable)
+        )
+        .filter(models.MovimientoInventario.producto_id == producto_id)
+    )
+    if after is not None:
+        query = query.filter(anterior_al_cursor(after, db.get_bind().dialect.name))
+
+    movimientos = (
+        query.order_by(models.MovimientoInventario.fecha.desc(), models.MovimientoInventario.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    if len(movimientos) <= limit:
+        return movimientos, None
+    movimientos = movimientos[:limit]
+    return movimientos, encode_cursor(fecha=movimientos[-1].fecha, id=movimientos[-1].id)
+
+# --- Historial con selección de campos (fields=, ver app/crud/fieldsets.py) ---
+
+MOVIMIENTO_RELATIONS = {
+    "producto": (models.Product, models.MovimientoInventario.producto_id == models.Product.id),
+    "responsable": (models.User, models.MovimientoInventario.responsable_id == models.User.id),
+}
+
+def movimientos_producto_fields_stmt(
+    seleccion: Seleccion, producto_id: int, claves: Tuple = ()
+) -> Tuple[Projection, object]:
+    """
+    Proyección y consulta del historial de un producto con los campos seleccionados (producto
+    y responsable solo se unen si se piden). Se comparte con app/crud/aio.
+    """
+    proyeccion = Projection(models.MovimientoInventario, seleccion, MOVIMIENTO_RELATIONS, claves=claves)
+    stmt = proyeccion.select().where(models.MovimientoInventario.producto_id == producto_id)
+    return proyeccion, stmt
+
+def movimientos_producto_fields_keyset_stmt(
+    seleccion: Seleccion, producto_id: int, limit: int, cursor: Optional[str], dialecto: str
+) -> Tuple[Projection, object]:
+    """
+    Como movimientos_producto_fields_stmt, para una página por cursor (fecha, id).
+    Lanza ValueError si el cursor no es válido.
+    """
+    after = decode_fecha_id_cursor(cursor)
+    proyeccion, stmt = movimientos_producto_fields_stmt(
+        seleccion, producto_id, claves=(models.MovimientoInventario.fecha, models.MovimientoInventario.id)
+    )
+    if after is not None:
+        stmt = stmt.where(anterior_al_cursor(after, dialecto))
+    stmt = stmt.order_by(models.MovimientoInventario.fecha.desc(), models.MovimientoInventario.id.desc())
+    return proyeccion, stmt.limit(limit + 1)
+
+def get_movimientos_por_producto_fields(
+    db: Session, seleccion: Seleccion, producto_id: int, skip: int = 0, limit: int = 100
+) -> List[dict]:
+    proyeccion, stmt = movimientos_producto_fields_stmt(seleccion, producto_id)
+    stmt = stmt.order_by(models.MovimientoInventario.fecha.desc()).offset(skip).limit(limit)
+    return [proyeccion.to_dict(row) for row in db.execute(stmt).all()]
+
+def get_movimientos_por_producto_fields_keyset(
+    db: Session, seleccion: Seleccion, producto_id: int, limit: int = 100, cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Como get_movimientos_por_producto_keyset, pero solo con los campos seleccionados.
+    Lanza ValueError si el cursor no es válido.
+    """
+    proyeccion, stmt = movimientos_producto_fields_keyset_stmt(
+        seleccion, producto_id, limit, cursor, db.get_bind().dialect.name
+    )
+    return proyeccion.page(db.execute(stmt).all(), limit, "fecha", "id")
+
+# Columnas de la exportación del historial de movimientos
+EXPORT_COLUMNS = ["id", "producto_id", "fecha", "tipo_movimiento", "cantidad", "responsable_id", "notas"]
+
+def iter_movimientos_export(producto_id: int, batch_size: int = 1000) -> Iterator[tuple]:
+    """
+    Recorre el historial completo de un producto en orden cronológico (fecha, id)
+    con un cursor del lado del servidor (stream_results + yield_per).
+    Abre y cierra su propia sesión: está pensada para consumirse desde una StreamingResponse.
+    """
+    query = (
+        select(*(getattr(models.MovimientoInventario, column) for column in EXPORT_COLUMNS))
+        .where(models.MovimientoInventario.producto_id == producto_id)
+        .order_by(models.MovimientoInventario.fecha, models.MovimientoInventario.id)
+    )
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+        for row in result:
+            yield tuple(row)
+    finally:
+        db.close()
+
+# Saldo de apertura que sustituye a los movimientos archivados por la retención
+# (movimiento_particion_crud): su cantidad es el valor absoluto de la suma con signo de los
+# archivados, con el tipo negativo si la suma lo es (la cantidad de un movimiento es siempre positiva).
+TIPO_SALDO_APERTURA = "SALDO_APERTURA"
+TIPO_SALDO_APERTURA_NEGATIVO = "SALDO_APERTURA_NEGATIVO"
+TIPOS_SALDO_APERTURA = {TIPO_SALDO_APERTURA, TIPO_SALDO_APERTURA_NEGATIVO}
+
+# Movimientos que registran los cambios de stock hechos desde los productos (ver más abajo)
+TIPO_AJUSTE_INICIAL = "AJUSTE_INICIAL"
+TIPO_AJUSTE_CONTEO_MAS = "AJUSTE_CONTEO_MAS"
+TIPO_AJUSTE_CONTEO_MENOS = "AJUSTE_CONTEO_MENOS"
+
+# Tipos de movimiento que suman / restan stock. Incluye los tipos que genera seed_db.py
+# (ENTRADA_PROVEEDOR, SALIDA_VENTA, AJUSTE_CONTEO_*, DEVOLUCION_CLIENTE).
+TIPOS_ENTRADA = {
+    "ENTRADA", "ENTRADA_PROVEEDOR", "AJUSTE_POSITIVO", TIPO_AJUSTE_INICIAL,
+    TIPO_AJUSTE_CONTEO_MAS, "DEVOLUCION", "DEVOLUCION_CLIENTE", TIPO_SALDO_APERTURA,
+}
+TIPOS_SALIDA = {"SALIDA", "SALIDA_VENTA", "AJUSTE_NEGATIVO", TIPO_AJUSTE_CONTEO_MENOS, TIPO_SALDO_APERTURA_NEGATIVO}
+
+def calcular_ajuste_stock(tipo_movimiento: str, cantidad: int) -> int:
+    """
+    Devuelve la variación de stock (con signo) que produce un movimiento.
+    Los tipos no reconocidos no ajustan el stock (devuelve 0).
+    """
+    if tipo_movimiento.upper() in TIPOS_ENTRADA:
+        return cantidad
+    elif tipo_movimiento.upper() in TIPOS_SALIDA:
+        return -cantidad
+    # Tipo de movimiento no reconocido, no ajustar stock.
+    # Opcional: raise ValueError(f"Tipo de movimiento '{tipo_movimiento}' no reconocido para ajuste de stock.")
+    return 0
+
+def expresion_ajuste_stock():
+    """
+    Equivalente SQL de calcular_ajuste_stock sobre las columnas de MovimientoInventario,
+    para agregar variaciones de stock en la base de datos (SUM(...)).
+    """
+    tipo = func.upper(models.MovimientoInventario.tipo_movimiento)
+    return case(
+        (tipo.in_(sorted(TIPOS_ENTRADA)), models.MovimientoInventario.cantidad),
+        (tipo.in_(sorted(TIPOS_SALIDA)), -models.MovimientoInventario.cantidad),
+        else_=0,
+    )
+
+# --- Movimientos de los cambios de stock hechos desde los productos ---
+# stock_actual debe ser siempre la suma de los movimientos del producto: la reconciliación
+# (stock_reconciliation_crud) y el stock a una fecha (stock_snapshot_crud) parten de ello.
+# Por eso el alta con stock inicial, la importación y la edición de stock_actual registran
+# también su movimiento, en la misma transacción que el INSERT / UPDATE del producto.
+
+MOVIMIENTO_STOCK_RETURNING = (
+    models.MovimientoInventario.producto_id, models.MovimientoInventario.tipo_movimiento,
+    models.MovimientoInventario.cantidad, models.MovimientoInventario.fecha,
+)
+
+def filas_stock_inicial(productos: Iterable[Tuple[int, int]], responsable_id: Optional[int]) -> List[dict]:
+    """
+    Filas del INSERT multi-fila de los AJUSTE_INICIAL de productos recién creados,
+    a partir de (producto_id, stock_actual). Los creados sin stock no generan movimiento.
+    Se comparte con app/crud/aio.
+    """
+    return [
+        {"producto_id": producto_id, "tipo_movimiento": TIPO_AJUSTE_INICIAL, "cantidad": stock,
+         "responsable_id": responsable_id}
+        for producto_id, stock in productos if stock
+    ]
+
+def insert_stock_inicial_stmt():
+    """INSERT ... RETURNING de las filas de filas_stock_inicial. Se comparte con app/crud/aio."""
+    return insert(models.MovimientoInventario).returning(*MOVIMIENTO_STOCK_RETURNING)
+
+def insert_ajustes_a_stock_stmt(stocks: Dict[int, int], responsable_id: Optional[int]):
+    """
+    INSERT ... SELECT ... RETURNING de los movimientos que llevan el stock de cada producto
+    (producto_id -> stock nuevo) al valor indicado: AJUSTE_CONTEO_MAS o AJUSTE_CONTEO_MENOS por
+    la diferencia con el stock actual, o ninguno si no cambia. Debe ejecutarse antes del UPDATE
+    del producto: lee el stock anterior con FOR UPDATE (en PostgreSQL las filas quedan bloqueadas
+    hasta el commit; en SQLite el INSERT ya toma el bloqueo de escritura). Se comparte con app/crud/aio.
+    """
+    producto = models.Product
+    diferencia = case(stocks, value=producto.id) - producto.stock_actual
+    origen = (
+        select(
+            producto.id,
+            case((diferencia > 0, TIPO_AJUSTE_CONTEO_MAS), else_=TIPO_AJUSTE_CONTEO_MENOS),
+            func.abs(diferencia),
+            literal(responsable_id, Integer),
+        )
+        .where(producto.id.in_(stocks), diferencia != 0)
+        .order_by(producto.id)
+        .with_for_update()
+    )
+    return insert(models.MovimientoInventario).from_select(
+        ["producto_id", "tipo_movimiento", "cantidad", "responsable_id"], origen
+    ).returning(*MOVIMIENTO_STOCK_RETURNING)
+
+def registrar_stock_inicial(db: Session, productos: Iterable[Tuple[int, int]], responsable_id: Optional[int]) -> None:
+    """
+    Registra el AJUSTE_INICIAL de los productos recién creados (producto_id, stock_actual)
+    y lo suma al resumen diario. No hace commit.
+    """
+    filas = filas_stock_inicial(productos, responsable_id)
+    if filas:
+        creados = db.execute(insert_stock_inicial_stmt(), filas).all()
+        movimiento_rollup_crud.registrar_movimientos(db, creados)
+
+def registrar_ajustes_a_stock(db: Session, stocks: Dict[int, int], responsable_id: Optional[int]) -> None:
+    """
+    Registra los movimientos de insert_ajustes_a_stock_stmt y los suma al resumen diario.
+    Llamar antes del UPDATE que fija stock_actual. No hace commit.
+    """
+    if stocks:
+        creados = db.execute(insert_ajustes_a_stock_stmt(stocks, responsable_id)).all()
+        movimiento_rollup_crud.registrar_movimientos(db, creados)
+
+# --- Alta de un movimiento: tres sentencias (ajuste del stock, INSERT y resumen diario) ---
+
+def ajuste_producto_stmt(producto_id: int, delta: int, guard_negative: bool):
+    """
+    UPDATE atómico del stock (como product_crud.adjust_stock) que además retorna los campos
+    del producto anidado en la respuesta; sin ajuste (delta 0), un SELECT de esos campos.
+    Sin filas: el producto no existe o la guarda contra stock negativo lo impidió.
+    Se comparte con app/crud/aio.
+    """
+    columnas = (models.Product.id, models.Product.name, models.Product.codigo_sku)
+    if delta == 0:
+        return select(*columnas).where(models.Product.id == producto_id)
+    stmt = update(models.Product).where(models.Product.id == producto_id)
+    if guard_negative:
+        stmt = stmt.where(models.Product.stock_actual + delta >= 0)
+    return (
+        stmt.values(stock_actual=models.Product.stock_actual + delta)
+        .returning(*columnas)
+        .execution_options(synchronize_session=False)
+    )
+
+def insert_movimiento_stmt(movimiento: movimiento_inventario_schemas.MovimientoInventarioCreate, responsable_id: Optional[int]):
+    """
+    INSERT ... RETURNING del movimiento: id, fecha (server_default) y el nombre del responsable
+    (subconsulta), para responder sin volver a leer el movimiento, y las columnas que suma el
+    resumen diario. Se comparte con app/crud/aio.
+    """
+    responsable = select(models.User.username).where(models.User.id == responsable_id).scalar_subquery()
+    return insert(models.MovimientoInventario).values(
+        **movimiento.model_dump(), responsable_id=responsable_id
+    ).returning(models.MovimientoInventario.id, *MOVIMIENTO_STOCK_RETURNING, responsable.label("responsable_username"))
+
+def movimiento_creado_to_dict(
+    movimiento: movimiento_inventario_schemas.MovimientoInventarioCreate, responsable_id: Optional[int], producto, fila
+) -> dict:
+    """Respuesta (formato de MovimientoInventario) a partir de las filas de ajuste_producto_stmt e insert_movimiento_stmt."""
+    return {
+        **movimiento.model_dump(),
+        "id": fila.id,
+        "fecha": fila.fecha,
+        "responsable": None if fila.responsable_username is None else {
+            "id": responsable_id, "username": fila.responsable_username,
+        },
+        "producto": {"id": producto.id, "name": producto.name, "codigo_sku": producto.codigo_sku},
+    }
+
+def error_ajuste_rechazado(producto_id: int, delta: int, stock_actual: Optional[int]) -> Exception:
+    """
+    El ajuste no afectó a ninguna fila: LookupError si el producto no existe (stock_actual None)
+    y ValueError si la guarda contra stock negativo lo impidió. Se comparte con app/crud/aio.
+    """
+    if stock_actual is None:
+        return LookupError(f"Producto con ID {producto_id} no encontrado. No se puede crear movimiento.")
+    return ValueError(
+        f"Stock insuficiente para el producto {producto_id}: stock actual {stock_actual}, ajuste {delta}."
+    )
+
 def create_movimiento_inventario(
     db: Session,
     movimiento: movimiento_inventario_schemas.MovimientoInventarioCreate,
-    responsable_id: int
-) -> models.MovimientoInventario:
-    # 1. Validar que el producto exista
-    db_producto = product_crud.get_product(db, product_id=movimiento.producto_id) # Corregido
-    if not db_producto:
-        # Esta validación debería estar en el router para lanzar HTTPException
-        # Aquí simplemente no procedemos o podríamos lanzar un ValueError
-        raise ValueError(f"Producto con ID {movimiento.producto_id} no encontrado.")
-
-    # 2. Crear el movimiento
-    db_movimiento = models.MovimientoInventario(
-        **movimiento.model_dump(),
-        responsable_id=responsable_id
-        # fecha se establece por server_default si no se pasa
+    responsable_id: int,
+    guard_negative: Optional[bool] = None
+) -> dict:
+    """
+    Registra un movimiento y ajusta el stock del producto en la misma transacción.
+    El ajuste es un UPDATE atómico (ver product_crud.adjust_stock), por lo que dos
+    movimientos concurrentes sobre el mismo producto no pierden actualizaciones.
+    Lanza LookupError si el producto no existe y, con la guarda activa
+    (settings.STOCK_NEGATIVE_GUARD por defecto), ValueError si el stock quedaría en negativo.
+    Retorna un dict con el formato de MovimientoInventario, armado con los RETURNING del
+    UPDATE y del INSERT (sin volver a leer el movimiento ni sus relaciones).
+    """
+    if guard_negative is None:
+        guard_negative = settings.STOCK_NEGATIVE_GUARD
+
+    cantidad_a_ajustar = calcular_ajuste_stock(movimiento.tipo_movimiento, movimiento.cantidad)
+    try:
+        # 1. Ajustar el stock (y validar que el producto existe) de forma atómica
+        producto = db.execute(ajuste_producto_stmt(movimiento.producto_id, cantidad_a_ajustar, guard_negative)).one_or_none()
+        if producto is None:
+            stock_actual = db.scalar(select(models.Product.stock_actual).where(models.Product.id == movimiento.producto_id))
+            raise error_ajuste_rechazado(movimiento.producto_id, cantidad_a_ajustar, stock_actual)
+
+        # 2. Crear el movimiento (fecha se establece por server_default) y sumarlo al resumen diario
+        fila = db.execute(insert_movimiento_stmt(movimiento, responsable_id)).one()
+        movimiento_rollup_crud.registrar_movimientos(db, [fila])
+        db.commit()
+        response_cache.invalidate(response_cache.PRODUCTS)
+    except Exception:
+        db.rollback()
+        raise
+
+    return movimiento_creado_to_dict(movimiento, responsable_id, producto, fila)
+
+def create_movimientos_batch(
+    db: Session,
+    movimientos: List[movimiento_inventario_schemas.MovimientoInventarioCreate],
+    responsable_id: int,
+    guard_negative: Optional[bool] = None
+) -> movimiento_inventario_schemas.MovimientoInventarioBatchResult:
+    """
+    Registra un lote de movimientos en una única transacción.
+    La variación neta de stock se agrega por producto y se aplica con un solo UPDATE;
+    los movimientos se insertan con un INSERT multi-fila. Si algo falla, no se aplica nada.
+    La guarda contra stock negativo se aplica al resultado neto de cada producto: el lote es
+    atómico, así que un orden en el que el stock pasaría por negativo (p. ej. una SALIDA
+    antes de la ENTRADA que la cubre) se acepta si el stock final no es negativo.
+    Lanza LookupError si algún producto no existe, y ValueError si con la guarda activa
+    (settings.STOCK_NEGATIVE_GUARD por defecto) algún stock quedaría en negativo.
+    """
+    if guard_negative is None:
+        guard_negative = settings.STOCK_NEGATIVE_GUARD
+
+    producto_ids = {m.producto_id for m in movimientos}
+    deltas: Dict[int, int] = {producto_id: 0 for producto_id in producto_ids}
+    for m in movimientos:
+        deltas[m.producto_id] += calcular_ajuste_stock(m.tipo_movimiento, m.cantidad)
+
+    try:
+        # Bloquea los productos en orden de id (y comprueba que existen) antes de modificarlos:
+        # el UPDATE multi-fila bloquea las filas en el orden en que las recorre, y dos lotes
+        # concurrentes con productos en común podían bloquearse mutuamente (deadlock) en
+        # PostgreSQL. Es el mismo orden que insert_ajustes_a_stock_stmt. SQLite ignora FOR UPDATE
+        # (serializa las escrituras de toda la base de datos).
+        existentes = set(db.scalars(
+            select(models.Product.id).where(models.Product.id.in_(producto_ids))
+            .order_by(models.Product.id).with_for_update()
+        ))
+        faltantes = sorted(producto_ids - existentes)
+        if faltantes:
+            raise LookupError(f"Productos no encontrados: {faltantes}. No se registró ningún movimiento.")
+
+        # Mismo orden de bloqueos que create_movimiento_inventario (productos, y después
+        # movimientos y resumen diario): con otro orden, en PostgreSQL un lote y un alta
+        # concurrentes del mismo producto se bloqueaban mutuamente (deadlock).
+        con_cambio = {producto_id: delta for producto_id, delta in deltas.items() if delta != 0}
+        stock_final: Dict[int, int] = {}
+        if con_cambio:
+            delta_expr = case(con_cambio, value=models.Product.id, else_=0)
+            query = update(models.Product).where(models.Product.id.in_(con_cambio))
+            if guard_negative:
+                query = query.where(models.Product.stock_actual + delta_expr >= 0)
+            result = db.execute(
+                query.values(stock_actual=models.Product.stock_actual + delta_expr)
+                .returning(models.Product.id, models.Product.stock_actual)
+                .execution_options(synchronize_session=False)
+            )
+            stock_final = dict(result.all())
+            rechazados = sorted(set(con_cambio) - set(stock_final))
+            if rechazados:
+                raise ValueError(f"Stock insuficiente para los productos {rechazados}. No se registró ningún movimiento.")
+        creados = db.execute(
+            insert(models.MovimientoInventario).returning(*MOVIMIENTO_STOCK_RETURNING),
+            [{**m.model_dump(), "responsable_id": responsable_id} for m in movimientos]
+        ).all()
+        movimiento_rollup_crud.registrar_movimientos(db, creados)
+        sin_cambio = set(deltas) - set(stock_final)
+        if sin_cambio:
+            stock_final.update(db.execute(
+                select(models.Product.id, models.Product.stock_actual).where(models.Product.id.in_(sin_cambio))
+            ).all())
+        db.commit()
+        response_cache.invalidate(response_cache.PRODUCTS)
+    except Exception:
+        db.rollback()
+        raise
+
+    return movimiento_inventario_schemas.MovimientoInventarioBatchResult(
+        movimientos_creados=len(movimientos),
+        productos=[
+            movimiento_inventario_schemas.StockDelta(producto_id=producto_id, delta=deltas[producto_id], stock_actual=stock_final[producto_id])
+            for producto_id in sorted(deltas)
+        ],
     )
-    db.add(db_movimiento)
-    
-    # 3. Actualizar el stock del producto
-    # Es crucial que esto sea atómico con la creación del movimiento (dentro de la misma transacción)
-    cantidad_a_ajustar = 0
-    if movimiento.tipo_movimiento.upper() in ["ENTRADA", "AJUSTE_POSITIVO", "AJUSTE_INICIAL"]:
-        cantidad_a_ajustar = movimiento.cantidad
-    elif movimiento.tipo_movimiento.upper() in ["SALIDA", "AJUSTE_NEGATIVO"]:
-        cantidad_a_ajustar = -movimiento.cantidad
-    else:
-        # Tipo de movimiento no reconocido, no ajustar stock o lanzar error
-        # Por ahora, no ajustamos si el tipo no es conocido.
-        pass 
-        # Opcional: raise ValueError(f"Tipo de movimiento '{movimiento.tipo_movimiento}' no reconocido para ajuste de stock.")
-
-
-    if cantidad_a_ajustar != 0:
-        db_producto.stock_actual = (db_producto.stock_actual or 0) + cantidad_a_ajustar
-        db.add(db_producto) # Marcar el producto como modificado
-
-    db.commit()
-    db.refresh(db_movimiento)
-    # Para que las relaciones se carguen:
-    return get_movimiento(db, movimiento_id=db_movimiento.id)
\ No newline at end of file
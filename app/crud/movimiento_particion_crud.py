@@ -0,0 +1,266 @@
+# app/crud/movimiento_particion_crud.py
+
+import csv
+import gzip
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import DateTime, case, delete, func, insert, literal, select, text
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.crud import movimiento_inventario_crud # EXPORT_COLUMNS / expresion_ajuste_stock (import circular: se usan en tiempo de llamada)
+
+# En PostgreSQL, movimientos_inventario está particionada por rango mensual de fecha (UTC):
+# movimientos_inventario_pAAAA_MM, más movimientos_inventario_default para las fechas sin
+# partición. asegurar_particiones crea las de los próximos meses (y reparte lo que haya
+# caído en la DEFAULT); si la tabla no está particionada (otros dialectos, o PostgreSQL con
+# create_all) no hace nada y la retención borra con DELETE.
+#
+# Retención: los movimientos anteriores a una fecha de corte (inicio de mes) se archivan en
+# un CSV comprimido por mes y se sustituyen por un saldo de apertura por producto, con
+# fecha = corte: SALDO_APERTURA por la suma con signo de los archivados, o
+# SALDO_APERTURA_NEGATIVO por su valor absoluto si es negativa. Así el historial, el stock
+# a una fecha posterior al corte y la reconciliación siguen funcionando sobre la tabla; las
+# consultas anteriores al corte ya no se pueden responder (ver comprobar_no_archivada).
+
+TABLA = models.MovimientoInventario.__tablename__
+PARTICION_DEFAULT = f"{TABLA}_default"
+_PATRON_PARTICION = re.compile(rf"^{TABLA}_p(\d{{4}})_(\d{{2}})$")
+
+
+class ResultadoArchivo(NamedTuple):
+    fecha_corte: datetime
+    movimientos: int               # Filas archivadas
+    saldos: int                    # Saldos de apertura escritos
+    archivos: List[str]
+
+
+def inicio_mes(fecha: date) -> date:
+    return date(fecha.year, fecha.month, 1)
+
+def mes_siguiente(mes: date) -> date:
+    return date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+
+def sumar_meses(mes: date, meses: int) -> date:
+    indice = mes.year * 12 + mes.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+def _instante(mes: date) -> datetime:
+    return datetime(mes.year, mes.month, mes.day, tzinfo=timezone.utc)
+
+def nombre_particion(mes: date) -> str:
+    return f"{TABLA}_p{mes:%Y_%m}"
+
+# --- Particiones (solo PostgreSQL) ---
+
+def es_particionada(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:tabla))"),
+        {"tabla": TABLA},
+    ).scalar()
+
+def get_particiones(db: Session) -> List[date]:
+    """
+    Meses con partición propia, en orden (sin la DEFAULT).
+    """
+    nombres = db.execute(
+        text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+             "WHERE i.inhparent = to_regclass(:tabla)"),
+        {"tabla": TABLA},
+    ).scalars()
+    return sorted(
+        date(int(m.group(1)), int(m.group(2)), 1)
+        for m in map(_PATRON_PARTICION.match, nombres) if m
+    )
+
+def get_meses_en_default(db: Session) -> List[date]:
+    """
+    Meses con filas en la partición DEFAULT (no se creó su partición a tiempo).
+    """
+    return list(db.execute(text(
+        f"SELECT DISTINCT date_trunc('month', fecha AT TIME ZONE 'UTC')::date FROM {PARTICION_DEFAULT} ORDER BY 1"
+    )).scalars())
+
+def crear_particion(db: Session, mes: date) -> None:
+    """
+    Crea la partición del mes. Si la DEFAULT tiene filas de ese mes, se mueven a la nueva
+    partición antes de adjuntarla (ATTACH rechaza solapes con la DEFAULT). Hace commit.
+    """
+    nombre = nombre_particion(mes)
+    rango = {"desde": _instante(mes), "hasta": _instante(mes_siguiente(mes))}
+    limites = f"FROM ('{mes.isoformat()} 00:00:00+00') TO ('{mes_siguiente(mes).isoformat()} 00:00:00+00')"
+    try:
+        en_default = db.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {PARTICION_DEFAULT} WHERE fecha >= :desde AND fecha < :hasta)"), rango
+        ).scalar()
+        if en_default:
+            db.execute(text(f"CREATE TABLE {nombre} (LIKE {TABLA} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+            db.execute(text(
+                f"WITH movidas AS (DELETE FROM {PARTICION_DEFAULT} WHERE fecha >= :desde AND fecha < :hasta RETURNING *) "
+                f"INSERT INTO {nombre} SELECT * FROM movidas"
+            ), rango)
+            db.execute(text(f"ALTER TABLE {TABLA} ATTACH PARTITION {nombre} FOR VALUES {limites}"))
+        else:
+            db.execute(text(f"CREATE TABLE {nombre} PARTITION OF {TABLA} FOR VALUES {limites}"))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+def asegurar_particiones(db: Session, desde: date, hasta: date) -> List[str]:
+    """
+    Crea las particiones que falten de los meses entre desde y hasta (incluidos) y las de
+    los meses con filas en la DEFAULT. Devuelve los nombres de las particiones creadas.
+    Sin efecto si la tabla no está particionada.
+    """
+    if not es_particionada(db):
+        return []
+    existentes = set(get_particiones(db))
+    meses = set(get_meses_en_default(db))
+    mes = inicio_mes(desde)
+    while mes <= hasta:
+        meses.add(mes)
+        mes = mes_siguiente(mes)
+    creadas = []
+    for mes in sorted(meses - existentes):
+        crear_particion(db, mes)
+        creadas.append(nombre_particion(mes))
+    return creadas
+
+# --- Retención ---
+
+def get_fecha_corte(db: Session) -> Optional[datetime]:
+    """
+    Inicio del historial disponible: los movimientos anteriores están archivados (None si no hay).
+    """
+    corte = db.execute(select(func.max(models.MovimientoArchivado.fecha_corte))).scalar()
+    if corte is not None and corte.tzinfo is None: # SQLite no guarda la zona horaria
+        corte = corte.replace(tzinfo=timezone.utc)
+    return corte
+
+def comprobar_no_archivada(db: Session, fecha: datetime) -> None:
+    """
+    ValueError si la fecha es anterior al corte de la retención: sus movimientos ya no
+    están en la base de datos, solo en los ficheros archivados.
+    """
+    corte = get_fecha_corte(db)
+    if corte is not None and fecha < corte:
+        raise ValueError(f"Los movimientos anteriores a {corte.isoformat()} están archivados.")
+
+def _mes_de(fecha: datetime) -> date:
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc)
+    return date(fecha.year, fecha.month, 1)
+
+def _exportar(db: Session, corte: datetime, directorio: str, batch_size: int) -> List[dict]:
+    """
+    Escribe los movimientos anteriores al corte en un CSV comprimido por mes (columnas de la
+    exportación del historial, en orden (fecha, id)), en una sola lectura. Devuelve las filas
+    de movimientos_archivados (mes, fecha_corte, filas, archivo) de los meses con movimientos.
+    """
+    movimiento = models.MovimientoInventario
+    columnas = movimiento_inventario_crud.EXPORT_COLUMNS
+    query = (
+        select(*(getattr(movimiento, columna) for columna in columnas))
+        .where(movimiento.fecha < corte)
+        .order_by(movimiento.fecha, movimiento.id)
+    )
+    indice_fecha = columnas.index("fecha")
+    os.makedirs(directorio, exist_ok=True)
+    archivados, fichero, writer = [], None, None
+
+    def cerrar():
+        fichero.close()
+        archivo = archivados[-1]["archivo"]
+        os.replace(f"{archivo}.tmp", archivo) # El fichero solo aparece completo
+
+    try:
+        for fila in db.execute(query.execution_options(stream_results=True, yield_per=batch_size)):
+            mes = _mes_de(fila[indice_fecha])
+            if not archivados or archivados[-1]["mes"] != mes:
+                if fichero is not None:
+                    cerrar()
+                archivo = os.path.join(directorio, f"{TABLA}_{mes:%Y_%m}_corte_{corte:%Y%m%d}.csv.gz")
+                fichero = gzip.open(f"{archivo}.tmp", "wt", newline="", encoding="utf-8")
+                writer = csv.writer(fichero)
+                writer.writerow(columnas)
+                archivados.append({"mes": mes, "fecha_corte": corte, "filas": 0, "archivo": archivo})
+            writer.writerow([valor.isoformat() if isinstance(valor, datetime) else valor for valor in fila])
+            archivados[-1]["filas"] += 1
+        if fichero is not None:
+            cerrar()
+            fichero = None
+    finally:
+        if fichero is not None:
+            fichero.close()
+    return archivados
+
+def archivar_movimientos(db: Session, fecha_corte: date, directorio: str, batch_size: int = 10_000) -> ResultadoArchivo:
+    """
+    Archiva los movimientos anteriores a fecha_corte (inicio de un mes ya empezado) en
+    'directorio' y los sustituye por saldos de apertura. Los ficheros se escriben antes de
+    borrar nada; el cambio en la base de datos (saldos, borrado, registro) es una sola
+    transacción. Los checkpoints de la reconciliación de los productos afectados se
+    descartan (la siguiente ejecución los recalcula) y los cierres de stock hasta el corte
+    se borran (el saldo de apertura ya los incluye). El resumen diario no se toca: las
+    estadísticas de los meses archivados siguen disponibles.
+    """
+    movimiento = models.MovimientoInventario
+    if fecha_corte != inicio_mes(fecha_corte) or fecha_corte > inicio_mes(datetime.now(timezone.utc).date()):
+        raise ValueError("La fecha de corte debe ser el primer día de un mes no posterior al actual.")
+    corte = _instante(fecha_corte)
+    asegurar_particiones(db, fecha_corte, fecha_corte) # Los saldos de apertura van al mes del corte
+
+    # 1. Ficheros (antes de borrar nada)
+    archivados = _exportar(db, corte, directorio, batch_size)
+    db.rollback() # Cierra la transacción de lectura
+    if not archivados:
+        return ResultadoArchivo(corte, 0, 0, [])
+
+    # 2. Saldos de apertura y borrado, en una transacción
+    anteriores = movimiento.fecha < corte
+    try:
+        total = db.execute(select(func.count()).select_from(movimiento).where(anteriores)).scalar()
+        if total != sum(a["filas"] for a in archivados):
+            raise ValueError("Han cambiado movimientos anteriores al corte durante el archivado; vuelve a ejecutarlo.")
+        saldo = func.sum(movimiento_inventario_crud.expresion_ajuste_stock())
+        saldos = db.execute(insert(movimiento).from_select(
+            ["producto_id", "tipo_movimiento", "cantidad", "fecha", "notas"],
+            select(
+                movimiento.producto_id,
+                case(
+                    (saldo > 0, movimiento_inventario_crud.TIPO_SALDO_APERTURA),
+                    else_=movimiento_inventario_crud.TIPO_SALDO_APERTURA_NEGATIVO,
+                ),
+                func.abs(saldo),
+                literal(corte, DateTime(timezone=True)),
+                literal(f"Saldo de los movimientos anteriores a {fecha_corte.isoformat()} (archivados)"),
+            ).where(anteriores).group_by(movimiento.producto_id).having(saldo != 0),
+        )).rowcount
+        db.execute(
+            delete(models.StockLedgerBalance)
+            .where(models.StockLedgerBalance.producto_id.in_(select(movimiento.producto_id).where(anteriores)))
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            delete(models.StockSnapshot).where(models.StockSnapshot.fecha_corte <= corte)
+            .execution_options(synchronize_session=False)
+        )
+        if es_particionada(db):
+            # Las particiones anteriores al corte se separan y se borran enteras (sin DELETE fila a fila)
+            for mes in get_particiones(db):
+                if mes < fecha_corte:
+                    db.execute(text(f"ALTER TABLE {TABLA} DETACH PARTITION {nombre_particion(mes)}"))
+                    db.execute(text(f"DROP TABLE {nombre_particion(mes)}"))
+        db.execute(delete(movimiento).where(anteriores).execution_options(synchronize_session=False))
+        db.execute(insert(models.MovimientoArchivado), archivados)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return ResultadoArchivo(corte, total, saldos, [a["archivo"] for a in archivados])
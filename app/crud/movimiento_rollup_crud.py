@@ -0,0 +1,216 @@
+# app/crud/movimiento_rollup_crud.py
+
+import math
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Literal, Optional, Tuple
+
+from sqlalchemy import Date, case, cast, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.database import SessionLocal
+from app.schemas import movimiento_inventario_schemas
+from app.crud import movimiento_inventario_crud # TIPOS_ENTRADA / TIPOS_SALIDA (import circular: se usan en tiempo de llamada)
+from app.crud import movimiento_particion_crud # Corte de la retención
+
+# Resumen diario de movimientos (movimientos_diarios): unidades y nº de movimientos por
+# día UTC × producto × tipo. Se incrementa en la misma transacción que registra los
+# movimientos (PostgreSQL / SQLite) y reconstruir_rollup lo recalcula desde los movimientos
+# (relleno histórico, datos cargados por seed_db.py o bases de datos de otros dialectos).
+
+def _dia_utc(dialecto: str, fecha):
+    """Día UTC de una expresión de fecha (timestamp)."""
+    if dialecto == "postgresql":
+        return cast(func.timezone("UTC", fecha), Date)
+    return func.date(fecha, type_=Date)
+
+def dia_utc(fecha: datetime) -> date:
+    """Día UTC de la fecha de un movimiento (SQLite la devuelve sin zona horaria, en UTC)."""
+    if fecha.tzinfo is None:
+        return fecha.date()
+    return fecha.astimezone(timezone.utc).date()
+
+def incremento_stmt(dialecto: str):
+    """
+    INSERT ... ON CONFLICT DO UPDATE que suma unidades/movimientos a cada día.
+    Se ejecuta con las filas de filas_incremento. None si el dialecto no lo soporta.
+    """
+    if dialecto == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialecto == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    tabla = models.MovimientoDiario.__table__
+    stmt = dialect_insert(tabla)
+    return stmt.on_conflict_do_update(
+        index_elements=[tabla.c.dia, tabla.c.producto_id, tabla.c.tipo_movimiento],
+        set_={
+            "unidades": tabla.c.unidades + stmt.excluded.unidades,
+            "movimientos": tabla.c.movimientos + stmt.excluded.movimientos,
+        },
+    )
+
+def filas_incremento(movimientos: Iterable) -> List[Dict[str, object]]:
+    """
+    Agrega los movimientos por (día, producto, tipo) para incremento_stmt. Cada movimiento
+    es una fila del RETURNING de su INSERT (producto_id, tipo_movimiento, cantidad, fecha):
+    el día sale de la fecha que guardó la base de datos, no de un reloj consultado aparte.
+    """
+    acumulado: Dict[Tuple[date, int, str], List[int]] = defaultdict(lambda: [0, 0])
+    for m in movimientos:
+        fila = acumulado[(dia_utc(m.fecha), m.producto_id, m.tipo_movimiento.upper())]
+        fila[0] += m.cantidad
+        fila[1] += 1
+    return [
+        {"dia": dia, "producto_id": producto_id, "tipo_movimiento": tipo, "unidades": unidades, "movimientos": n}
+        for (dia, producto_id, tipo), (unidades, n) in sorted(acumulado.items())
+    ]
+
+def registrar_movimientos(db: Session, movimientos: Iterable) -> None:
+    """
+    Suma los movimientos (filas de filas_incremento) al resumen de su día. No hace commit:
+    debe ir en la transacción que inserta los movimientos.
+    """
+    stmt = incremento_stmt(db.get_bind().dialect.name)
+    filas = filas_incremento(movimientos)
+    if stmt is not None and filas:
+        db.execute(stmt, filas)
+
+# --- Reconstrucción ---
+
+def reconstruir_rollup(db: Session, desde: date, hasta: date) -> int:
+    """
+    Recalcula el resumen de los días entre desde y hasta (incluidos) a partir de
+    movimientos_inventario. Pensado para días cerrados: los movimientos que se registren
+    durante la reconstrucción de un día pueden no quedar reflejados. Hace commit.
+    Devuelve el número de filas escritas. Lanza ValueError si desde es anterior al corte
+    de la retención (se borraría el resumen de días cuyos movimientos están archivados).
+    """
+    inicio = datetime.combine(desde, time.min, tzinfo=timezone.utc)
+    movimiento_particion_crud.comprobar_no_archivada(db, inicio)
+    dialecto = db.get_bind().dialect.name
+    movimiento = models.MovimientoInventario
+    tabla = models.MovimientoDiario.__table__
+    dia = _dia_utc(dialecto, movimiento.fecha)
+    tipo = func.upper(movimiento.tipo_movimiento)
+
+    origen = (
+        select(dia, movimiento.producto_id, tipo, func.sum(movimiento.cantidad), func.count(movimiento.id))
+        # Rango sobre fecha (no sobre el día calculado) para usar el índice (producto_id, fecha)
+        .where(
+            movimiento.fecha >= inicio,
+            movimiento.fecha < datetime.combine(hasta + timedelta(days=1), time.min, tzinfo=timezone.utc),
+            tipo.not_in(sorted(movimiento_inventario_crud.TIPOS_SALDO_APERTURA)), # No son movimientos del día
+        )
+        .group_by(dia, movimiento.producto_id, tipo)
+    )
+    try:
+        db.execute(delete(tabla).where(tabla.c.dia.between(desde, hasta)))
+        resultado = db.execute(
+            insert(tabla).from_select(["dia", "producto_id", "tipo_movimiento", "unidades", "movimientos"], origen)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return resultado.rowcount
+
+def reconstruir_rollup_por_meses(desde: date, hasta: date) -> int:
+    """
+    Reconstruye el resumen entre desde y hasta, un mes por transacción.
+    """
+    db = SessionLocal()
+    try:
+        total = 0
+        inicio = desde
+        while inicio <= hasta:
+            siguiente_mes = (inicio.replace(day=1) + timedelta(days=32)).replace(day=1)
+            fin = min(siguiente_mes - timedelta(days=1), hasta)
+            total += reconstruir_rollup(db, inicio, fin)
+            inicio = fin + timedelta(days=1)
+        return total
+    finally:
+        db.close()
+
+# --- Estadísticas ---
+
+def _inicio_bucket(dia: date, bucket: str) -> date:
+    if bucket == "week":
+        return dia - timedelta(days=dia.weekday()) # lunes
+    if bucket == "month":
+        return dia.replace(day=1)
+    return dia
+
+def _siguiente_bucket(inicio: date, bucket: str) -> date:
+    if bucket == "week":
+        return inicio + timedelta(days=7)
+    if bucket == "month":
+        return (inicio + timedelta(days=32)).replace(day=1)
+    return inicio + timedelta(days=1)
+
+def get_stats(
+    db: Session,
+    desde: date,
+    hasta: date,
+    bucket: Literal["day", "week", "month"] = "day",
+    producto_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    proveedor_id: Optional[int] = None,
+    max_points: Optional[int] = None,
+) -> movimiento_inventario_schemas.MovimientoStats:
+    """
+    Unidades de entrada / salida por día, semana o mes a partir del resumen diario, para un
+    producto, una categoría, un proveedor o todo el inventario. Los periodos sin movimientos
+    aparecen con cero. Con max_points, los periodos consecutivos se agrupan hasta no superarlo.
+    """
+    resumen = models.MovimientoDiario
+    tipo = resumen.tipo_movimiento
+    stmt = (
+        select(
+            resumen.dia,
+            func.sum(case((tipo.in_(sorted(movimiento_inventario_crud.TIPOS_ENTRADA)), resumen.unidades), else_=0)),
+            func.sum(case((tipo.in_(sorted(movimiento_inventario_crud.TIPOS_SALIDA)), resumen.unidades), else_=0)),
+            func.sum(resumen.unidades),
+            func.sum(resumen.movimientos),
+        )
+        .where(resumen.dia.between(desde, hasta))
+        .group_by(resumen.dia)
+    )
+    if producto_id is not None:
+        stmt = stmt.where(resumen.producto_id == producto_id)
+    if category_id is not None or proveedor_id is not None:
+        stmt = stmt.join(models.Product, models.Product.id == resumen.producto_id)
+        if category_id is not None:
+            stmt = stmt.where(models.Product.category_id == category_id)
+        if proveedor_id is not None:
+            stmt = stmt.where(models.Product.proveedor_id == proveedor_id)
+
+    # Todos los periodos del rango, con cero si no hubo movimientos
+    totales: Dict[date, List[int]] = {}
+    inicio = _inicio_bucket(desde, bucket)
+    while inicio <= hasta:
+        totales[inicio] = [0, 0, 0, 0]
+        inicio = _siguiente_bucket(inicio, bucket)
+    for dia, entradas, salidas, unidades, n in db.execute(stmt).all():
+        fila = totales[_inicio_bucket(dia, bucket)]
+        fila[0] += entradas or 0
+        fila[1] += salidas or 0
+        fila[2] += (unidades or 0) - (entradas or 0) - (salidas or 0)
+        fila[3] += n or 0
+
+    periodos = sorted(totales.items())
+    agrupacion = math.ceil(len(periodos) / max_points) if max_points and len(periodos) > max_points else 1
+    puntos = []
+    for i in range(0, len(periodos), agrupacion):
+        grupo = periodos[i:i + agrupacion]
+        entradas, salidas, otros, n = (sum(fila[k] for _, fila in grupo) for k in range(4))
+        puntos.append(movimiento_inventario_schemas.MovimientoStatsPunto(
+            inicio=grupo[0][0], entradas=entradas, salidas=salidas, otros=otros,
+            neto=entradas - salidas, movimientos=n,
+        ))
+
+    return movimiento_inventario_schemas.MovimientoStats(
+        desde=desde, hasta=hasta, bucket=bucket, periodos_por_punto=agrupacion, puntos=puntos,
+    )
@@ -0,0 +1,56 @@
+# app/crud/pagination.py
+# Utilidades para la paginación por cursor (keyset).
+# El cursor es opaco para el cliente: JSON en base64 (url-safe) con la clave del último elemento devuelto.
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+def encode_cursor(**key: Any) -> str:
+    """
+    Codifica la clave de ordenación del último elemento (ej: id=10, fecha=datetime) en un cursor opaco.
+    """
+    payload = {k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in key.items()}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decodifica un cursor generado por encode_cursor.
+    Lanza ValueError si el cursor no es válido.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor de paginación inválido.") from e
+    if not isinstance(payload, dict):
+        raise ValueError("Cursor de paginación inválido.")
+    return payload
+
+def decode_id_cursor(cursor: Optional[str]) -> Optional[int]:
+    """
+    Extrae el 'id' de un cursor de tipo (id). None si no hay cursor (primera página).
+    """
+    if not cursor:
+        return None
+    payload = decode_cursor(cursor)
+    if not isinstance(payload.get("id"), int):
+        raise ValueError("Cursor de paginación inválido.")
+    return payload["id"]
+
+def decode_fecha_id_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """
+    Extrae (fecha, id) de un cursor de tipo (fecha, id). None si no hay cursor (primera página).
+    """
+    if not cursor:
+        return None
+    payload = decode_cursor(cursor)
+    try:
+        fecha = datetime.fromisoformat(payload["fecha"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError("Cursor de paginación inválido.") from e
+    if not isinstance(payload.get("id"), int):
+        raise ValueError("Cursor de paginación inválido.")
+    return fecha, payload["id"]
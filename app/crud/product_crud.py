@@ -1,10 +1,19 @@
 # app/crud/product_crud.py
 
-from typing import List, Optional
+import re
+from typing import Iterator, List, NoReturn, Optional, Set, Tuple
+from sqlalchemy import Float, Integer, case, delete, func, insert, literal_column, or_, select, text, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload # joinedload para carga eficiente de relaciones
 
 from app.db import models
+from app.db.database import SessionLocal
 from app.schemas import product_schemas
+from app.core import response_cache # Invalidación de la caché HTTP del catálogo
+from app.crud.pagination import encode_cursor, decode_id_cursor
+from app.crud.fieldsets import Projection, Seleccion
+from app.crud import integrity
+from app.crud import movimiento_inventario_crud # Movimientos de los cambios de stock (libro de movimientos)
 
 # --- Operaciones de Lectura (Read) ---
 
@@ -33,6 +42,319 @@ def get_products(
         
     return query.offset(skip).limit(limit).all()
 
+def get_products_keyset(
+    db: Session, limit: int = 100, cursor: Optional[str] = None, category_id: Optional[int] = None
+) -> Tuple[List[models.Product], Optional[str]]:
+    """
+    Obtiene una página de productos usando paginación por cursor (keyset) sobre el id.
+    A diferencia de offset, el coste de la página N es el mismo que el de la primera.
+    Retorna (productos, next_cursor); next_cursor es None si no hay más páginas.
+    Lanza ValueError si el cursor no es válido.
+    """
+    after_id = decode_id_cursor(cursor)
+    query = db.query(models.Product).options(joinedload(models.Product.category))
+
+    if category_id is not None:
+        query = query.filter(models.Product.category_id == category_id)
+    if after_id is not None:
+        query = query.filter(models.Product.id > after_id)
+
+    # Pedimos un elemento extra para saber si existe una página siguiente
+    products = query.order_by(models.Product.id).limit(limit + 1).all()
+    if len(products) <= limit:
+        return products, None
+    products = products[:limit]
+    return products, encode_cursor(id=products[-1].id)
+
+# --- Listados como filas (serialización rápida, ver app/api/fast_json.py) ---
+# Misma consulta que get_products / get_products_keyset (productos LEFT JOIN categorías),
+# pero seleccionando columnas: sin objetos ORM, identity map ni carga de relaciones.
+
+_PRODUCT_ROW_COLUMNS = (
+    "id", "name", "description", "price", "stock_actual", "stock_minimo",
+    "codigo_sku", "numero_serie", "category_id",
+)
+_CATEGORY_ROW_COLUMNS = ("id", "name", "description")
+
+def products_rows_stmt(category_id: Optional[int] = None):
+    """
+    SELECT de las columnas de product_schemas.Product (con la categoría anidada).
+    Las filas se convierten con product_row_to_dict. Se comparte con app/crud/aio.
+    """
+    stmt = (
+        select(
+            *(getattr(models.Product, column) for column in _PRODUCT_ROW_COLUMNS),
+            *(getattr(models.Category, column).label(f"category_{column}") for column in _CATEGORY_ROW_COLUMNS),
+        )
+        .select_from(models.Product)
+        .outerjoin(models.Category, models.Product.category_id == models.Category.id)
+    )
+    if category_id is not None:
+        stmt = stmt.where(models.Product.category_id == category_id)
+    return stmt
+
+def product_row_to_dict(row) -> dict:
+    (id_, name, description, price, stock_actual, stock_minimo, codigo_sku, numero_serie, category_id,
+     category_id_join, category_name, category_description) = row
+    return {
+        "id": id_, "name": name, "description": description, "price": price,
+        "stock_actual": stock_actual, "stock_minimo": stock_minimo,
+        "codigo_sku": codigo_sku, "numero_serie": numero_serie, "category_id": category_id,
+        "category": None if category_id_join is None else {
+            "id": category_id_join, "name": category_name, "description": category_description,
+        },
+    }
+
+# --- Escrituras con RETURNING (formato de product_row_to_dict, ver create_product) ---
+
+PRODUCT_RETURNING = tuple(getattr(models.Product, column) for column in _PRODUCT_ROW_COLUMNS)
+
+def category_row_stmt(category_id: int):
+    """SELECT de las columnas de la categoría anidada en product_schemas.Product."""
+    return select(*(getattr(models.Category, column) for column in _CATEGORY_ROW_COLUMNS)).where(
+        models.Category.id == category_id
+    )
+
+def product_write_to_dict(product_row, category_row) -> dict:
+    """Dict de product_row_to_dict a partir de un RETURNING de PRODUCT_RETURNING y la fila de la categoría."""
+    return product_row_to_dict((*product_row, *(category_row or (None, None, None))))
+
+def raise_product_conflict(error: IntegrityError, data: dict, updating: bool = False) -> NoReturn:
+    """
+    Traduce el IntegrityError de un INSERT / UPDATE de productos a los errores de la API:
+    LookupError si la categoría no existe y ValueError si el SKU o el número de serie ya existen.
+    Cualquier otra violación se relanza. Se comparte con app/crud/aio.
+    """
+    if integrity.is_violation(error, integrity.FOREIGN_KEY, "category_id"):
+        if updating:
+            raise LookupError(f"New category with ID {data.get('category_id')} not found. Cannot update product.")
+        raise LookupError(f"Category with ID {data.get('category_id')} not found. Cannot create product.")
+    if integrity.is_violation(error, integrity.UNIQUE, "codigo_sku"):
+        prefix = "Another product" if updating else "Product"
+        raise ValueError(f"{prefix} with SKU '{data.get('codigo_sku')}' already exists.")
+    if integrity.is_violation(error, integrity.UNIQUE, "numero_serie"):
+        prefix = "Another product" if updating else "Product"
+        raise ValueError(f"{prefix} with serial number '{data.get('numero_serie')}' already exists.")
+    raise error
+
+def get_products_rows(
+    db: Session, skip: int = 0, limit: int = 100, category_id: Optional[int] = None
+) -> List[dict]:
+    """
+    Como get_products, pero devuelve dicts listos para validar contra product_schemas.Product.
+    """
+    rows = db.execute(products_rows_stmt(category_id).offset(skip).limit(limit)).all()
+    return [product_row_to_dict(row) for row in rows]
+
+def get_products_keyset_rows(
+    db: Session, limit: int = 100, cursor: Optional[str] = None, category_id: Optional[int] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Como get_products_keyset, pero devuelve dicts. Lanza ValueError si el cursor no es válido.
+    """
+    after_id = decode_id_cursor(cursor)
+    stmt = products_rows_stmt(category_id)
+    if after_id is not None:
+        stmt = stmt.where(models.Product.id > after_id)
+    rows = db.execute(stmt.order_by(models.Product.id).limit(limit + 1)).all()
+    products = [product_row_to_dict(row) for row in rows[:limit]]
+    if len(rows) <= limit:
+        return products, None
+    return products, encode_cursor(id=products[-1]["id"])
+
+# --- Listados con selección de campos (fields=, ver app/crud/fieldsets.py) ---
+
+PRODUCT_RELATIONS = {"category": (models.Category, models.Product.category_id == models.Category.id)}
+
+def products_fields_stmt(seleccion: Seleccion, category_id: Optional[int] = None) -> Tuple[Projection, object]:
+    """
+    Proyección y consulta de los productos con los campos seleccionados (la categoría solo
+    se une si se pide alguno de sus campos). Se comparte con app/crud/aio.
+    """
+    proyeccion = Projection(models.Product, seleccion, PRODUCT_RELATIONS)
+    stmt = proyeccion.select()
+    if category_id is not None:
+        stmt = stmt.where(models.Product.category_id == category_id)
+    return proyeccion, stmt
+
+def get_products_fields(
+    db: Session, seleccion: Seleccion, skip: int = 0, limit: int = 100, category_id: Optional[int] = None
+) -> List[dict]:
+    """
+    Como get_products, pero solo con los campos seleccionados.
+    """
+    proyeccion, stmt = products_fields_stmt(seleccion, category_id)
+    return [proyeccion.to_dict(row) for row in db.execute(stmt.offset(skip).limit(limit)).all()]
+
+def products_fields_keyset_stmt(
+    seleccion: Seleccion, limit: int, cursor: Optional[str], category_id: Optional[int]
+) -> Tuple[Projection, object]:
+    """
+    Proyección y consulta de una página por cursor (id) con los campos seleccionados.
+    Se comparte con app/crud/aio. Lanza ValueError si el cursor no es válido.
+    """
+    after_id = decode_id_cursor(cursor)
+    proyeccion = Projection(models.Product, seleccion, PRODUCT_RELATIONS, claves=[models.Product.id])
+    stmt = proyeccion.select()
+    if category_id is not None:
+        stmt = stmt.where(models.Product.category_id == category_id)
+    if after_id is not None:
+        stmt = stmt.where(models.Product.id > after_id)
+    return proyeccion, stmt.order_by(models.Product.id).limit(limit + 1)
+
+def get_products_fields_keyset(
+    db: Session, seleccion: Seleccion, limit: int = 100, cursor: Optional[str] = None, category_id: Optional[int] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Como get_products_keyset, pero solo con los campos seleccionados. Lanza ValueError si el cursor no es válido.
+    """
+    proyeccion, stmt = products_fields_keyset_stmt(seleccion, limit, cursor, category_id)
+    return proyeccion.page(db.execute(stmt).all(), limit, "id")
+
+# Columnas de la exportación de productos (mismo orden que las filas de iter_products_export)
+EXPORT_COLUMNS = [
+    "id", "name", "description", "price", "stock_actual", "stock_minimo",
+    "codigo_sku", "numero_serie", "category_id", "proveedor_id",
+]
+
+def iter_products_export(
+    category_id: Optional[int] = None, batch_size: int = 1000
+) -> Iterator[tuple]:
+    """
+    Recorre todos los productos (ordenados por id) con un cursor del lado del servidor
+    (stream_results + yield_per), de modo que la memoria no crece con el tamaño de la tabla.
+    Abre y cierra su propia sesión: está pensada para consumirse desde una StreamingResponse.
+    """
+    query = select(*(getattr(models.Product, column) for column in EXPORT_COLUMNS)).order_by(models.Product.id)
+    if category_id is not None:
+        query = query.where(models.Product.category_id == category_id)
+
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+        for row in result:
+            yield tuple(row)
+    finally:
+        db.close()
+
+def _filtros_stock_bajo(
+    category_id: Optional[int], proveedor_id: Optional[int], solo_agotados: bool
+) -> list:
+    # models.STOCK_BAJO es el predicado de los índices parciales ix_products_low_stock_*
+    filtros = [models.STOCK_BAJO]
+    if category_id is not None:
+        filtros.append(models.Product.category_id == category_id)
+    if proveedor_id is not None:
+        filtros.append(models.Product.proveedor_id == proveedor_id)
+    if solo_agotados:
+        filtros.append(models.Product.stock_actual <= 0)
+    return filtros
+
+def get_low_stock_products(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    category_id: Optional[int] = None,
+    proveedor_id: Optional[int] = None,
+    solo_agotados: bool = False,
+) -> List[models.Product]:
+    """
+    Obtiene los productos en o por debajo de su stock mínimo, ordenados por déficit
+    (stock_minimo - stock_actual) de mayor a menor. Incluye las categorías.
+    """
+    return (
+        db.query(models.Product)
+        .options(joinedload(models.Product.category))
+        .filter(*_filtros_stock_bajo(category_id, proveedor_id, solo_agotados))
+        .order_by((models.Product.stock_minimo - models.Product.stock_actual).desc(), models.Product.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+def count_low_stock_by_category(
+    db: Session,
+    category_id: Optional[int] = None,
+    proveedor_id: Optional[int] = None,
+    solo_agotados: bool = False,
+) -> List[Tuple[Optional[int], Optional[str], int, int]]:
+    """
+    Cuenta los productos con stock bajo por categoría: (category_id, category_name, productos, agotados).
+    """
+    stmt = (
+        select(
+            models.Product.category_id,
+            models.Category.name,
+            func.count(models.Product.id),
+            func.coalesce(func.sum(case((models.Product.stock_actual <= 0, 1), else_=0)), 0),
+        )
+        .outerjoin(models.Category, models.Category.id == models.Product.category_id)
+        .where(*_filtros_stock_bajo(category_id, proveedor_id, solo_agotados))
+        .group_by(models.Product.category_id, models.Category.name)
+        .order_by(func.count(models.Product.id).desc(), models.Product.category_id)
+    )
+    return [tuple(row) for row in db.execute(stmt).all()]
+
+def _terminos_busqueda(q: str) -> List[str]:
+    # Solo letras/números: el texto del usuario nunca llega a la sintaxis de tsquery / FTS5
+    return re.findall(r"\w+", q.lower())
+
+def search_products(db: Session, q: str, limit: int = 20) -> List[models.Product]:
+    """
+    Busca productos por name, description, codigo_sku y numero_serie.
+    Cada término se busca como prefijo (ej: lectores de código de barras) y los resultados se
+    ordenan por relevancia: primero coincidencias exactas de SKU / número de serie.
+    PostgreSQL usa tsvector + pg_trgm, SQLite la tabla FTS5 'products_fts' y el resto ILIKE.
+    """
+    q = q.strip()
+    terminos = _terminos_busqueda(q)
+    exacto = or_(models.Product.codigo_sku == q, models.Product.numero_serie == q)
+    query = db.query(models.Product).options(joinedload(models.Product.category))
+    dialecto = db.get_bind().dialect.name
+    escapado = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") # para LIKE
+
+    if dialecto == "postgresql":
+        documento = literal_column(f"({models.PRODUCT_SEARCH_DOCUMENT})")
+        prefijo = escapado + "%"
+        condiciones = [
+            exacto,
+            models.Product.name.op("%")(q), # similitud de trigramas (tolera erratas)
+            models.Product.codigo_sku.ilike(prefijo),
+            models.Product.numero_serie.ilike(prefijo),
+        ]
+        relevancia = func.similarity(models.Product.name, q)
+        if terminos:
+            consulta_ts = func.to_tsquery(literal_column("'simple'::regconfig"), " & ".join(f"{t}:*" for t in terminos))
+            condiciones.append(documento.op("@@")(consulta_ts))
+            relevancia = relevancia + func.ts_rank(documento, consulta_ts)
+        query = query.filter(or_(*condiciones)).order_by(exacto.desc(), relevancia.desc(), models.Product.id)
+    elif dialecto == "sqlite":
+        if terminos:
+            # Una coincidencia exacta de SKU / número de serie también coincide con sus términos en FTS5
+            fts = (
+                text(
+                    "SELECT rowid AS id, bm25(products_fts, 10.0, 1.0, 10.0, 10.0) AS rank "
+                    "FROM products_fts WHERE products_fts MATCH :match"
+                )
+                .bindparams(match=" AND ".join(f'"{t}"*' for t in terminos))
+                .columns(id=Integer, rank=Float)
+                .subquery()
+            )
+            # bm25: menor es más relevante
+            query = query.join(fts, fts.c.id == models.Product.id).order_by(exacto.desc(), fts.c.rank, models.Product.id)
+        else:
+            query = query.filter(exacto).order_by(models.Product.id)
+    else:
+        patron = f"%{escapado}%"
+        query = query.filter(or_(
+            models.Product.name.ilike(patron, escape="\\"),
+            models.Product.description.ilike(patron, escape="\\"),
+            models.Product.codigo_sku.ilike(patron, escape="\\"),
+            models.Product.numero_serie.ilike(patron, escape="\\"),
+        )).order_by(exacto.desc(), models.Product.id)
+
+    return query.limit(limit).all()
+
 def get_product_by_sku(db: Session, sku: str) -> Optional[models.Product]:
     """
     Obtiene un producto específico por su código SKU.
@@ -44,64 +366,203 @@ def get_product_by_sku(db: Session, sku: str) -> Optional[models.Product]:
 
 # --- Operación de Creación (Create) ---
 
-def create_product(db: Session, product: product_schemas.ProductCreate) -> models.Product:
+def create_product(db: Session, product: product_schemas.ProductCreate, responsable_id: Optional[int] = None) -> dict:
+    """
+    Crea un nuevo producto con un INSERT ... RETURNING (y la lectura de su categoría, si tiene).
+    El stock inicial se registra como un movimiento AJUSTE_INICIAL de responsable_id.
+    La existencia de la categoría y la unicidad del SKU y del número de serie las garantizan
+    las restricciones de la base de datos: lanza LookupError si la categoría no existe y
+    ValueError si el SKU o el número de serie ya existen.
+    Retorna un dict con el formato de product_schemas.Product.
+    """
+    data = product.model_dump()
+    try:
+        row = db.execute(insert(models.Product).values(**data).returning(*PRODUCT_RETURNING)).one()
+        movimiento_inventario_crud.registrar_stock_inicial(db, [(row.id, row.stock_actual)], responsable_id)
+        category = db.execute(category_row_stmt(row.category_id)).one() if row.category_id is not None else None
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise_product_conflict(e, data)
+    response_cache.invalidate(response_cache.PRODUCTS)
+    return product_write_to_dict(row, category)
+
+
+# --- Ajuste Atómico de Stock ---
+
+def adjust_stock(db: Session, product_id: int, delta: int, guard_negative: bool = False) -> Optional[int]:
     """
-    Crea un nuevo producto en la base de datos.
+    Suma 'delta' al stock del producto con un único UPDATE ... SET stock_actual = stock_actual + :delta
+    ... RETURNING, sin leer antes el producto. La base de datos serializa las actualizaciones
+    concurrentes de la misma fila, así que no se pierden ajustes.
+    Con guard_negative=True el UPDATE solo se aplica si el stock resultante no es negativo.
+    No hace commit: forma parte de la transacción del llamador.
+    Retorna el nuevo stock, o None si el producto no existe o la guarda lo impidió.
     """
-    db_product = models.Product(
-        name=product.name,
-        description=product.description,
-        price=product.price,
-        stock_actual=product.stock_actual,
-        stock_minimo=product.stock_minimo,
-        codigo_sku=product.codigo_sku,
-        numero_serie=product.numero_serie,
-        category_id=product.category_id
+    query = update(models.Product).where(models.Product.id == product_id)
+    if guard_negative:
+        query = query.where(models.Product.stock_actual + delta >= 0)
+    result = db.execute(
+        query.values(stock_actual=models.Product.stock_actual + delta)
+        .returning(models.Product.stock_actual)
+        .execution_options(synchronize_session=False)
     )
-    db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
-    # Para que la categoría se cargue en el objeto retornado después de crearlo:
-    # Volvemos a consultarlo, ya que db.refresh no carga relaciones por defecto.
-    # Esto asegura que el objeto retornado tenga la 'category' poblada si la API la espera.
-    return get_product(db, product_id=db_product.id)
+    return result.scalar_one_or_none()
 
 
-# --- Operación de Actualización (Update) ---
+# --- Importación Masiva (Bulk Create / Upsert) ---
 
-def update_product(
-    db: Session, product_id: int, product_update: product_schemas.ProductUpdate
-) -> Optional[models.Product]:
+def import_products_chunk(
+    db: Session,
+    rows: List[Tuple[int, product_schemas.ProductCreate]],
+    on_duplicate: str = "error",
+    seen_skus: Optional[Set[str]] = None,
+    seen_series: Optional[Set[str]] = None,
+    responsable_id: Optional[int] = None,
+) -> Tuple[int, int, List[product_schemas.ProductImportError]]:
     """
-    Actualiza un producto existente.
+    Importa un lote de productos ya validados, identificados por su número de fila.
+    Categorías, SKUs y números de serie se resuelven con una consulta por lote (IN (...)),
+    y la escritura es un INSERT multi-fila (y un UPDATE por lotes si on_duplicate="update").
+    El stock de los productos creados o actualizados se registra como movimientos de
+    responsable_id (ver movimiento_inventario_crud). El lote se confirma en su propia transacción.
+
+    :param on_duplicate: "error" rechaza los SKUs ya existentes; "update" los actualiza.
+    :param seen_skus / seen_series: valores ya vistos en lotes anteriores del mismo fichero,
+                                    para detectar duplicados dentro del fichero.
+    :return: (creados, actualizados, errores por fila).
     """
-    db_product = get_product(db, product_id=product_id) # Reutilizamos get_product para cargar con categoría
-    if not db_product:
-        return None
+    seen_skus = seen_skus if seen_skus is not None else set()
+    seen_series = seen_series if seen_series is not None else set()
+    errors: List[product_schemas.ProductImportError] = []
 
-    update_data = product_update.model_dump(exclude_unset=True)
+    category_ids = {p.category_id for _, p in rows if p.category_id is not None}
+    skus = {p.codigo_sku for _, p in rows if p.codigo_sku}
+    series = {p.numero_serie for _, p in rows if p.numero_serie}
 
-    for key, value in update_data.items():
-        setattr(db_product, key, value)
+    existing_categories = set(
+        db.scalars(select(models.Category.id).where(models.Category.id.in_(category_ids)))
+    ) if category_ids else set()
+    existing_skus = dict(
+        db.execute(select(models.Product.codigo_sku, models.Product.id).where(models.Product.codigo_sku.in_(skus))).all()
+    ) if skus else {}
+    existing_series = dict(
+        db.execute(select(models.Product.numero_serie, models.Product.id).where(models.Product.numero_serie.in_(series))).all()
+    ) if series else {}
 
-    db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
-    # De nuevo, volvemos a consultar para asegurar que la relación category esté actualizada
-    # si el category_id fue modificado.
-    return get_product(db, product_id=db_product.id)
+    to_insert: List[dict] = []
+    to_update: List[dict] = []
+    written_rows: List[Tuple[int, Optional[str]]] = []
+
+    for row_number, product in rows:
+        sku, serie = product.codigo_sku, product.numero_serie
+
+        def reject(message: str) -> None:
+            errors.append(product_schemas.ProductImportError(row=row_number, codigo_sku=sku, error=message))
+
+        if product.category_id is not None and product.category_id not in existing_categories:
+            reject(f"Category with ID {product.category_id} not found.")
+            continue
+        if sku and sku in seen_skus:
+            reject(f"SKU '{sku}' is duplicated in the file.")
+            continue
+        if serie and serie in seen_series:
+            reject(f"Serial number '{serie}' is duplicated in the file.")
+            continue
+
+        existing_id = existing_skus.get(sku) if sku else None
+        if existing_id is not None and on_duplicate != "update":
+            reject(f"Product with SKU '{sku}' already exists.")
+            continue
+        if serie and existing_series.get(serie, existing_id) != existing_id:
+            reject(f"Product with serial number '{serie}' already exists.")
+            continue
+
+        if existing_id is not None:
+            # Solo se actualizan las columnas presentes en la fila
+            to_update.append({"id": existing_id, **product.model_dump(exclude_unset=True)})
+        else:
+            to_insert.append(product.model_dump())
+        written_rows.append((row_number, sku))
+        if sku:
+            seen_skus.add(sku)
+        if serie:
+            seen_series.add(serie)
+
+    try:
+        if to_insert:
+            creados = db.execute(insert(models.Product).returning(models.Product.id, models.Product.stock_actual), to_insert).all()
+            movimiento_inventario_crud.registrar_stock_inicial(db, creados, responsable_id)
+        if to_update:
+            movimiento_inventario_crud.registrar_ajustes_a_stock(db, {
+                fila["id"]: fila["stock_actual"] for fila in to_update if fila.get("stock_actual") is not None
+            }, responsable_id)
+            db.execute(update(models.Product), to_update)
+        db.commit()
+        response_cache.invalidate(response_cache.PRODUCTS)
+    except IntegrityError as e:
+        # Conflicto concurrente (otro proceso insertó el mismo SKU entre la consulta y el INSERT):
+        # el lote entero se descarta y se informa fila a fila.
+        db.rollback()
+        errors.extend(
+            product_schemas.ProductImportError(row=row_number, codigo_sku=sku, error=f"Integrity error writing batch: {e.orig}")
+            for row_number, sku in written_rows
+        )
+        return 0, 0, errors
+
+    return len(to_insert), len(to_update), errors
+
+
+# --- Operación de Actualización (Update) ---
+
+def update_product(
+    db: Session, product_id: int, product_update: product_schemas.ProductUpdate, responsable_id: Optional[int] = None
+) -> Optional[dict]:
+    """
+    Actualiza un producto existente con un UPDATE ... RETURNING (y la lectura de su categoría).
+    Un cambio de stock_actual se registra antes como un movimiento de ajuste de responsable_id.
+    Lanza LookupError si la nueva categoría no existe y ValueError si el SKU o el número de
+    serie ya los tiene otro producto. Retorna un dict como create_product, o None si no existe.
+    """
+    data = product_update.model_dump(exclude_unset=True)
+    if not data:
+        row = db.execute(products_rows_stmt().where(models.Product.id == product_id)).one_or_none()
+        return product_row_to_dict(row) if row is not None else None
+    try:
+        if data.get("stock_actual") is not None:
+            movimiento_inventario_crud.registrar_ajustes_a_stock(db, {product_id: data["stock_actual"]}, responsable_id)
+        row = db.execute(
+            update(models.Product).where(models.Product.id == product_id).values(**data)
+            .returning(*PRODUCT_RETURNING).execution_options(synchronize_session=False)
+        ).one_or_none()
+        if row is None:
+            db.rollback()
+            return None
+        category = db.execute(category_row_stmt(row.category_id)).one() if row.category_id is not None else None
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise_product_conflict(e, data, updating=True)
+    response_cache.invalidate(response_cache.PRODUCTS)
+    return product_write_to_dict(row, category)
 
 
 # --- Operación de Eliminación (Delete) ---
 
-def delete_product(db: Session, product_id: int) -> Optional[models.Product]:
+def delete_product(db: Session, product_id: int) -> Optional[dict]:
     """
-    Elimina un producto existente.
+    Elimina un producto existente y su historial de movimientos, sin cargarlos en la sesión
+    (el resto de tablas por producto se borran en cascada en la base de datos).
+    Retorna el producto eliminado como dict (formato de create_product), o None si no existe.
     """
-    db_product = get_product(db, product_id=product_id) # Reutilizamos get_product
-    if not db_product:
+    row = db.execute(products_rows_stmt().where(models.Product.id == product_id)).one_or_none()
+    if row is None:
         return None
-
-    db.delete(db_product)
+    db.execute(
+        delete(models.MovimientoInventario).where(models.MovimientoInventario.producto_id == product_id)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(delete(models.Product).where(models.Product.id == product_id).execution_options(synchronize_session=False))
     db.commit()
-    return db_product # Retorna el objeto eliminado (con su categoría cargada)
\ No newline at end of file
+    response_cache.invalidate(response_cache.PRODUCTS)
+    return product_row_to_dict(row)
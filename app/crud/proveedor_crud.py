@@ -1,8 +1,11 @@
 # app/crud/proveedor_crud.py
 from typing import List, Optional
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.orm import Session
 from app.db import models
 from app.schemas import proveedor_schemas
+from app.core import response_cache # Invalidación de la caché HTTP del catálogo
+from app.crud.fieldsets import Projection, Seleccion
 
 def get_proveedor(db: Session, proveedor_id: int) -> Optional[models.Proveedor]:
     return db.query(models.Proveedor).filter(models.Proveedor.id == proveedor_id).first()
@@ -10,29 +13,48 @@ def get_proveedor(db: Session, proveedor_id: int) -> Optional[models.Proveedor]:
 def get_proveedores(db: Session, skip: int = 0, limit: int = 100) -> List[models.Proveedor]:
     return db.query(models.Proveedor).offset(skip).limit(limit).all()
 
-def create_proveedor(db: Session, proveedor: proveedor_schemas.ProveedorCreate) -> models.Proveedor:
-    db_proveedor = models.Proveedor(**proveedor.model_dump())
-    db.add(db_proveedor)
+def get_proveedores_fields(db: Session, seleccion: Seleccion, skip: int = 0, limit: int = 100) -> List[dict]:
+    # Como get_proveedores, pero solo con los campos seleccionados (fields=)
+    proyeccion = Projection(models.Proveedor, seleccion)
+    return [proyeccion.to_dict(row) for row in db.execute(proyeccion.select().offset(skip).limit(limit)).all()]
+
+# Escrituras con INSERT / UPDATE / DELETE ... RETURNING: retornan un dict con el formato de
+# proveedor_schemas.Proveedor, sin recargar el objeto tras el commit.
+PROVEEDOR_RETURNING = tuple(models.Proveedor.__table__.columns)
+
+def create_proveedor(db: Session, proveedor: proveedor_schemas.ProveedorCreate) -> dict:
+    row = db.execute(insert(models.Proveedor).values(**proveedor.model_dump()).returning(*PROVEEDOR_RETURNING)).one()
     db.commit()
-    db.refresh(db_proveedor)
-    return db_proveedor
+    response_cache.invalidate(response_cache.PROVEEDORES)
+    return row._asdict()
 
-def update_proveedor(db: Session, proveedor_id: int, proveedor_update: proveedor_schemas.ProveedorUpdate) -> Optional[models.Proveedor]:
-    db_proveedor = get_proveedor(db, proveedor_id)
-    if not db_proveedor:
-        return None
+def update_proveedor(db: Session, proveedor_id: int, proveedor_update: proveedor_schemas.ProveedorUpdate) -> Optional[dict]:
     update_data = proveedor_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_proveedor, key, value)
-    db.add(db_proveedor)
+    if not update_data:
+        row = db.execute(select(*PROVEEDOR_RETURNING).where(models.Proveedor.id == proveedor_id)).one_or_none()
+        return row._asdict() if row is not None else None
+    row = db.execute(
+        update(models.Proveedor).where(models.Proveedor.id == proveedor_id).values(**update_data)
+        .returning(*PROVEEDOR_RETURNING).execution_options(synchronize_session=False)
+    ).one_or_none()
     db.commit()
-    db.refresh(db_proveedor)
-    return db_proveedor
-
-def delete_proveedor(db: Session, proveedor_id: int) -> Optional[models.Proveedor]:
-    db_proveedor = get_proveedor(db, proveedor_id)
-    if not db_proveedor:
+    if row is None:
         return None
-    db.delete(db_proveedor)
+    response_cache.invalidate(response_cache.PROVEEDORES)
+    return row._asdict()
+
+def delete_proveedor(db: Session, proveedor_id: int) -> Optional[dict]:
+    # Los productos del proveedor quedan sin proveedor (proveedor_id NULL)
+    db.execute(
+        update(models.Product).where(models.Product.proveedor_id == proveedor_id).values(proveedor_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    row = db.execute(
+        delete(models.Proveedor).where(models.Proveedor.id == proveedor_id)
+        .returning(*PROVEEDOR_RETURNING).execution_options(synchronize_session=False)
+    ).one_or_none()
     db.commit()
-    return db_proveedor
\ No newline at end of file
+    if row is None:
+        return None
+    response_cache.invalidate(response_cache.PROVEEDORES)
+    return row._asdict()
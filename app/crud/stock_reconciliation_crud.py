@@ -0,0 +1,174 @@
+# app/crud/stock_reconciliation_crud.py
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, literal, select, update, bindparam
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.database import SessionLocal, engine
+from app.schemas import stock_reconciliation_schemas
+from app.core import response_cache # Invalidación de la caché HTTP del catálogo
+from app.crud.movimiento_inventario_crud import expresion_ajuste_stock
+from app.crud.upsert import upsert_rows
+
+# Reconciliación de products.stock_actual contra el historial de movimientos_inventario.
+# Toda escritura de stock registra su movimiento (incluidos el stock inicial, la importación
+# y la edición de stock_actual, ver movimiento_inventario_crud), así que cualquier diferencia
+# es un drift real.
+#
+# El saldo esperado de cada producto se agrega en SQL (SUM por producto) trabajando por
+# rangos de ids de producto, y cada rango puede procesarse en un proceso distinto.
+# stock_ledger_balances guarda, por producto, el saldo hasta el último movimiento sumado:
+# una ejecución incremental solo suma los movimientos con id posterior a ese checkpoint.
+#
+# Un movimiento cuya transacción confirma después de otra con id mayor puede quedar por
+# detrás del checkpoint. Por eso cada producto con drift en la pasada incremental se
+# verifica recalculando su historial completo antes de informarlo o corregirlo.
+
+def get_rangos_productos(db: Session, chunk_size: int = 1000) -> List[Tuple[int, int]]:
+    """
+    Divide los ids de producto en rangos [desde, hasta] de como máximo chunk_size productos.
+    """
+    ids = db.execute(select(models.Product.id).order_by(models.Product.id)).scalars().all()
+    return [
+        (ids[i], ids[min(i + chunk_size, len(ids)) - 1])
+        for i in range(0, len(ids), chunk_size)
+    ]
+
+def _calcular_saldos(db: Session, filtro, completa: bool) -> List[Tuple[int, int, int, int, Optional[int]]]:
+    """
+    Calcula en una única sentencia (misma instantánea para stock y movimientos), para los
+    productos que cumplen 'filtro': (producto_id, stock_actual, saldo_esperado,
+    ultimo_movimiento_id, checkpoint_previo).
+    Con completa=False parte del saldo guardado en stock_ledger_balances.
+    """
+    producto = models.Product
+    saldo = models.StockLedgerBalance
+    movimiento = models.MovimientoInventario
+
+    if completa:
+        desde_id = literal(0)
+        saldo_base = literal(0)
+    else:
+        desde_id = func.coalesce(saldo.ultimo_movimiento_id, 0)
+        saldo_base = func.coalesce(saldo.saldo, 0)
+
+    stmt = (
+        select(
+            producto.id,
+            producto.stock_actual,
+            saldo_base + func.coalesce(func.sum(expresion_ajuste_stock()), 0),
+            func.coalesce(func.max(movimiento.id), desde_id),
+            saldo.ultimo_movimiento_id,
+        )
+        .select_from(producto)
+        .outerjoin(saldo, saldo.producto_id == producto.id)
+        .outerjoin(movimiento, and_(movimiento.producto_id == producto.id, movimiento.id > desde_id))
+        .where(filtro)
+        .group_by(producto.id, producto.stock_actual, saldo.saldo, saldo.ultimo_movimiento_id)
+    )
+    return [tuple(row) for row in db.execute(stmt).all()]
+
+def reconciliar_rango(
+    db: Session, id_desde: int, id_hasta: int, completa: bool = False, corregir: bool = False
+) -> Tuple[int, List[stock_reconciliation_schemas.StockDrift]]:
+    """
+    Reconcilia los productos con id entre id_desde e id_hasta (incluidos).
+    Avanza sus checkpoints y, si corregir=True, ajusta stock_actual al saldo esperado.
+    Devuelve (productos_revisados, drifts confirmados). Hace commit.
+    """
+    producto = models.Product
+    filas = _calcular_saldos(db, producto.id.between(id_desde, id_hasta), completa)
+
+    saldos: Dict[int, Dict[str, int]] = {}
+    sospechosos: List[int] = []
+    for producto_id, stock, esperado, ultimo_id, checkpoint_previo in filas:
+        # Solo se reescribe el checkpoint si hay movimientos nuevos o aún no existía.
+        if completa or checkpoint_previo is None or ultimo_id != checkpoint_previo:
+            saldos[producto_id] = {"producto_id": producto_id, "saldo": esperado, "ultimo_movimiento_id": ultimo_id}
+        if stock != esperado:
+            sospechosos.append(producto_id)
+
+    # Verificación con el historial completo de los productos con drift
+    drifts: List[stock_reconciliation_schemas.StockDrift] = []
+    if sospechosos:
+        verificadas = filas if completa else _calcular_saldos(db, producto.id.in_(sospechosos), completa=True)
+        for producto_id, stock, esperado, ultimo_id, _ in verificadas:
+            saldos[producto_id] = {"producto_id": producto_id, "saldo": esperado, "ultimo_movimiento_id": ultimo_id}
+            if stock != esperado:
+                drifts.append(stock_reconciliation_schemas.StockDrift(
+                    producto_id=producto_id, stock_actual=stock, stock_esperado=esperado, drift=stock - esperado,
+                ))
+
+    try:
+        upsert_rows(
+            db, models.StockLedgerBalance.__table__, list(saldos.values()),
+            key_columns=["producto_id"], touch_column="actualizado_en",
+        )
+        if corregir and drifts:
+            # Corrección relativa: no pisa movimientos registrados después de la lectura.
+            tabla = producto.__table__
+            db.execute(
+                update(tabla)
+                .where(tabla.c.id == bindparam("b_producto_id"))
+                .values(stock_actual=tabla.c.stock_actual - bindparam("b_drift")),
+                [{"b_producto_id": d.producto_id, "b_drift": d.drift} for d in drifts],
+            )
+            for d in drifts:
+                d.corregido = True
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if corregir and drifts:
+        # Solo invalida la caché de este proceso: desde reconcile_stock.py, la API debe reiniciarse
+        response_cache.invalidate(response_cache.PRODUCTS)
+    return len(filas), drifts
+
+def _init_worker() -> None:
+    # Las conexiones heredadas del proceso padre no deben reutilizarse en el hijo.
+    engine.dispose(close=False)
+
+def _reconciliar_rango_worker(args: Tuple[int, int, bool, bool]) -> Tuple[int, List[stock_reconciliation_schemas.StockDrift]]:
+    id_desde, id_hasta, completa, corregir = args
+    db = SessionLocal()
+    try:
+        return reconciliar_rango(db, id_desde, id_hasta, completa=completa, corregir=corregir)
+    finally:
+        db.close()
+
+def reconciliar_stock(
+    chunk_size: int = 1000, workers: int = 1, completa: bool = False, corregir: bool = False
+) -> stock_reconciliation_schemas.StockReconciliationReport:
+    """
+    Reconcilia el stock de todos los productos. Con workers > 1 los rangos de productos se
+    reparten en un pool de procesos (cada uno con su propia conexión y transacción por rango).
+    """
+    inicio = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        rangos = get_rangos_productos(db, chunk_size)
+    finally:
+        db.close()
+
+    tareas: Sequence[Tuple[int, int, bool, bool]] = [(desde, hasta, completa, corregir) for desde, hasta in rangos]
+    if workers > 1 and len(tareas) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tareas)), initializer=_init_worker) as pool:
+            resultados = list(pool.map(_reconciliar_rango_worker, tareas))
+    else:
+        resultados = [_reconciliar_rango_worker(t) for t in tareas]
+
+    drifts = [d for _, drifts_rango in resultados for d in drifts_rango]
+    return stock_reconciliation_schemas.StockReconciliationReport(
+        inicio=inicio,
+        fin=datetime.now(timezone.utc),
+        completa=completa,
+        productos_revisados=sum(revisados for revisados, _ in resultados),
+        productos_con_drift=len(drifts),
+        productos_corregidos=sum(1 for d in drifts if d.corregido),
+        drifts=drifts,
+    )
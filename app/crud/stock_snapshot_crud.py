@@ -0,0 +1,164 @@
+# app/crud/stock_snapshot_crud.py
+
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.database import SessionLocal
+from app.schemas import product_schemas
+from app.crud.movimiento_inventario_crud import expresion_ajuste_stock
+from app.crud.movimiento_particion_crud import comprobar_no_archivada
+from app.crud.stock_reconciliation_crud import get_rangos_productos
+from app.crud.upsert import upsert_rows
+
+# Stock a una fecha = último cierre (stock_snapshots) anterior o igual a la fecha
+#                     + movimientos desde ese cierre hasta la fecha.
+# Así el coste depende de los movimientos posteriores al cierre, no de todo el historial.
+# Los cierres asumen que no se registran movimientos con fecha anterior a un cierre ya
+# generado; si se hace (ej: carga histórica), hay que regenerar los cierres afectados.
+# Tras la retención (movimiento_particion_crud) solo se responden fechas desde el corte:
+# los movimientos anteriores están resumidos en el saldo de apertura (SALDO_APERTURA).
+
+def normalizar_fecha(fecha: datetime) -> datetime:
+    """
+    Las fechas sin zona horaria se interpretan como UTC.
+    """
+    if fecha.tzinfo is None:
+        return fecha.replace(tzinfo=timezone.utc)
+    return fecha
+
+def _ultimos_cierres(hasta: datetime, inclusive: bool, producto_ids=None):
+    """
+    Subconsulta (producto_id, fecha_corte, stock) con el último cierre de cada producto
+    anterior (o igual, si inclusive) a 'hasta'. producto_ids limita los productos (subconsulta o lista).
+    """
+    cierre = models.StockSnapshot
+    condicion = cierre.fecha_corte <= hasta if inclusive else cierre.fecha_corte < hasta
+    ultimos = select(cierre.producto_id, func.max(cierre.fecha_corte).label("fecha_corte")).where(condicion)
+    if producto_ids is not None:
+        ultimos = ultimos.where(cierre.producto_id.in_(producto_ids))
+    ultimos = ultimos.group_by(cierre.producto_id).subquery()
+    return (
+        select(cierre.producto_id, cierre.fecha_corte, cierre.stock)
+        .join(ultimos, and_(cierre.producto_id == ultimos.c.producto_id, cierre.fecha_corte == ultimos.c.fecha_corte))
+        .subquery()
+    )
+
+# --- Generación de cierres ---
+
+def generar_snapshots_rango(db: Session, fecha_corte: datetime, id_desde: int, id_hasta: int) -> int:
+    """
+    Genera el cierre a fecha_corte de los productos con id entre id_desde e id_hasta que
+    tuvieron movimientos desde su cierre anterior. Devuelve el número de cierres escritos. Hace commit.
+    """
+    fecha_corte = normalizar_fecha(fecha_corte)
+    producto = models.Product
+    movimiento = models.MovimientoInventario
+    # Solo los cierres del rango: sin filtro, cada rango agruparía la tabla de cierres entera
+    base = _ultimos_cierres(
+        fecha_corte, inclusive=False, producto_ids=select(producto.id).where(producto.id.between(id_desde, id_hasta))
+    )
+
+    stmt = (
+        select(producto.id, func.coalesce(base.c.stock, 0) + func.sum(expresion_ajuste_stock()))
+        .select_from(producto)
+        .outerjoin(base, base.c.producto_id == producto.id)
+        .join(movimiento, and_(
+            movimiento.producto_id == producto.id,
+            movimiento.fecha < fecha_corte,
+            or_(base.c.fecha_corte.is_(None), movimiento.fecha >= base.c.fecha_corte),
+        ))
+        .where(producto.id.between(id_desde, id_hasta))
+        .group_by(producto.id, base.c.stock)
+    )
+    filas = [
+        {"producto_id": producto_id, "fecha_corte": fecha_corte, "stock": stock}
+        for producto_id, stock in db.execute(stmt).all()
+    ]
+    try:
+        upsert_rows(db, models.StockSnapshot.__table__, filas, key_columns=["producto_id", "fecha_corte"])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(filas)
+
+def generar_snapshots(fecha_corte: datetime, chunk_size: int = 1000) -> int:
+    """
+    Genera el cierre a fecha_corte para todos los productos, por rangos de ids
+    (una transacción por rango). Devuelve el número de cierres escritos.
+    """
+    db = SessionLocal()
+    try:
+        return sum(
+            generar_snapshots_rango(db, fecha_corte, desde, hasta)
+            for desde, hasta in get_rangos_productos(db, chunk_size)
+        )
+    finally:
+        db.close()
+
+# --- Consulta de stock a una fecha ---
+
+def _stocks_as_of_stmt(productos, as_of: datetime):
+    """
+    (producto_id, fecha_snapshot, stock) a la fecha as_of de los productos de la subconsulta
+    'productos' (columna id), en una sola consulta: último cierre <= as_of más los movimientos
+    posteriores. Solo devuelve filas de productos existentes.
+    """
+    movimiento = models.MovimientoInventario
+    base = _ultimos_cierres(as_of, inclusive=True, producto_ids=select(productos.c.id))
+    return (
+        select(
+            productos.c.id,
+            base.c.fecha_corte,
+            func.coalesce(base.c.stock, 0) + func.coalesce(func.sum(expresion_ajuste_stock()), 0),
+        )
+        .select_from(productos)
+        .outerjoin(base, base.c.producto_id == productos.c.id)
+        .outerjoin(movimiento, and_(
+            movimiento.producto_id == productos.c.id,
+            movimiento.fecha <= as_of,
+            or_(base.c.fecha_corte.is_(None), movimiento.fecha >= base.c.fecha_corte),
+        ))
+        .group_by(productos.c.id, base.c.fecha_corte, base.c.stock)
+        .order_by(productos.c.id)
+    )
+
+def get_stock_as_of(db: Session, producto_id: int, as_of: datetime) -> Optional[product_schemas.ProductStock]:
+    """
+    Stock de un producto a la fecha as_of: último cierre <= as_of más los movimientos posteriores.
+    Retorna None si el producto no existe (se comprueba en la misma consulta).
+    Lanza ValueError si as_of es anterior al corte de la retención.
+    """
+    as_of = normalizar_fecha(as_of)
+    comprobar_no_archivada(db, as_of)
+    producto = select(models.Product.id).where(models.Product.id == producto_id).subquery()
+    fila = db.execute(_stocks_as_of_stmt(producto, as_of)).first()
+    if fila is None:
+        return None
+    _, fecha_snapshot, stock = fila
+    return product_schemas.ProductStock(producto_id=producto_id, as_of=as_of, stock=stock, fecha_snapshot=fecha_snapshot)
+
+def get_stocks_as_of(
+    db: Session, as_of: datetime, skip: int = 0, limit: int = 100, category_id: Optional[int] = None
+) -> List[product_schemas.ProductStock]:
+    """
+    Stock a la fecha as_of de una página de productos (ordenados por id), en una sola consulta.
+    Lanza ValueError si as_of es anterior al corte de la retención.
+    """
+    as_of = normalizar_fecha(as_of)
+    comprobar_no_archivada(db, as_of)
+    producto = models.Product
+
+    pagina = select(producto.id)
+    if category_id is not None:
+        pagina = pagina.where(producto.category_id == category_id)
+    pagina = pagina.order_by(producto.id).offset(skip).limit(limit).subquery()
+
+    return [
+        product_schemas.ProductStock(producto_id=producto_id, as_of=as_of, stock=stock, fecha_snapshot=fecha_snapshot)
+        for producto_id, fecha_snapshot, stock in db.execute(_stocks_as_of_stmt(pagina, as_of)).all()
+    ]
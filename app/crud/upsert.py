@@ -0,0 +1,42 @@
+# app/crud/upsert.py
+# INSERT ... ON CONFLICT DO UPDATE (upsert) por lotes, según el dialecto de la base de datos.
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import Table, and_, delete, func, insert, or_
+from sqlalchemy.orm import Session
+
+def upsert_rows(
+    db: Session,
+    table: Table,
+    rows: List[Dict[str, Any]],
+    key_columns: Sequence[str],
+    touch_column: Optional[str] = None,
+) -> None:
+    """
+    Inserta las filas o, si ya existe una con la misma clave (key_columns), actualiza el resto
+    de columnas. touch_column (ej: 'actualizado_en') se fija a now() al actualizar.
+    No hace commit.
+    """
+    if not rows:
+        return
+    dialecto = db.get_bind().dialect.name
+    columnas = [c for c in rows[0] if c not in key_columns]
+
+    if dialecto in ("postgresql", "sqlite"):
+        if dialecto == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table)
+        set_ = {c: stmt.excluded[c] for c in columnas}
+        if touch_column:
+            set_[touch_column] = func.now()
+        stmt = stmt.on_conflict_do_update(index_elements=[table.c[k] for k in key_columns], set_=set_)
+        db.execute(stmt, rows)
+    else:
+        # Otros dialectos: borrar las claves existentes e insertar de nuevo
+        db.execute(delete(table).where(or_(*[
+            and_(*[table.c[k] == row[k] for k in key_columns]) for row in rows
+        ])))
+        db.execute(insert(table), rows)
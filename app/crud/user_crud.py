@@ -1,11 +1,15 @@
 # app/crud/user_crud.py
 
-from typing import Optional
+from typing import NoReturn, Optional
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.db import models # Importamos nuestros modelos SQLAlchemy (models.User)
 from app.schemas import user_schemas # Importamos nuestros schemas Pydantic para usuarios
 from app.security.auth_security import get_password_hash, verify_password # Funciones de hashing
+from app.security.principal_cache import principal_cache # Para invalidar el usuario cacheado
+from app.crud import integrity
 
 # --- Operaciones de Lectura (Read) ---
 
@@ -31,22 +35,46 @@ def get_user_by_username(db: Session, username: str) -> Optional[models.User]:
 
 # --- Operación de Creación (Create) ---
 
-def create_user(db: Session, user: user_schemas.UserCreate) -> models.User:
+# Columnas de user_schemas.User que retorna el INSERT ... RETURNING de create_user
+USER_RETURNING = (models.User.id, models.User.username, models.User.email, models.User.is_active)
+
+def raise_user_conflict(error: IntegrityError, user: user_schemas.UserCreate) -> NoReturn:
     """
-    Crea un nuevo usuario en la base de datos.
-    La contraseña se hashea antes de guardarla.
+    ValueError si el nombre de usuario o el correo ya están registrados (restricciones UNIQUE);
+    cualquier otra violación se relanza. Se comparte con app/crud/aio.
     """
-    hashed_password = get_password_hash(user.password)
-    db_user = models.User(
-        username=user.username,
-        email=user.email,
-        hashed_password=hashed_password,
-        is_active=True # Por defecto, los usuarios se crean activos
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    if integrity.is_violation(error, integrity.UNIQUE, "username"):
+        raise ValueError(f"El nombre de usuario '{user.username}' ya está registrado.")
+    if integrity.is_violation(error, integrity.UNIQUE, "email"):
+        raise ValueError(f"El correo electrónico '{user.email}' ya está registrado.")
+    raise error
+
+def create_user(
+    db: Session, user: user_schemas.UserCreate, hashed_password: Optional[str] = None
+) -> dict:
+    """
+    Crea un nuevo usuario en la base de datos con un INSERT ... RETURNING.
+    La contraseña se hashea antes de guardarla, salvo que se pase ya hasheada
+    (p. ej. calculada en el pool de contraseñas, ver app/security/password_pool.py).
+    Lanza ValueError si el nombre de usuario o el correo ya están registrados.
+    Retorna un dict con el formato de user_schemas.User.
+    """
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
+    try:
+        row = db.execute(
+            insert(models.User).values(
+                username=user.username,
+                email=user.email,
+                hashed_password=hashed_password,
+                is_active=True # Por defecto, los usuarios se crean activos
+            ).returning(*USER_RETURNING)
+        ).one()
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise_user_conflict(e, user)
+    return row._asdict()
 
 # --- Operación de Autenticación (No es CRUD puro, pero va aquí por lógica) ---
 
@@ -87,6 +115,8 @@ def update_user_activity(db: Session, user_id: int, is_active: bool) -> Optional
     db.add(db_user) # Opcional para objetos ya rastreados si solo modificas, pero buena práctica
     db.commit()
     db.refresh(db_user)
+    # Los tokens cacheados de este usuario deben volver a leer su estado
+    principal_cache.invalidate_user(db_user.id)
     return db_user
 
 # Podríamos añadir funciones para actualizar email, contraseña (con más seguridad), etc.
\ No newline at end of file
@@ -1,8 +1,13 @@
 # app/db/database.py
-from sqlalchemy import create_engine
+from typing import AsyncGenerator, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings # Importa la configuración
+from app.db.pool_stats import timed_pool_class
 
 # --- Verificación Crucial ---
 # Asegurarse de que la URL de la base de datos se cargó correctamente desde .env
@@ -15,15 +20,47 @@ if not settings.DATABASE_URL or settings.DATABASE_URL == "":
 
 # --- Configuración de SQLAlchemy ---
 
+def get_pool_kwargs(url: str, pool_class: type = QueuePool) -> dict:
+    """
+    Parámetros del pool de conexiones leídos de settings (DB_POOL_*).
+    El pool se instrumenta para medir los tiempos de espera (ver /health/ready).
+    SQLite usa su propio pool, así que en ese caso no se pasa ninguno.
+    """
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": timed_pool_class(pool_class),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 # Crea el motor de SQLAlchemy usando la URL del pooler leída desde settings
 # Ejemplo URL Pooler: postgresql://<user.project_ref>:<password>@<pooler_host>:<port>/<db>
 engine = create_engine(
     settings.DATABASE_URL,
-    # pool_pre_ping=True # Opcional: verifica conexión antes de usarla del pool
-    # pool_size=10       # Opcional: tamaño del pool (ajustar según necesidad)
-    # max_overflow=20    # Opcional: conexiones temporales extra
+    **get_pool_kwargs(settings.DATABASE_URL),
 )
 
+def enable_sqlite_foreign_keys(sync_engine) -> None:
+    """
+    SQLite no comprueba las claves foráneas salvo que se active en cada conexión.
+    Las escrituras confían en las restricciones de la base de datos (ver app/crud/integrity.py),
+    así que se activan para que SQLite se comporte como PostgreSQL.
+    """
+    if sync_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _foreign_keys_on(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+enable_sqlite_foreign_keys(engine)
+
 # Crea una fábrica de sesiones configurada para usar el motor
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -37,4 +74,45 @@ def get_db():
     try:
         yield db # Proporciona la sesión al endpoint
     finally:
-        db.close() # Asegura que la sesión se cierre después de usarla
\ No newline at end of file
+        db.close() # Asegura que la sesión se cierre después de usarla
+
+
+# --- Configuración Asíncrona (AsyncEngine + asyncpg) ---
+
+def get_async_database_url(url: str) -> str:
+    """
+    Convierte una URL síncrona en su equivalente con driver asíncrono.
+    postgresql:// (o postgres://) -> postgresql+asyncpg:// y sqlite:// -> sqlite+aiosqlite://.
+    """
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+# El motor asíncrono solo se crea si el modo asíncrono está activado,
+# así no se exige el driver asíncrono en despliegues que no lo usan.
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+if settings.DB_ASYNC_MODE:
+    _async_url = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(
+        _async_url,
+        **get_pool_kwargs(_async_url, AsyncAdaptedQueuePool),
+    )
+    enable_sqlite_foreign_keys(async_engine.sync_engine)
+    # expire_on_commit=False: en modo asíncrono no se pueden hacer cargas perezosas
+    # implícitas al serializar la respuesta, así que no expiramos los objetos tras el commit.
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+# --- Dependencia Asíncrona para FastAPI ---
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    if AsyncSessionLocal is None:
+        raise RuntimeError("El modo asíncrono de base de datos no está activado (DB_ASYNC_MODE=False).")
+    async with AsyncSessionLocal() as db:
+        yield db # La sesión se cierra al salir del bloque 'async with'
@@ -9,9 +9,11 @@ from sqlalchemy import (
     Text,
     ForeignKey,
     DateTime, # ¡NUEVO! Para el campo fecha
+    Date,
     # UniqueConstraint, # Ya lo teníamos
-    # Index # Ya lo teníamos
+    Index,
 )
+from sqlalchemy import DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func # Para server_default=func.now()
 
@@ -77,11 +79,11 @@ class Product(Base):
     codigo_sku = Column(String(100), unique=True, index=True, nullable=True)
     numero_serie = Column(String(100), unique=True, nullable=True) # Asumiendo único por instancia de producto
 
-    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True, index=True)
     category = relationship("Category", back_populates="products")
 
     # ¡NUEVO CAMPO Y RELACIÓN!
-    proveedor_id = Column(Integer, ForeignKey("proveedores.id"), nullable=True) # Un producto puede no tener proveedor
+    proveedor_id = Column(Integer, ForeignKey("proveedores.id"), nullable=True, index=True) # Un producto puede no tener proveedor
     proveedor = relationship("Proveedor", back_populates="products")
 
     # ¡NUEVA RELACIÓN! Un producto puede tener muchos movimientos de inventario
@@ -92,8 +94,76 @@ class Product(Base):
         return f"<Product(id={self.id}, name='{self.name}')>"
 
 
+# Índices parciales para los productos con stock bajo (stock_actual <= stock_minimo):
+# solo contienen esos productos, así que siguen siendo pequeños aunque el catálogo crezca.
+# La consulta debe usar el mismo predicado y la misma expresión de déficit para aprovecharlos.
+STOCK_BAJO = Product.stock_actual <= Product.stock_minimo
+
+Index(
+    "ix_products_low_stock_deficit",
+    (Product.stock_minimo - Product.stock_actual).self_group().desc(),
+    Product.id,
+    postgresql_where=STOCK_BAJO,
+    sqlite_where=STOCK_BAJO,
+)
+Index(
+    "ix_products_low_stock_category",
+    Product.category_id,
+    postgresql_where=STOCK_BAJO,
+    sqlite_where=STOCK_BAJO,
+)
+
+
+# --- Búsqueda de productos (name, description, codigo_sku, numero_serie) ---
+# PostgreSQL: índice GIN sobre un tsvector (nombre y códigos con peso A, descripción con peso C)
+# e índices GIN pg_trgm para similitud en el nombre y prefijos de SKU / número de serie.
+# SQLite: tabla FTS5 'products_fts' (contenido externo) sincronizada con triggers.
+# La consulta debe usar exactamente PRODUCT_SEARCH_DOCUMENT para aprovechar el índice.
+PRODUCT_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(codigo_sku, '') || ' ' || coalesce(numero_serie, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'C')"
+)
+
+PRODUCT_SEARCH_DDL_POSTGRESQL = [
+    f"CREATE INDEX IF NOT EXISTS ix_products_search_document ON products USING gin (({PRODUCT_SEARCH_DOCUMENT}))",
+    "CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_products_codigo_sku_trgm ON products USING gin (codigo_sku gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_products_numero_serie_trgm ON products USING gin (numero_serie gin_trgm_ops)",
+]
+
+PRODUCT_SEARCH_DDL_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+    "name, description, codigo_sku, numero_serie, "
+    "content='products', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts(rowid, name, description, codigo_sku, numero_serie) "
+    "VALUES (new.id, new.name, new.description, new.codigo_sku, new.numero_serie); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description, codigo_sku, numero_serie) "
+    "VALUES ('delete', old.id, old.name, old.description, old.codigo_sku, old.numero_serie); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description, codigo_sku, numero_serie ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description, codigo_sku, numero_serie) "
+    "VALUES ('delete', old.id, old.name, old.description, old.codigo_sku, old.numero_serie); "
+    "INSERT INTO products_fts(rowid, name, description, codigo_sku, numero_serie) "
+    "VALUES (new.id, new.name, new.description, new.codigo_sku, new.numero_serie); END",
+]
+
+# Para que Base.metadata.create_all (ej: seed_db.py) también cree la búsqueda; Alembic lo hace en su migración.
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+for _ddl in PRODUCT_SEARCH_DDL_POSTGRESQL:
+    event.listen(Product.__table__, "after_create", DDL(_ddl).execute_if(dialect="postgresql"))
+for _ddl in PRODUCT_SEARCH_DDL_SQLITE:
+    event.listen(Product.__table__, "after_create", DDL(_ddl).execute_if(dialect="sqlite"))
+event.listen(Product.__table__, "before_drop", DDL("DROP TABLE IF EXISTS products_fts").execute_if(dialect="sqlite"))
+
+
 # ¡NUEVO MODELO!
 class MovimientoInventario(Base):
+    # En PostgreSQL (migraciones de Alembic) la tabla está particionada por meses de 'fecha'
+    # (movimientos_inventario_pAAAA_MM más una partición DEFAULT) y su clave primaria física
+    # es (id, fecha): las particiones las mantiene movimiento_particion_crud. Para el ORM la
+    # identidad sigue siendo 'id', que asigna la secuencia.
     __tablename__ = "movimientos_inventario"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -116,5 +186,75 @@ class MovimientoInventario(Base):
     producto = relationship("Product", back_populates="movimientos_inventario")
     responsable = relationship("User", back_populates="movimientos_inventario")
 
+    __table_args__ = (
+        # Historial de un producto (ORDER BY fecha DESC, id DESC y cursor por (fecha, id), recorriendo
+        # el índice al revés) y acceso por rango de fechas (stock a una fecha)
+        Index("ix_movimientos_inventario_producto_id_fecha_id", "producto_id", "fecha", "id"),
+    )
+
+    def __repr__(self):
+        return f"<MovimientoInventario(id={self.id}, producto_id={self.producto_id}, tipo='{self.tipo_movimiento}', cantidad={self.cantidad})>"
+
+
+class StockLedgerBalance(Base):
+    # Saldo de stock reconstruido a partir del historial de movimientos (reconciliación).
+    # Es el checkpoint por producto: 'saldo' es la suma con signo de sus movimientos
+    # hasta 'ultimo_movimiento_id' inclusive, así la siguiente ejecución solo suma los nuevos.
+    __tablename__ = "stock_ledger_balances"
+
+    producto_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    saldo = Column(Integer, nullable=False, default=0)
+    ultimo_movimiento_id = Column(Integer, nullable=False, default=0)
+    actualizado_en = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<StockLedgerBalance(producto_id={self.producto_id}, saldo={self.saldo}, hasta={self.ultimo_movimiento_id})>"
+
+
+class StockSnapshot(Base):
+    # Cierre de stock por producto: 'stock' es la suma con signo de sus movimientos con
+    # fecha anterior a 'fecha_corte'. Solo se guarda si el producto tuvo movimientos
+    # desde su cierre anterior (si no, el cierre anterior sigue siendo válido).
+    __tablename__ = "stock_snapshots"
+
+    producto_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    fecha_corte = Column(DateTime(timezone=True), primary_key=True)
+    stock = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<StockSnapshot(producto_id={self.producto_id}, fecha_corte={self.fecha_corte}, stock={self.stock})>"
+
+
+class MovimientoArchivado(Base):
+    # Registro de la retención: un mes de movimientos archivado en 'archivo' (CSV comprimido)
+    # y sustituido por saldos de apertura (SALDO_APERTURA) con fecha 'fecha_corte'. El mayor
+    # fecha_corte es el inicio del historial que queda en movimientos_inventario.
+    __tablename__ = "movimientos_archivados"
+
+    mes = Column(Date, primary_key=True)
+    fecha_corte = Column(DateTime(timezone=True), primary_key=True)
+    filas = Column(Integer, nullable=False)
+    archivo = Column(String(500), nullable=False)
+    archivado_en = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<MovimientoArchivado(mes={self.mes}, fecha_corte={self.fecha_corte}, filas={self.filas})>"
+
+
+class MovimientoDiario(Base):
+    # Resumen diario (día UTC) de movimientos por producto y tipo, para las estadísticas.
+    # Se incrementa al registrar movimientos y se puede reconstruir con rollup_movimientos.py.
+    __tablename__ = "movimientos_diarios"
+
+    dia = Column(Date, primary_key=True)
+    producto_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    tipo_movimiento = Column(String(50), primary_key=True) # En mayúsculas
+    unidades = Column(Integer, nullable=False, default=0)
+    movimientos = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_movimientos_diarios_producto_id_dia", "producto_id", "dia"),
+    )
+
     def __repr__(self):
-        return f"<MovimientoInventario(id={self.id}, producto_id={self.producto_id}, tipo='{self.tipo_movimiento}', cantidad={self.cantidad})>"
\ No newline at end of file
+        return f"<MovimientoDiario(dia={self.dia}, producto_id={self.producto_id}, tipo='{self.tipo_movimiento}', unidades={self.unidades})>"
@@ -0,0 +1,103 @@
+# app/db/pool_stats.py
+# Instrumentación del pool de conexiones de SQLAlchemy para el endpoint de readiness.
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool
+
+# Número de esperas recientes que se guardan para calcular percentiles
+WAIT_SAMPLES = 1000
+
+
+class PoolWaitStats:
+    """
+    Guarda los tiempos de espera (ms) de las últimas extracciones de conexión del pool
+    en un buffer circular, y calcula percentiles sobre ellos.
+    """
+
+    def __init__(self, maxlen: int = WAIT_SAMPLES):
+        self._samples: deque = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.total_checkouts = 0
+        self.timeouts = 0
+
+    def record(self, wait_ms: float) -> None:
+        with self._lock:
+            self._samples.append(wait_ms)
+            self.total_checkouts += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def percentiles(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {"p50": None, "p95": None, "p99": None, "max": None}
+
+        def pick(q: float) -> float:
+            return round(samples[min(len(samples) - 1, int(q * len(samples)))], 3)
+
+        return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": round(samples[-1], 3)}
+
+
+def timed_pool_class(base: type) -> type:
+    """
+    Crea una subclase del pool 'base' (QueuePool, AsyncAdaptedQueuePool...) que mide
+    cuánto tarda cada petición en obtener una conexión, incluida la espera en cola.
+    Las estadísticas quedan en el atributo 'wait_stats' de la instancia del pool.
+    """
+
+    class TimedPool(base):
+        def __init__(self, *args: Any, **kwargs: Any):
+            super().__init__(*args, **kwargs)
+            self.wait_stats = PoolWaitStats()
+
+        def recreate(self) -> Pool:
+            new_pool = super().recreate()
+            new_pool.wait_stats = self.wait_stats # Conservamos el histórico tras dispose()
+            return new_pool
+
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except exc.TimeoutError: # Solo la espera agotada; los fallos al conectar no son timeouts
+                self.wait_stats.record_timeout()
+                raise
+            self.wait_stats.record((time.perf_counter() - start) * 1000)
+            return conn
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+def get_pool_status(pool: Pool) -> Dict[str, Any]:
+    """
+    Resume el estado de un pool: conexiones en uso, libres, overflow y tiempos de espera.
+    Los pools sin cola (p. ej. SQLite en memoria) solo informan de su clase.
+    """
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if hasattr(pool, "checkedout"):
+        size = pool.size()
+        overflow = pool.overflow()
+        status.update({
+            "size": size,
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            # overflow() es negativo mientras el pool base aún no ha abierto todas sus conexiones
+            "overflow": max(overflow, 0),
+            "max_overflow": getattr(pool, "_max_overflow", None),
+            "timeout_s": pool.timeout(),
+        })
+    wait_stats: Optional[PoolWaitStats] = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        status["checkouts"] = wait_stats.total_checkouts
+        status["checkout_timeouts"] = wait_stats.timeouts
+        status["wait_ms"] = wait_stats.percentiles()
+    return status
@@ -0,0 +1,206 @@
+# app/db/query_inspector.py
+# Inspector de consultas para desarrollo (settings.QUERY_INSPECTOR_ENABLED).
+#
+# Cuenta las sentencias SQL de cada petición y detecta patrones N+1: la misma sentencia
+# ejecutada muchas veces con parámetros distintos (típico de cargas perezosas de
+# relaciones al serializar la respuesta). Registra en el log el punto del código que las
+# lanza y, con QUERY_BUDGET, falla la petición que supere el número máximo de consultas.
+#
+# En pruebas:
+#     with assert_max_queries(2):
+#         product_crud.get_products(db)
+# o, a través de la API, con la cabecera X-DB-Query-Count (assert_response_max_queries).
+
+import logging
+import os
+import sys
+import sysconfig
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_THIS_FILE = os.path.abspath(__file__)
+# Biblioteca estándar y paquetes instalados
+_LIBRARY_DIRS = tuple({
+    os.path.abspath(path) for path in (sysconfig.get_paths()["stdlib"], sysconfig.get_paths()["purelib"], sysconfig.get_paths()["platlib"])
+})
+# Parámetros distintos que se guardan por sentencia (basta para distinguir N+1 de repeticiones)
+_MAX_PARAM_SETS = 50
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Se ha superado el número máximo de consultas permitido para la petición."""
+
+
+def _call_site() -> str:
+    """
+    Primer frame del código de la aplicación (app/) que lanzó la consulta; si no hay
+    ninguno, el primero que no sea de una librería (ej: un script o una prueba).
+    Si tampoco, la consulta viene de una librería (ej: serialización de la respuesta).
+    """
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename == _THIS_FILE:
+            pass
+        elif filename.startswith(_APP_DIR):
+            return _format_frame(frame, filename)
+        elif fallback is None and not filename.startswith(_LIBRARY_DIRS) and not filename.startswith("<"):
+            fallback = _format_frame(frame, filename)
+        frame = frame.f_back
+    return fallback or "librerías (¿carga perezosa al serializar la respuesta?)"
+
+
+def _format_frame(frame, filename: str) -> str:
+    if filename.startswith(_APP_DIR):
+        filename = os.path.relpath(filename, os.path.dirname(_APP_DIR))
+    return f"{filename}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+
+class _StatementStats:
+    __slots__ = ("count", "param_sets", "call_site")
+
+    def __init__(self, call_site: str):
+        self.count = 0
+        self.param_sets = set()
+        self.call_site = call_site
+
+
+class QueryTracker:
+    """
+    Consultas ejecutadas dentro de un contexto (una petición o un bloque track_queries).
+    """
+
+    def __init__(self, budget: Optional[int] = None):
+        self.budget = budget or None
+        self.count = 0
+        self.statements: Dict[str, _StatementStats] = {}
+
+    def record(self, statement: str, parameters) -> None:
+        self.count += 1
+        stats = self.statements.get(statement)
+        if stats is None:
+            stats = self.statements[statement] = _StatementStats(_call_site())
+        stats.count += 1
+        if len(stats.param_sets) < _MAX_PARAM_SETS:
+            stats.param_sets.add(repr(parameters))
+        if self.budget is not None and self.count > self.budget:
+            raise QueryBudgetExceeded(
+                f"Presupuesto de consultas superado: {self.count} > {self.budget}. "
+                f"Última: {statement[:200]!r} desde {stats.call_site}"
+            )
+
+    def n_plus_one(self, threshold: int) -> List[Tuple[str, int, str]]:
+        """
+        Sentencias ejecutadas al menos 'threshold' veces con parámetros distintos:
+        (sentencia, ejecuciones, punto de llamada).
+        """
+        return [
+            (statement, stats.count, stats.call_site)
+            for statement, stats in self.statements.items()
+            if stats.count >= threshold and len(stats.param_sets) > 1
+        ]
+
+    def report(self) -> str:
+        lines = [f"{self.count} consultas:"]
+        for statement, stats in sorted(self.statements.items(), key=lambda item: -item[1].count):
+            lines.append(f"  {stats.count}x {statement[:200]!r} desde {stats.call_site}")
+        return "\n".join(lines)
+
+
+_current_tracker: ContextVar[Optional[QueryTracker]] = ContextVar("current_query_tracker", default=None)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Registra el inspector en un motor. Para un AsyncEngine, pasar async_engine.sync_engine.
+    Sin un QueryTracker activo (petición o track_queries) no hace nada.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        tracker = _current_tracker.get()
+        if tracker is not None:
+            tracker.record(statement, parameters)
+
+
+@contextmanager
+def track_queries(budget: Optional[int] = None) -> Iterator[QueryTracker]:
+    """
+    Cuenta las consultas ejecutadas dentro del bloque (en este hilo / contexto).
+    El motor debe estar instrumentado (instrument_engine).
+    """
+    tracker = QueryTracker(budget)
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryTracker]:
+    """
+    Falla con AssertionError si el bloque ejecuta más de max_queries consultas.
+    """
+    with track_queries() as tracker:
+        yield tracker
+    if tracker.count > max_queries:
+        raise AssertionError(f"Se esperaban como máximo {max_queries} consultas. {tracker.report()}")
+
+
+def assert_response_max_queries(response, max_queries: int) -> None:
+    """
+    Comprueba la cabecera X-DB-Query-Count de una respuesta (requiere QUERY_INSPECTOR_ENABLED).
+    """
+    value = response.headers.get(QUERY_COUNT_HEADER)
+    if value is None:
+        raise AssertionError(f"La respuesta no incluye {QUERY_COUNT_HEADER}: ¿está activado QUERY_INSPECTOR_ENABLED?")
+    if int(value) > max_queries:
+        raise AssertionError(f"Se esperaban como máximo {max_queries} consultas y se ejecutaron {value}.")
+
+
+class QueryInspectorMiddleware:
+    """
+    Middleware ASGI: un QueryTracker por petición. Añade X-DB-Query-Count a la respuesta
+    (consultas hechas hasta enviar las cabeceras; en las respuestas en streaming no incluye
+    las del cuerpo) y registra en el log los posibles N+1 al terminar.
+    """
+
+    def __init__(self, app: ASGIApp, budget: int = 0, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.budget = budget
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tracker = QueryTracker(self.budget)
+        token = _current_tracker.set(tracker)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[QUERY_COUNT_HEADER] = str(tracker.count)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_tracker.reset(token)
+            for statement, count, call_site in tracker.n_plus_one(self.n_plus_one_threshold):
+                logger.warning(
+                    "Posible N+1 en %s %s: %d ejecuciones de %r desde %s",
+                    scope["method"], scope["path"], count, statement[:200], call_site,
+                )
@@ -1,10 +1,21 @@
 # scl_backend_fastapi/app/main.py
 
-from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse
 from starlette.middleware.cors import CORSMiddleware
 
+import time
+
+from sqlalchemy import text
+
 from app.core.config import settings
+from app.db import database
+from app.db.pool_stats import get_pool_status
+from app.core.response_cache import CatalogCacheMiddleware
+from app.core import metrics
+from app.db import query_inspector
+from app.security.principal_cache import principal_cache
+from app.security.password_pool import PasswordPoolSaturated, password_pool
 
 # --- Importar los routers individuales directamente ---
 from app.api.v1 import auth_router
@@ -15,12 +26,42 @@ from app.api.v1 import movimiento_inventario_router
 # Asegúrate de que los nombres de archivo de tus routers coincidan
 # y que cada uno de esos archivos tenga una variable 'router = APIRouter()'
 
+# --- Routers asíncronos (solo se usan si DB_ASYNC_MODE está activado) ---
+from app.api.v1.aio import auth_router as async_auth_router
+from app.api.v1.aio import category_router as async_category_router
+from app.api.v1.aio import product_router as async_product_router
+from app.api.v1.aio import proveedor_router as async_proveedor_router
+from app.api.v1.aio import movimiento_inventario_router as async_movimiento_inventario_router
+
+
+def select_router(sync_router: APIRouter, async_router: APIRouter) -> APIRouter:
+    """
+    Devuelve el router a montar según settings.DB_ASYNC_MODE.
+    En modo asíncrono, cada ruta del router síncrono se sustituye por su equivalente
+    asíncrona (mismo path y métodos) si existe; las rutas sin versión asíncrona se
+    mantienen síncronas. Se conserva el orden del router síncrono, que es el que
+    determina qué ruta coincide primero.
+    """
+    if not settings.DB_ASYNC_MODE:
+        return sync_router
+    async_routes = {(route.path, frozenset(route.methods)): route for route in async_router.routes}
+    merged = APIRouter()
+    merged.routes.extend(
+        async_routes.get((route.path, frozenset(route.methods)), route) for route in sync_router.routes
+    )
+    return merged
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
 )
 
+# --- Caché HTTP del catálogo (ETag / 304) ---
+# Se añade antes que CORS para que las respuestas 304 también lleven las cabeceras CORS.
+if settings.CATALOG_CACHE_ENABLED:
+    app.add_middleware(CatalogCacheMiddleware)
+
 # --- Configuración de CORS ---
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -31,6 +72,34 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+# --- Inspector de consultas (solo desarrollo): cuenta consultas por petición y avisa de N+1 ---
+if settings.QUERY_INSPECTOR_ENABLED:
+    query_inspector.instrument_engine(database.engine)
+    if database.async_engine is not None:
+        query_inspector.instrument_engine(database.async_engine.sync_engine)
+    app.add_middleware(
+        query_inspector.QueryInspectorMiddleware,
+        budget=settings.QUERY_BUDGET,
+        n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD,
+    )
+
+# --- Métricas por ruta (/metrics) ---
+# Se añade el último para ser el middleware más externo y medir la petición completa.
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine(database.engine, "sync")
+    if database.async_engine is not None:
+        metrics.instrument_engine(database.async_engine.sync_engine, "async")
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# --- Pool de contraseñas saturado -> 503 ---
+@app.exception_handler(PasswordPoolSaturated)
+async def password_pool_saturated_handler(request: Request, exc: PasswordPoolSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
 # --- Endpoint Raíz que Redirige a /docs ---
 @app.get("/", include_in_schema=False)
 async def root_redirect_to_docs():
@@ -41,31 +110,71 @@ async def root_redirect_to_docs():
 async def health_check():
     return {"status": "ok", "message": f"Welcome to {settings.PROJECT_NAME}!"}
 
+# --- Endpoint de Readiness (estado del pool de conexiones) ---
+# Es 'def' (no 'async def') para que la sonda a la BD se ejecute en el threadpool.
+@app.get("/health/ready", tags=["Utilities"], summary="Verifica la conexión a la BD y el estado del pool")
+def readiness_check():
+    probe = {"ok": True, "latency_ms": None, "error": None}
+    start = time.perf_counter()
+    try:
+        with database.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        probe["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    except Exception as e: # Cualquier error de conexión deja la API como no lista
+        probe.update(ok=False, error=str(e))
+
+    content = {
+        "status": "ready" if probe["ok"] else "unavailable",
+        "db_probe": probe,
+        "pool": get_pool_status(database.engine.pool),
+    }
+    if database.async_engine is not None:
+        content["async_pool"] = get_pool_status(database.async_engine.sync_engine.pool)
+    content["auth_cache"] = principal_cache.stats()
+    content["password_pool"] = password_pool.stats()
+    return JSONResponse(status_code=200 if probe["ok"] else 503, content=content)
+
+
+# --- Endpoint de métricas (formato de texto de Prometheus) ---
+@app.get("/metrics", tags=["Utilities"], summary="Métricas en formato Prometheus", include_in_schema=settings.METRICS_ENABLED)
+async def metrics_endpoint():
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("Metrics disabled\n", status_code=404)
+    pools = [("sync", database.engine.pool)]
+    if database.async_engine is not None:
+        pools.append(("async", database.async_engine.sync_engine.pool))
+    for name, pool in pools:
+        status = get_pool_status(pool)
+        for state in ("checked_out", "idle", "overflow"):
+            if state in status:
+                metrics.db_pool_connections.set((name, state), status[state])
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
 
 # --- Incluir los routers de la API ---
 # Cada router se incluye con su prefijo y tags
 app.include_router(
-    auth_router.router, 
+    select_router(auth_router.router, async_auth_router.router),
     prefix=f"{settings.API_V1_STR}/auth", 
     tags=["Authentication"]
 )
 app.include_router(
-    category_router.router, 
+    select_router(category_router.router, async_category_router.router),
     prefix=f"{settings.API_V1_STR}/categories", 
     tags=["Categories"]
 )
 app.include_router(
-    product_router.router, 
+    select_router(product_router.router, async_product_router.router),
     prefix=f"{settings.API_V1_STR}/products", 
     tags=["Products"]
 )
 app.include_router(
-    proveedor_router.router, 
+    select_router(proveedor_router.router, async_proveedor_router.router),
     prefix=f"{settings.API_V1_STR}/proveedores", 
     tags=["Proveedores"]
 )
 app.include_router(
-    movimiento_inventario_router.router, 
+    select_router(movimiento_inventario_router.router, async_movimiento_inventario_router.router),
     prefix=f"{settings.API_V1_STR}/movimientos", 
     tags=["Movimientos de Inventario"]
 )
@@ -73,4 +182,11 @@ app.include_router(
 # Ejemplo de evento de startup (opcional)
 @app.on_event("startup")
 async def startup_event():
-    print(f"INFO (backend main.py): Aplicación FastAPI {settings.PROJECT_NAME} v{settings.PROJECT_VERSION} iniciada y lista.")
\ No newline at end of file
+    print(f"INFO (backend main.py): Aplicación FastAPI {settings.PROJECT_NAME} v{settings.PROJECT_VERSION} iniciada y lista.")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Cierra las conexiones del pool asíncrono (si el modo asíncrono está activado)
+    password_pool.shutdown()
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
@@ -33,4 +33,11 @@ class Category(CategoryBase):
     # Configuración para Pydantic v2: from_attributes = True
     # Esto permite que Pydantic cree el modelo a partir de un objeto ORM (SQLAlchemy).
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# --- Respuesta con agregados (GET /categories/?include=stats) ---
+# Se construye desde filas del GROUP BY (dicts), no desde objetos ORM.
+class CategoryWithStats(Category):
+    product_count: int = Field(..., description="Número de productos de la categoría")
+    total_units: int = Field(..., description="Suma del stock actual de sus productos")
+    stock_value: float = Field(..., description="Valor del stock: suma de price * stock_actual")
@@ -1,7 +1,11 @@
 # app/schemas/movimiento_inventario_schemas.py
-from typing import Optional
-from pydantic import BaseModel, Field
-from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+from datetime import date, datetime
+
+# Tipos que solo registra la aplicación: los saldos de apertura de la retención de movimientos
+# (ver movimiento_particion_crud). No se aceptan en la API.
+TIPOS_MOVIMIENTO_INTERNOS = {"SALDO_APERTURA", "SALDO_APERTURA_NEGATIVO"}
 
 # Importaremos schemas simples para User y Product para evitar importaciones circulares completas
 # o definiremos aquí las versiones "Out" que necesitamos.
@@ -28,7 +32,16 @@ class MovimientoInventarioBase(BaseModel):
     notas: Optional[str] = Field(None, max_length=500)
 
 class MovimientoInventarioCreate(MovimientoInventarioBase):
-    pass
+    @field_validator("tipo_movimiento")
+    @classmethod
+    def tipo_no_interno(cls, value: str) -> str:
+        if value.upper() in TIPOS_MOVIMIENTO_INTERNOS:
+            raise ValueError(f"El tipo de movimiento '{value}' lo registra la aplicación y no se puede crear directamente.")
+        return value
+
+# Lote de movimientos que se registran en una sola transacción
+class MovimientoInventarioBatchCreate(BaseModel):
+    movimientos: List[MovimientoInventarioCreate] = Field(..., min_length=1, max_length=5000)
 
 # No definimos MovimientoInventarioUpdate por ahora, los movimientos suelen ser inmutables.
 
@@ -39,4 +52,32 @@ class MovimientoInventario(MovimientoInventarioBase):
     producto: ProductSimple # Qué producto se movió
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+# --- Resumen de un lote de movimientos ---
+class StockDelta(BaseModel):
+    producto_id: int
+    delta: int = Field(..., description="Variación neta de stock aplicada por el lote")
+    stock_actual: int = Field(..., description="Stock resultante tras aplicar el lote")
+
+class MovimientoInventarioBatchResult(BaseModel):
+    movimientos_creados: int
+    productos: List[StockDelta]
+
+
+# --- Estadísticas de movimientos (a partir del resumen diario) ---
+class MovimientoStatsPunto(BaseModel):
+    inicio: date = Field(..., description="Primer día del periodo")
+    entradas: int = Field(..., description="Unidades que suman stock")
+    salidas: int = Field(..., description="Unidades que restan stock")
+    otros: int = Field(..., description="Unidades de tipos que no afectan al stock")
+    neto: int = Field(..., description="entradas - salidas")
+    movimientos: int = Field(..., description="Número de movimientos")
+
+class MovimientoStats(BaseModel):
+    desde: date
+    hasta: date
+    bucket: str = Field(..., description="day, week o month")
+    periodos_por_punto: int = Field(1, description="Periodos agrupados en cada punto (por max_points)")
+    puntos: List[MovimientoStatsPunto]
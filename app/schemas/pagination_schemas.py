@@ -0,0 +1,10 @@
+# app/schemas/pagination_schemas.py
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel, Field
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    # Respuesta de los listados en modo cursor (paginación por keyset)
+    items: List[T]
+    next_cursor: Optional[str] = Field(None, description="Cursor opaco para pedir la página siguiente (null si no hay más)")
@@ -1,7 +1,8 @@
 # app/schemas/product_schemas.py
 
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from datetime import datetime
+from pydantic import BaseModel, Field, computed_field
 
 # Importamos el schema de Category para usarlo en la respuesta de Product
 from .category_schemas import Category as CategorySchema
@@ -46,4 +47,43 @@ class Product(ProductBase):
     category: Optional[CategorySchema] = Field(None, description="Categoría asociada al producto")
 
     class Config:
-        from_attributes = True # Permite crear desde objetos ORM
\ No newline at end of file
+        from_attributes = True # Permite crear desde objetos ORM
+
+# --- Importación masiva de productos (CSV / NDJSON) ---
+class ProductImportError(BaseModel):
+    row: int = Field(..., description="Número de fila en el fichero (1 = primera fila de datos)")
+    codigo_sku: Optional[str] = Field(None, description="SKU de la fila, si se pudo leer")
+    error: str = Field(..., description="Motivo por el que la fila no se importó")
+
+class ProductImportResult(BaseModel):
+    total_rows: int = Field(..., description="Filas de datos leídas")
+    created: int = Field(..., description="Productos creados")
+    updated: int = Field(..., description="Productos existentes actualizados (on_duplicate=update)")
+    errors: List[ProductImportError] = Field(default_factory=list, description="Filas rechazadas")
+
+# --- Stock de un producto a una fecha (a partir del historial de movimientos) ---
+class ProductStock(BaseModel):
+    producto_id: int
+    as_of: datetime
+    stock: int = Field(..., description="Stock a la fecha as_of según el historial de movimientos")
+    fecha_snapshot: Optional[datetime] = Field(None, description="Cierre (snapshot) usado como base del cálculo")
+
+# --- Productos con stock bajo (en o por debajo del stock mínimo) ---
+class LowStockProduct(Product):
+    @computed_field
+    @property
+    def deficit(self) -> int:
+        """Unidades que faltan para llegar al stock mínimo."""
+        return self.stock_minimo - self.stock_actual
+
+class LowStockCategoryCount(BaseModel):
+    category_id: Optional[int] = Field(None, description="ID de la categoría (null = sin categoría)")
+    category_name: Optional[str] = None
+    productos: int = Field(..., description="Productos con stock bajo en la categoría")
+    agotados: int = Field(..., description="De ellos, productos sin stock")
+
+class LowStockReport(BaseModel):
+    total: int = Field(..., description="Productos con stock bajo que cumplen los filtros")
+    agotados: int = Field(..., description="De ellos, productos sin stock")
+    por_categoria: List[LowStockCategoryCount]
+    items: List[LowStockProduct]
@@ -0,0 +1,23 @@
+# app/schemas/stock_reconciliation_schemas.py
+from pydantic import BaseModel, Field
+from typing import List
+from datetime import datetime
+
+class StockDrift(BaseModel):
+    producto_id: int
+    stock_actual: int = Field(..., description="Stock registrado en products.stock_actual")
+    stock_esperado: int = Field(..., description="Stock reconstruido a partir de los movimientos")
+    drift: int = Field(..., description="stock_actual - stock_esperado")
+    corregido: bool = False
+
+    class Config:
+        from_attributes = True
+
+class StockReconciliationReport(BaseModel):
+    inicio: datetime
+    fin: datetime
+    completa: bool = Field(..., description="True si se ignoraron los checkpoints y se recalculó todo el historial")
+    productos_revisados: int
+    productos_con_drift: int
+    productos_corregidos: int
+    drifts: List[StockDrift]
@@ -0,0 +1,114 @@
+# app/security/password_pool.py
+# Pool de hilos dedicado y acotado para hashear/verificar contraseñas (bcrypt).
+# bcrypt libera el GIL, así que unos pocos hilos bastan para no bloquear el event loop
+# ni ocupar el threadpool general de Starlette durante una avalancha de logins.
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.security.auth_security import get_password_hash, verify_password
+
+
+class PasswordPoolSaturated(Exception):
+    """
+    Se lanza cuando el pool ya tiene en curso y en cola el máximo de tareas permitido.
+    main.py la traduce a una respuesta 503 (Service Unavailable).
+    """
+
+
+class PasswordPool:
+    """
+    ThreadPoolExecutor con control de admisión: como máximo 'workers' tareas en ejecución
+    y 'max_queue' esperando. Por encima de ese límite se falla inmediatamente
+    (PasswordPoolSaturated) en lugar de acumular latencia.
+    El executor se crea con la primera tarea y shutdown lo descarta: si la aplicación se
+    vuelve a arrancar en el mismo proceso (tests, recarga), la siguiente tarea crea otro.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordPoolSaturated("Password hashing pool is saturated. Try again later.")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+            executor = self._executor
+            self._in_flight += 1
+        try:
+            future = executor.submit(fn, *args)
+        except RuntimeError: # Executor cerrado por un shutdown concurrente
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(self._task_done)
+        return future
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Ejecuta fn en el pool y espera el resultado (para llamadores síncronos).
+        """
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Ejecuta fn en el pool sin bloquear el event loop.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def _task_done(self, _future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": min(in_flight, self.workers),
+                "queued": max(in_flight - self.workers, 0),
+                "utilization": round(min(in_flight, self.workers) / self.workers, 4),
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    verify_password ejecutado en el pool de contraseñas.
+    Lanza PasswordPoolSaturated si el pool está lleno.
+    """
+    return await password_pool.run_async(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    get_password_hash ejecutado en el pool de contraseñas.
+    Lanza PasswordPoolSaturated si el pool está lleno.
+    """
+    return await password_pool.run_async(get_password_hash, password)
@@ -0,0 +1,130 @@
+# app/security/principal_cache.py
+# Caché en memoria del usuario autenticado (principal) por token.
+# Evita repetir jwt.decode y la consulta del usuario en cada petición protegida.
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """
+    Copia ligera (no ligada a ninguna sesión) de los campos del usuario que usan los endpoints.
+    Expone los mismos atributos que models.User para id, username, email e is_active.
+    """
+    id: int
+    username: str
+    email: Optional[str]
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        return cls(id=user.id, username=user.username, email=user.email, is_active=user.is_active)
+
+
+class PrincipalCache:
+    """
+    Caché LRU acotada con TTL, indexada por el SHA-256 del token.
+    Guarda los claims ya verificados y un UserSnapshot. Cada entrada caduca en
+    min(ttl, exp del token), de modo que un token expirado nunca se sirve desde la caché.
+    La invalidación es local al proceso: con varios workers, el TTL acota cuánto
+    puede tardar un cambio en el usuario en verse en los demás.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, dict, UserSnapshot]]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    @staticmethod
+    def token_digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Tuple[dict, UserSnapshot]]:
+        if not self.enabled:
+            return None
+        key = self.token_digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, token: str, claims: dict, user: UserSnapshot) -> None:
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            ttl = min(ttl, exp - time.time())
+        if ttl <= 0:
+            return
+        key = self.token_digest(token)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, claims, user)
+            self._by_user.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        Elimina todas las entradas de un usuario (p. ej. al activarlo/desactivarlo).
+        """
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+            }
+
+    def _remove(self, key: str) -> None:
+        # Debe llamarse con el lock tomado
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._by_user.get(entry[2].id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_user[entry[2].id]
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
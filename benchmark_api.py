@@ -0,0 +1,277 @@
+# scl_backend_fastapi/benchmark_api.py
+# Benchmark de latencia y throughput de la API, en proceso (sin servidor ni red).
+#
+# Lanza peticiones contra la app FastAPI mediante httpx.ASGITransport sobre la base de datos
+# de DATABASE_URL (una base de datos local sembrada con seed_db.py, SQLite o PostgreSQL:
+# los escenarios de escritura registran movimientos). Para cada escenario informa de
+# p50 / p95 / p99 y peticiones por segundo, y con --baseline falla (código 1) si alguno
+# empeora más de la tolerancia respecto a una ejecución guardada con --save-baseline.
+# Con la caché del catálogo activada los listados se sirven desde memoria tras la primera
+# petición: CATALOG_CACHE_ENABLED=false mide el camino completo hasta la base de datos.
+#
+#     python benchmark_api.py --save-baseline benchmark_baseline.json
+#     python benchmark_api.py --baseline benchmark_baseline.json --tolerance 0.25
+
+import sys
+import os
+import argparse
+import asyncio
+import json
+import math
+import platform
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List
+
+# --- Configuración de sys.path ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+import httpx
+
+from app.core.config import settings
+from app.db import models
+from app.db.database import SessionLocal, async_engine
+from app.main import app
+from app.security.auth_security import get_password_hash
+
+BENCH_USERNAME = "bench_user"
+BENCH_EMAIL = "bench.user@example.com"
+BENCH_PASSWORD = "BenchPass123!"
+
+API = settings.API_V1_STR
+
+# Métricas comparadas con la línea base (más alto = peor)
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    """Percentil por rango más cercano (valores ordenados)."""
+    if not valores:
+        return 0.0
+    indice = max(0, math.ceil(p / 100 * len(valores)) - 1)
+    return valores[indice]
+
+
+def _preparar_datos(n_productos: int) -> List[int]:
+    """
+    Crea el usuario del benchmark si no existe y devuelve los ids de los productos usados
+    en las lecturas y en los movimientos.
+    """
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).filter(models.User.username == BENCH_USERNAME).first()
+        if user is None:
+            db.add(models.User(
+                username=BENCH_USERNAME, email=BENCH_EMAIL,
+                hashed_password=get_password_hash(BENCH_PASSWORD), is_active=True,
+            ))
+            db.commit()
+        producto_ids = [
+            producto_id for (producto_id,) in
+            db.query(models.Product.id).order_by(models.Product.id).limit(n_productos).all()
+        ]
+    finally:
+        db.close()
+    if not producto_ids:
+        raise SystemExit("La base de datos no tiene productos: ejecuta antes 'python seed_db.py'.")
+    return producto_ids
+
+
+# --- Escenarios ---
+# Cada escenario recibe el cliente, las cabeceras de autenticación, los ids de productos y el
+# número de petición, y devuelve la respuesta.
+
+Escenario = Callable[[httpx.AsyncClient, Dict[str, str], List[int], int], Awaitable[httpx.Response]]
+
+
+async def _listar_productos(client, auth, producto_ids, i):
+    return await client.get(f"{API}/products/", params={"skip": (i % 10) * 20, "limit": 20}, headers=auth)
+
+
+async def _listar_productos_1000(client, auth, producto_ids, i):
+    # Página grande: el coste lo domina la serialización (ver FAST_LIST_SERIALIZATION)
+    return await client.get(f"{API}/products/", params={"skip": (i % 5) * 1000, "limit": 1000}, headers=auth)
+
+
+async def _leer_producto(client, auth, producto_ids, i):
+    return await client.get(f"{API}/products/{producto_ids[i % len(producto_ids)]}", headers=auth)
+
+
+async def _login(client, auth, producto_ids, i):
+    return await client.post(f"{API}/auth/token", data={"username": BENCH_USERNAME, "password": BENCH_PASSWORD})
+
+
+async def _registrar_movimiento(client, auth, producto_ids, i):
+    # Entradas de una unidad: no dependen del stock disponible
+    return await client.post(f"{API}/movimientos/", headers=auth, json={
+        "producto_id": producto_ids[i % len(producto_ids)], "tipo_movimiento": "ENTRADA",
+        "cantidad": 1, "notas": "benchmark",
+    })
+
+
+async def _registrar_lote(client, auth, producto_ids, i):
+    return await client.post(f"{API}/movimientos/batch", headers=auth, json={"movimientos": [
+        {"producto_id": producto_ids[(i + k) % len(producto_ids)], "tipo_movimiento": "ENTRADA",
+         "cantidad": 1, "notas": "benchmark"}
+        for k in range(50)
+    ]})
+
+
+ESCENARIOS: Dict[str, Escenario] = {
+    "products_list": _listar_productos,
+    "products_list_1000": _listar_productos_1000,
+    "product_get": _leer_producto,
+    "login": _login,
+    "movimiento_post": _registrar_movimiento,
+    "movimientos_batch": _registrar_lote,
+}
+
+
+async def _ejecutar_escenario(
+    client: httpx.AsyncClient, escenario: Escenario, auth: Dict[str, str], producto_ids: List[int],
+    n_peticiones: int, concurrencia: int, calentamiento: int,
+) -> Dict[str, float]:
+    for i in range(calentamiento):
+        await escenario(client, auth, producto_ids, i)
+
+    latencias: List[float] = []
+    errores = 0
+    siguiente = 0
+
+    async def trabajador():
+        nonlocal siguiente, errores
+        while siguiente < n_peticiones:
+            i = siguiente
+            siguiente += 1
+            inicio = time.perf_counter()
+            response = await escenario(client, auth, producto_ids, i)
+            latencias.append(time.perf_counter() - inicio)
+            if response.status_code >= 400:
+                errores += 1
+
+    inicio_total = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    duracion = time.perf_counter() - inicio_total
+
+    latencias.sort()
+    return {
+        "requests": len(latencias),
+        "errors": errores,
+        "rps": round(len(latencias) / duracion, 2) if duracion > 0 else 0.0,
+        "p50_ms": round(_percentil(latencias, 50) * 1000, 3),
+        "p95_ms": round(_percentil(latencias, 95) * 1000, 3),
+        "p99_ms": round(_percentil(latencias, 99) * 1000, 3),
+    }
+
+
+async def ejecutar_benchmark(
+    escenarios: List[str], n_peticiones: int, concurrencia: int, calentamiento: int, n_productos: int
+) -> Dict[str, Dict[str, float]]:
+    producto_ids = await asyncio.to_thread(_preparar_datos, n_productos)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            response = await client.post(f"{API}/auth/token", data={"username": BENCH_USERNAME, "password": BENCH_PASSWORD})
+            response.raise_for_status()
+            auth = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            resultados = {}
+            for nombre in escenarios:
+                resultados[nombre] = await _ejecutar_escenario(
+                    client, ESCENARIOS[nombre], auth, producto_ids, n_peticiones, concurrencia, calentamiento
+                )
+                r = resultados[nombre]
+                print(f"  {nombre:<20} {r['requests']:>6} req  {r['rps']:>9.1f} req/s  "
+                      f"p50 {r['p50_ms']:>8.2f} ms  p95 {r['p95_ms']:>8.2f} ms  p99 {r['p99_ms']:>8.2f} ms  "
+                      f"errores {r['errors']}")
+            return resultados
+    finally:
+        if async_engine is not None:
+            await async_engine.dispose()
+
+
+def comparar_con_baseline(
+    resultados: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerancia: float
+) -> List[str]:
+    """
+    Regresiones respecto a la línea base: latencias más de 'tolerancia' (fracción) por encima
+    o req/s más de 'tolerancia' por debajo. Los escenarios sin línea base no se comparan.
+    """
+    regresiones = []
+    for nombre, actual in resultados.items():
+        base = baseline.get(nombre)
+        if base is None:
+            continue
+        for clave in LATENCY_KEYS:
+            if base.get(clave) and actual[clave] > base[clave] * (1 + tolerancia):
+                regresiones.append(f"{nombre}: {clave} {actual[clave]:.2f} > {base[clave]:.2f} (+{actual[clave] / base[clave] - 1:.0%})")
+        if base.get("rps") and actual["rps"] < base["rps"] * (1 - tolerancia):
+            regresiones.append(f"{nombre}: rps {actual['rps']:.1f} < {base['rps']:.1f} ({actual['rps'] / base['rps'] - 1:.0%})")
+    return regresiones
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark en proceso de los endpoints principales (latencia p50/p95/p99 y req/s)."
+    )
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(ESCENARIOS), default=list(ESCENARIOS),
+                        help="Escenarios a ejecutar (por defecto, todos).")
+    parser.add_argument("--requests", type=int, default=200, help="Peticiones medidas por escenario.")
+    parser.add_argument("--concurrency", type=int, default=10, help="Peticiones simultáneas.")
+    parser.add_argument("--warmup", type=int, default=10, help="Peticiones de calentamiento (no medidas) por escenario.")
+    parser.add_argument("--products", type=int, default=100, help="Productos distintos usados en lecturas y movimientos.")
+    parser.add_argument("--output", help="Guarda los resultados en un fichero JSON.")
+    parser.add_argument("--baseline", help="Fichero JSON de línea base con el que comparar.")
+    parser.add_argument("--save-baseline", help="Guarda los resultados como nueva línea base.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Empeoramiento admitido respecto a la línea base (fracción, por defecto 0.25 = 25%%).")
+    args = parser.parse_args()
+
+    if args.requests < 1 or args.concurrency < 1:
+        parser.error("--requests y --concurrency deben ser mayores que cero.")
+
+    modo = "asíncrono" if settings.DB_ASYNC_MODE else "síncrono"
+    print(f"Benchmark en proceso ({modo}, {args.requests} peticiones por escenario, concurrencia {args.concurrency})...")
+    resultados = asyncio.run(ejecutar_benchmark(
+        args.scenarios, args.requests, args.concurrency, args.warmup, args.products
+    ))
+
+    informe = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "db_dialect": settings.DATABASE_URL.split(":", 1)[0],
+        "db_async_mode": settings.DB_ASYNC_MODE,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "scenarios": resultados,
+    }
+    for destino in (args.output, args.save_baseline):
+        if destino:
+            with open(destino, "w", encoding="utf-8") as f:
+                json.dump(informe, f, indent=2, ensure_ascii=False)
+            print(f"Resultados guardados en {destino}")
+
+    errores = sum(r["errors"] for r in resultados.values())
+    if errores:
+        print(f"❌ {errores} peticiones devolvieron un error (4xx/5xx).")
+        return 1
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if (baseline.get("requests"), baseline.get("concurrency")) != (args.requests, args.concurrency):
+            print("Aviso: la línea base se generó con otro número de peticiones o de concurrencia.")
+        regresiones = comparar_con_baseline(resultados, baseline.get("scenarios", {}), args.tolerance)
+        if regresiones:
+            print(f"❌ Regresiones respecto a {args.baseline} (tolerancia {args.tolerance:.0%}):")
+            for regresion in regresiones:
+                print(f"  - {regresion}")
+            return 1
+        print(f"✅ Sin regresiones respecto a {args.baseline} (tolerancia {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
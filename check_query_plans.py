@@ -0,0 +1,227 @@
+# scl_backend_fastapi/check_query_plans.py
+# Comprobación de los planes de ejecución de las consultas más frecuentes (regresión de índices).
+#
+# Ejecuta las lecturas reales de product_crud y movimiento_inventario_crud sobre la base de
+# datos de DATABASE_URL, captura el SQL que envían y lo pasa por EXPLAIN (PostgreSQL:
+# EXPLAIN (FORMAT JSON); SQLite: EXPLAIN QUERY PLAN). Cada consulta debe usar el índice
+# esperado, sin recorrer la tabla entera y, si ordena, sin ordenar en memoria; si alguna
+# no lo hace, el script termina con código 1. Si movimientos_inventario está particionada,
+# las particiones y sus índices cuentan como la tabla y el índice padre (y el recorrido
+# secuencial de una partición vacía no es un problema). Con pocas filas el planificador
+# prefiere con razón un recorrido secuencial, así que conviene sembrar antes un volumen realista:
+#
+#     python seed_db.py --products 20000 --movements-per-product 50
+#     python check_query_plans.py
+#
+# Las mismas comprobaciones se ejecutan con pytest (tests/test_query_plans.py) si
+# QUERY_PLANS_DATABASE_URL apunta a una base de datos sembrada.
+
+import sys
+import os
+import argparse
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# --- Configuración de sys.path ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.crud import movimiento_inventario_crud, product_crud
+from app.db import models
+from app.db.database import SessionLocal
+
+# Por debajo de estas filas se avisa de que el resultado no es representativo
+MIN_PRODUCTS = 5_000
+MIN_MOVEMENTS = 50_000
+
+
+class Muestra(NamedTuple):
+    category_id: int
+    proveedor_id: Optional[int]
+    producto_id: int
+
+
+class Comprobacion(NamedTuple):
+    nombre: str
+    tabla: str                         # Tabla que no debe recorrerse entera
+    indice: str                        # Índice que debe aparecer en el plan
+    ordenada: bool                     # La consulta ordena: el índice debe dar ya el orden
+    consulta: Callable[[Session, Muestra], object]
+
+
+def _historial_segunda_pagina(db: Session, muestra: Muestra):
+    _, cursor = movimiento_inventario_crud.get_movimientos_por_producto_keyset(db, muestra.producto_id, limit=50)
+    return movimiento_inventario_crud.get_movimientos_por_producto_keyset(db, muestra.producto_id, limit=50, cursor=cursor)
+
+
+COMPROBACIONES: List[Comprobacion] = [
+    Comprobacion(
+        "productos por categoría", "products", "ix_products_category_id", False,
+        lambda db, m: product_crud.get_products_rows(db, category_id=m.category_id),
+    ),
+    Comprobacion(
+        "productos por proveedor (FK)", "products", "ix_products_proveedor_id", False,
+        lambda db, m: db.execute(select(models.Product.id).where(models.Product.proveedor_id == m.proveedor_id)).all(),
+    ),
+    Comprobacion(
+        "historial por producto", "movimientos_inventario", "ix_movimientos_inventario_producto_id_fecha_id", True,
+        lambda db, m: movimiento_inventario_crud.get_movimientos_por_producto(db, m.producto_id, limit=50),
+    ),
+    Comprobacion(
+        "historial por cursor", "movimientos_inventario", "ix_movimientos_inventario_producto_id_fecha_id", True,
+        _historial_segunda_pagina,
+    ),
+    Comprobacion(
+        "movimientos de un producto (FK)", "movimientos_inventario", "ix_movimientos_inventario_producto_id_fecha_id", False,
+        lambda db, m: db.execute(
+            select(models.MovimientoInventario.id).where(models.MovimientoInventario.producto_id == m.producto_id)
+        ).all(),
+    ),
+]
+
+
+def _elegir_muestra(db: Session) -> Muestra:
+    """
+    Para los filtros de productos, el valor menos frecuente: con un valor muy frecuente y LIMIT,
+    recorrer la tabla hasta llenar la página es legítimamente más barato, pero con un filtro
+    selectivo el índice debe usarse. Para el historial, el producto con más movimientos (el
+    caso más caro de ordenar sin índice).
+    """
+    def muestra(columna, mas_frecuente: bool):
+        orden = func.count().desc() if mas_frecuente else func.count()
+        return db.execute(
+            select(columna).where(columna.is_not(None)).group_by(columna).order_by(orden, columna).limit(1)
+        ).scalar()
+
+    producto_id = muestra(models.MovimientoInventario.producto_id, mas_frecuente=True)
+    category_id = muestra(models.Product.category_id, mas_frecuente=False)
+    if producto_id is None or category_id is None:
+        raise SystemExit("La base de datos no tiene productos con categoría y movimientos: ejecuta antes 'python seed_db.py --products N'.")
+    return Muestra(category_id, muestra(models.Product.proveedor_id, mas_frecuente=False), producto_id)
+
+
+def _capturar_sql(db: Session, consulta: Callable[[], object]) -> Tuple[str, object]:
+    """Última sentencia que ejecuta la consulta, con sus parámetros (formato del driver)."""
+    capturadas = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        capturadas.append((statement, parameters))
+
+    bind = db.get_bind()
+    event.listen(bind, "before_cursor_execute", before_cursor_execute)
+    try:
+        consulta()
+    finally:
+        event.remove(bind, "before_cursor_execute", before_cursor_execute)
+    return capturadas[-1]
+
+
+def _particiones_postgresql(db: Session) -> Dict[str, Tuple[str, bool]]:
+    """Partición (tabla o índice) -> (tabla o índice padre, si la partición está vacía)."""
+    filas = db.connection().exec_driver_sql(
+        "SELECT c.relname, p.relname, c.relpages = 0 FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent"
+    ).all()
+    return {hija: (padre, vacia) for hija, padre, vacia in filas}
+
+
+def _plan_postgresql(db: Session, statement: str, parameters) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    # (tipo de nodo, tabla, índice) de cada nodo del plan, con los nombres de las particiones
+    # sustituidos por los de su tabla / índice padre
+    particiones = _particiones_postgresql(db)
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    nodos, pendientes = [], [plan[0]["Plan"]]
+    while pendientes:
+        nodo = pendientes.pop()
+        pendientes.extend(nodo.get("Plans", []))
+        tipo, tabla, indice = nodo["Node Type"], nodo.get("Relation Name"), nodo.get("Index Name")
+        if tabla in particiones:
+            tabla, vacia = particiones[tabla]
+            if vacia and tipo == "Seq Scan":
+                continue
+        if indice in particiones:
+            indice = particiones[indice][0]
+        nodos.append((tipo, tabla, indice))
+    return nodos
+
+
+def _plan_sqlite(db: Session, statement: str, parameters) -> List[str]:
+    filas = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [fila[-1] for fila in filas]
+
+
+def evaluar(db: Session, comprobacion: Comprobacion, muestra: Muestra) -> Tuple[List[str], str]:
+    """
+    Problemas del plan de la consulta (lista vacía si es correcto) y el plan resumido.
+    """
+    statement, parameters = _capturar_sql(db, lambda: comprobacion.consulta(db, muestra))
+    problemas = []
+    if db.bind.dialect.name == "postgresql":
+        nodos = _plan_postgresql(db, statement, parameters)
+        resumen = " > ".join(f"{tipo} ({indice or tabla})" if (indice or tabla) else tipo for tipo, tabla, indice in nodos)
+        if any(tipo == "Seq Scan" and tabla == comprobacion.tabla for tipo, tabla, _ in nodos):
+            problemas.append(f"recorrido secuencial de {comprobacion.tabla}")
+        if not any(indice == comprobacion.indice for _, _, indice in nodos):
+            problemas.append(f"no usa {comprobacion.indice}")
+        if comprobacion.ordenada and any(tipo in ("Sort", "Incremental Sort") for tipo, _, _ in nodos):
+            problemas.append("ordena en memoria")
+    else:
+        detalles = _plan_sqlite(db, statement, parameters)
+        resumen = " | ".join(detalles)
+        if any(detalle == f"SCAN {comprobacion.tabla}" or detalle.startswith(f"SCAN {comprobacion.tabla} ") for detalle in detalles):
+            problemas.append(f"recorrido completo de {comprobacion.tabla}")
+        if not any(f"INDEX {comprobacion.indice} " in f"{detalle} " for detalle in detalles):
+            problemas.append(f"no usa {comprobacion.indice}")
+        if comprobacion.ordenada and any("TEMP B-TREE FOR ORDER BY" in detalle for detalle in detalles):
+            problemas.append("ordena en memoria")
+    return problemas, resumen
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Comprueba que las consultas frecuentes de productos y movimientos usan sus índices."
+    )
+    parser.add_argument("--no-analyze", action="store_true",
+                        help="No actualiza las estadísticas del planificador (ANALYZE) antes de comprobar.")
+    parser.add_argument("--verbose", action="store_true", help="Muestra el plan de cada consulta.")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if not args.no_analyze: # Estadísticas al día: el plan depende del volumen y la distribución
+            db.connection().exec_driver_sql("ANALYZE")
+            db.commit()
+        n_productos = db.execute(select(func.count()).select_from(models.Product)).scalar()
+        n_movimientos = db.execute(select(func.count()).select_from(models.MovimientoInventario)).scalar()
+        print(f"Planes de ejecución ({db.bind.dialect.name}, {n_productos} productos, {n_movimientos} movimientos)...")
+        if n_productos < MIN_PRODUCTS or n_movimientos < MIN_MOVEMENTS:
+            print(f"Aviso: con menos de {MIN_PRODUCTS} productos o {MIN_MOVEMENTS} movimientos el planificador "
+                  "puede preferir recorridos secuenciales; siembra más datos con seed_db.py --products N.")
+        muestra = _elegir_muestra(db)
+
+        fallos = 0
+        for comprobacion in COMPROBACIONES:
+            if comprobacion.indice == "ix_products_proveedor_id" and muestra.proveedor_id is None:
+                print(f"  - {comprobacion.nombre:<34} sin productos con proveedor, se omite")
+                continue
+            problemas, resumen = evaluar(db, comprobacion, muestra)
+            db.rollback()
+            fallos += bool(problemas)
+            print(f"  {'❌' if problemas else '✅'} {comprobacion.nombre:<34} {'; '.join(problemas) or comprobacion.indice}")
+            if args.verbose or problemas:
+                print(f"      {resumen}")
+    finally:
+        db.close()
+
+    if fallos:
+        print(f"❌ {fallos} consultas no usan el índice esperado (¿falta aplicar 'alembic upgrade head'?).")
+        return 1
+    print("✅ Todas las consultas usan sus índices.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+# scl_backend_fastapi/mantener_movimientos.py
+# Mantenimiento de movimientos_inventario: particiones mensuales y retención.
+#
+# En PostgreSQL crea por adelantado las particiones de los próximos meses (y reparte en su
+# partición las filas que hayan caído en la DEFAULT). Con --retener-meses N archiva en
+# ficheros CSV comprimidos (uno por mes) los movimientos anteriores al inicio del mes de
+# hace N meses y los sustituye por un saldo de apertura por producto; en PostgreSQL las
+# particiones archivadas se separan y se borran. Programarlo (ej: cron) una vez al día o al mes:
+#
+#     python mantener_movimientos.py
+#     python mantener_movimientos.py --retener-meses 12 --archivo-dir /backups/movimientos
+
+import sys
+import os
+import argparse
+from datetime import datetime, timezone
+
+# --- Configuración de sys.path ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from app.crud import movimiento_particion_crud
+from app.db.database import SessionLocal
+
+
+def _no_negativo(valor: str) -> int:
+    numero = int(valor)
+    if numero < 0:
+        raise argparse.ArgumentTypeError("debe ser 0 o mayor")
+    return numero
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Crea las particiones mensuales de movimientos_inventario y archiva los movimientos antiguos."
+    )
+    parser.add_argument("--meses-adelante", type=_no_negativo, default=3,
+                        help="Meses futuros con partición creada (PostgreSQL).")
+    parser.add_argument("--retener-meses", type=_no_negativo, default=None,
+                        help="Archiva los movimientos anteriores al inicio del mes de hace N meses (sin indicar, no archiva).")
+    parser.add_argument("--archivo-dir", default="archivo_movimientos",
+                        help="Directorio de los ficheros archivados (.csv.gz).")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Filas leídas por lote al archivar.")
+    args = parser.parse_args()
+
+    mes_actual = movimiento_particion_crud.inicio_mes(datetime.now(timezone.utc).date())
+    db = SessionLocal()
+    try:
+        if movimiento_particion_crud.es_particionada(db):
+            creadas = movimiento_particion_crud.asegurar_particiones(
+                db, mes_actual, movimiento_particion_crud.sumar_meses(mes_actual, args.meses_adelante)
+            )
+            print(f"Particiones creadas: {', '.join(creadas) if creadas else 'ninguna (ya existían)'}.")
+        else:
+            print("movimientos_inventario no está particionada (solo PostgreSQL, tras 'alembic upgrade head').")
+
+        if args.retener_meses is not None:
+            corte = movimiento_particion_crud.sumar_meses(mes_actual, -args.retener_meses)
+            resultado = movimiento_particion_crud.archivar_movimientos(
+                db, corte, args.archivo_dir, batch_size=args.batch_size
+            )
+            print(f"Archivados {resultado.movimientos} movimientos anteriores a {corte.isoformat()} "
+                  f"en {len(resultado.archivos)} ficheros; {resultado.saldos} saldos de apertura.")
+            for archivo in resultado.archivos:
+                print(f"  {archivo}")
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        db.close()
+    print("✅ Mantenimiento completado.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
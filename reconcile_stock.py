@@ -0,0 +1,60 @@
+# scl_backend_fastapi/reconcile_stock.py
+
+import sys
+import os
+import argparse
+
+# --- Configuración de sys.path ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from app.crud.stock_reconciliation_crud import reconciliar_stock
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Reconcilia products.stock_actual con el historial de movimientos de inventario."
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Procesos en paralelo (1 = sin pool de procesos).")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="Productos por rango (una consulta agregada por rango).")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignora los checkpoints y recalcula todo el historial.")
+    parser.add_argument("--fix", action="store_true",
+                        help="Corrige stock_actual de los productos con drift (reinicia después la API: "
+                             "su caché del catálogo no ve los cambios hechos desde este script).")
+    parser.add_argument("--report", default=None,
+                        help="Ruta del informe JSON (por defecto se imprime por salida estándar).")
+    args = parser.parse_args()
+
+    informe = reconciliar_stock(
+        chunk_size=args.chunk_size, workers=args.workers, completa=args.full, corregir=args.fix
+    )
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(informe.model_dump_json(indent=2))
+    else:
+        print(informe.model_dump_json(indent=2))
+
+    duracion = (informe.fin - informe.inicio).total_seconds()
+    print(
+        f"Productos revisados: {informe.productos_revisados}, con drift: {informe.productos_con_drift}, "
+        f"corregidos: {informe.productos_corregidos} ({duracion:.1f}s)",
+        file=sys.stderr,
+    )
+    if informe.productos_corregidos:
+        # La caché del catálogo (app/core/response_cache.py) es local a cada proceso de la API
+        print(
+            "Aviso: reinicia la API para que su caché del catálogo deje de servir el stock anterior "
+            "(o ejecútala con CATALOG_CACHE_ENABLED=false).",
+            file=sys.stderr,
+        )
+    # Código de salida 1 si queda drift sin corregir (útil para alertas en la ejecución nocturna)
+    return 1 if informe.productos_con_drift > informe.productos_corregidos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
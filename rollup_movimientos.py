@@ -0,0 +1,40 @@
+# scl_backend_fastapi/rollup_movimientos.py
+
+import sys
+import os
+import argparse
+from datetime import datetime, timedelta, timezone
+
+# --- Configuración de sys.path ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from app.crud.movimiento_rollup_crud import reconstruir_rollup_por_meses
+
+
+def _fecha(valor: str):
+    return datetime.strptime(valor, "%Y-%m-%d").date()
+
+
+def main() -> int:
+    ayer = datetime.now(timezone.utc).date() - timedelta(days=1)
+    parser = argparse.ArgumentParser(
+        description="Reconstruye el resumen diario de movimientos (movimientos_diarios) a partir de movimientos_inventario."
+    )
+    parser.add_argument("--desde", type=_fecha, required=True, help="Primer día YYYY-MM-DD.")
+    parser.add_argument("--hasta", type=_fecha, default=ayer,
+                        help="Último día YYYY-MM-DD (por defecto, ayer: los días cerrados no reciben movimientos nuevos).")
+    args = parser.parse_args()
+
+    try:
+        filas = reconstruir_rollup_por_meses(args.desde, args.hasta)
+    except ValueError as e: # Días anteriores al corte de la retención
+        print(f"❌ {e}")
+        return 1
+    print(f"Resumen diario reconstruido del {args.desde} al {args.hasta}: {filas} filas.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
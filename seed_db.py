@@ -2,6 +2,13 @@
 
 import sys
 import os
+import argparse
+import csv
+import io
+import math
+import time
+from collections import defaultdict
+from operator import itemgetter
 from datetime import datetime, timedelta, timezone
 import random
 from faker import Faker # Para generar datos falsos más realistas
@@ -11,11 +18,14 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 if SCRIPT_DIR not in sys.path:
     sys.path.insert(0, SCRIPT_DIR)
 
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError # Para manejar errores de constraints
 from app.db.database import SessionLocal, engine, Base
 from app.db import models
 from app.security.auth_security import get_password_hash
+from app.crud.movimiento_inventario_crud import TIPOS_ENTRADA
+from app.crud import movimiento_particion_crud
 
 # --- Crear todas las tablas ---
 print("Intentando crear tablas si no existen (Alembic ya debería haberlas creado)...")
@@ -268,7 +278,316 @@ def seed_data():
         db.close()
         print("Sesión de base de datos cerrada.")
 
+# --- Generador masivo de datos sintéticos (pruebas de rendimiento) ---
+# python seed_db.py --products 1_000_000 --movements-per-product 200 --seed 42
+#
+# Los datos son deterministas (misma semilla y misma --end-date = mismos datos) y no usan
+# Faker ni el ORM: las filas se generan con un random.Random propio y se insertan por lotes
+# (COPY en PostgreSQL, executemany en el resto) con ids explícitos. Las categorías y los
+# proveedores siguen una distribución Zipf (pocos concentran la mayoría de productos) y el
+# número de movimientos por producto una lognormal con media --movements-per-product.
+# stock_actual es el resultado de aplicar los movimientos generados (nunca negativo) y el
+# resumen diario (movimientos_diarios) se escribe a la vez que los movimientos.
+
+SEED_PASSWORD = "SeedPass123!"
+
+_ADJETIVOS = ["Pro", "Max", "Lite", "Ultra", "Mini", "Plus", "Air", "Neo", "Prime", "Eco", "Smart", "Flex"]
+_SUSTANTIVOS = [
+    "Phone", "Book", "Tab", "Cable", "Charger", "Monitor", "Mouse", "Keyboard", "SSD", "Router",
+    "Headset", "Speaker", "Camera", "Dock", "Hub", "PowerBank", "Watch", "Printer", "Webcam", "Drive",
+]
+_CATEGORIAS_BASE = [
+    "Smartphones", "Laptops", "Tablets", "Accesorios", "Componentes PC", "Audio y Video",
+    "Redes", "Impresión", "Almacenamiento", "Gaming", "Wearables", "Fotografía",
+]
+
+# Tipo de movimiento -> peso (sin contar el AJUSTE_INICIAL de cada producto)
+_TIPOS_MOVIMIENTO = {
+    "SALIDA_VENTA": 0.60,
+    "ENTRADA_PROVEEDOR": 0.20,
+    "DEVOLUCION_CLIENTE": 0.10,
+    "AJUSTE_CONTEO_MAS": 0.05,
+    "AJUSTE_CONTEO_MENOS": 0.05,
+}
+
+# Desviación de la lognormal del nº de movimientos por producto
+_SIGMA_MOVIMIENTOS = 0.75
+
+
+def _pesos_zipf(n: int, s: float = 1.1) -> list:
+    """Pesos acumulados de una distribución Zipf de n elementos (para random.choices)."""
+    acumulado, total = [], 0.0
+    for rango in range(1, n + 1):
+        total += 1 / rango ** s
+        acumulado.append(total)
+    return acumulado
+
+
+def _limpiar_tablas(conn) -> None:
+    tablas = list(reversed(Base.metadata.sorted_tables))
+    if conn.dialect.name == "postgresql":
+        nombres = ", ".join(tabla.name for tabla in tablas)
+        conn.execute(text(f"TRUNCATE {nombres} RESTART IDENTITY CASCADE"))
+    else:
+        for tabla in tablas:
+            conn.execute(tabla.delete())
+
+
+def _insertar_filas(conn, tabla, filas: list, batch_size: int) -> None:
+    """
+    Inserta las filas (dicts con las mismas claves) por lotes: COPY en PostgreSQL,
+    executemany del driver en SQLite (sin el coste por fila de construir los parámetros
+    en SQLAlchemy) y executemany de SQLAlchemy en el resto. Debe llamarse dentro de
+    conn.begin(): las sentencias del driver no inician la transacción de SQLAlchemy.
+    """
+    if not filas:
+        return
+    columnas = list(filas[0])
+    dialecto = conn.dialect
+    if dialecto.name == "sqlite":
+        valores_fila = itemgetter(*columnas)
+        # Conversión de tipos de SQLAlchemy (ej: DateTime -> texto), solo en las columnas que la necesitan
+        procesadores = [
+            (i, procesador) for i, procesador in enumerate(
+                tabla.c[c].type.dialect_impl(dialecto).bind_processor(dialecto) for c in columnas
+            ) if procesador is not None
+        ]
+        sql = f"INSERT INTO {tabla.name} ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})"
+    for inicio in range(0, len(filas), batch_size):
+        lote = filas[inicio:inicio + batch_size]
+        if dialecto.name == "postgresql":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for fila in lote:
+                writer.writerow([fila[c] for c in columnas]) # None -> campo vacío -> NULL
+            buffer.seek(0)
+            cursor = conn.connection.cursor()
+            try:
+                cursor.copy_expert(f"COPY {tabla.name} ({', '.join(columnas)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            finally:
+                cursor.close()
+        elif dialecto.name == "sqlite":
+            parametros = []
+            for fila in lote:
+                valores = list(valores_fila(fila)) if len(columnas) > 1 else [valores_fila(fila)]
+                for i, procesador in procesadores:
+                    if valores[i] is not None:
+                        valores[i] = procesador(valores[i])
+                parametros.append(valores)
+            cursor = conn.connection.cursor()
+            try:
+                cursor.executemany(sql, parametros)
+            finally:
+                cursor.close()
+        else:
+            conn.execute(tabla.insert(), lote)
+
+
+def _ajustar_secuencias(conn, tablas) -> None:
+    """En PostgreSQL, las secuencias de los ids deben continuar tras los ids explícitos."""
+    if conn.dialect.name != "postgresql":
+        return
+    for tabla in tablas:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{tabla.name}', 'id'), COALESCE(MAX(id), 1)) FROM {tabla.name}"
+        ))
+
+
+def _movimientos_producto(rng: random.Random, producto_id: int, stock_minimo: int, n: int,
+                          inicio: datetime, segundos: int, responsables: list, siguiente_id: int):
+    """
+    Genera los n movimientos de un producto en orden cronológico, empezando por el AJUSTE_INICIAL.
+    Devuelve (filas, stock final). Las salidas nunca dejan el stock en negativo.
+    """
+    offsets = sorted(rng.randrange(segundos) for _ in range(n))
+    tipos = rng.choices(list(_TIPOS_MOVIMIENTO), weights=list(_TIPOS_MOVIMIENTO.values()), k=n)
+    asignados = rng.choices(responsables, k=n)
+    stock = 0
+    filas = []
+    for k, (offset, tipo, responsable_id) in enumerate(zip(offsets, tipos, asignados)):
+        if k == 0:
+            tipo, cantidad = "AJUSTE_INICIAL", rng.randint(stock_minimo + 10, stock_minimo * 5 + 50)
+        else:
+            if tipo == "SALIDA_VENTA":
+                cantidad = rng.randint(1, max(1, stock // 5))
+            elif tipo == "ENTRADA_PROVEEDOR":
+                cantidad = rng.randint(max(5, stock_minimo), stock_minimo * 3 + 20)
+            elif tipo == "AJUSTE_CONTEO_MENOS":
+                cantidad = rng.randint(1, 3)
+            else:
+                cantidad = rng.randint(1, 5)
+            if tipo not in TIPOS_ENTRADA and cantidad > stock:
+                if stock == 0:
+                    continue # Sin stock no hay salidas
+                cantidad = stock
+        stock += cantidad if tipo in TIPOS_ENTRADA else -cantidad
+        filas.append({
+            "id": siguiente_id + len(filas),
+            "producto_id": producto_id,
+            "tipo_movimiento": tipo,
+            "cantidad": cantidad,
+            "fecha": inicio + timedelta(seconds=offset),
+            "responsable_id": responsable_id,
+            "notas": None,
+        })
+    return filas, stock
+
+
+def generar_datos_masivos(
+    n_productos: int,
+    movimientos_por_producto: int,
+    semilla: int,
+    n_categorias: int = 50,
+    n_proveedores: int = 200,
+    n_usuarios: int = 20,
+    dias: int = 365,
+    fecha_fin=None,
+    batch_size: int = 50_000,
+) -> None:
+    """
+    Borra los datos existentes y genera un catálogo sintético con su historial de movimientos.
+    """
+    rng = random.Random(semilla)
+    fecha_fin = fecha_fin or datetime.now(timezone.utc).date()
+    fin = datetime(fecha_fin.year, fecha_fin.month, fecha_fin.day, tzinfo=timezone.utc) + timedelta(days=1)
+    inicio = fin - timedelta(days=dias)
+    segundos = dias * 86400
+    media_lognormal = math.exp(_SIGMA_MOVIMIENTOS ** 2 / 2)
+    productos_por_lote = max(100, batch_size // max(1, movimientos_por_producto))
+
+    with engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA synchronous = OFF") # Datos desechables: prima la velocidad
+            conn.commit()
+
+        print("Limpiando datos existentes...")
+        with conn.begin():
+            _limpiar_tablas(conn)
+        # En PostgreSQL con movimientos_inventario particionada: una partición por mes del historial
+        db = SessionLocal()
+        try:
+            movimiento_particion_crud.asegurar_particiones(db, inicio.date(), fin.date())
+        finally:
+            db.close()
+
+        # --- Usuarios, categorías y proveedores ---
+        hashed_password = get_password_hash(SEED_PASSWORD) # bcrypt es lento: un solo hash para todos
+        usuarios = [
+            {"id": i, "username": f"usuario_{i:03d}", "email": f"usuario_{i:03d}@example.com",
+             "hashed_password": hashed_password, "is_active": i % 10 != 0}
+            for i in range(1, n_usuarios + 1)
+        ]
+        responsables = [u["id"] for u in usuarios if u["is_active"]] or [1]
+        categorias = [
+            {"id": i, "name": f"{_CATEGORIAS_BASE[(i - 1) % len(_CATEGORIAS_BASE)]} {i}",
+             "description": f"Categoría sintética {i}"}
+            for i in range(1, n_categorias + 1)
+        ]
+        proveedores = [
+            {"id": i, "nombre": f"Proveedor {i:04d} S.L.", "contacto_nombre": f"Contacto {i}",
+             "contacto_email": f"proveedor{i}@example.com", "contacto_telefono": f"+34 600 {i:06d}",
+             "direccion": f"Calle Sintética {i}, Madrid"}
+            for i in range(1, n_proveedores + 1)
+        ]
+        with conn.begin():
+            _insertar_filas(conn, models.User.__table__, usuarios, batch_size)
+            _insertar_filas(conn, models.Category.__table__, categorias, batch_size)
+            _insertar_filas(conn, models.Proveedor.__table__, proveedores, batch_size)
+        print(f"  {n_usuarios} usuarios (contraseña '{SEED_PASSWORD}'), {n_categorias} categorías, {n_proveedores} proveedores.")
+
+        # --- Productos y movimientos, por lotes de productos ---
+        pesos_categorias = _pesos_zipf(n_categorias)
+        pesos_proveedores = _pesos_zipf(n_proveedores)
+        ids_categorias = [c["id"] for c in categorias]
+        ids_proveedores = [p["id"] for p in proveedores]
+        siguiente_movimiento_id = 1
+        total_movimientos = 0
+        t0 = time.perf_counter()
+
+        for desde in range(1, n_productos + 1, productos_por_lote):
+            hasta = min(desde + productos_por_lote, n_productos + 1)
+            productos, movimientos = [], []
+            resumen = defaultdict(lambda: [0, 0]) # (día, producto, tipo) -> [unidades, movimientos]
+            for producto_id in range(desde, hasta):
+                stock_minimo = rng.randint(0, 20)
+                n = max(1, round(movimientos_por_producto * rng.lognormvariate(0, _SIGMA_MOVIMIENTOS) / media_lognormal))
+                filas, stock = _movimientos_producto(
+                    rng, producto_id, stock_minimo, n, inicio, segundos, responsables, siguiente_movimiento_id
+                )
+                siguiente_movimiento_id += len(filas)
+                movimientos.extend(filas)
+                for fila in filas:
+                    acumulado = resumen[(fila["fecha"].date(), producto_id, fila["tipo_movimiento"])]
+                    acumulado[0] += fila["cantidad"]
+                    acumulado[1] += 1
+                productos.append({
+                    "id": producto_id,
+                    "name": f"{rng.choice(_SUSTANTIVOS)} {rng.choice(_ADJETIVOS)} {rng.randint(1, 999)}",
+                    "description": None,
+                    "price": round(rng.lognormvariate(3.5, 1.0), 2) + 0.99,
+                    "stock_actual": stock,
+                    "stock_minimo": stock_minimo,
+                    "codigo_sku": f"SKU-{producto_id:08d}",
+                    "numero_serie": None,
+                    "category_id": rng.choices(ids_categorias, cum_weights=pesos_categorias)[0],
+                    "proveedor_id": rng.choices(ids_proveedores, cum_weights=pesos_proveedores)[0],
+                })
+
+            with conn.begin():
+                _insertar_filas(conn, models.Product.__table__, productos, batch_size)
+                _insertar_filas(conn, models.MovimientoInventario.__table__, movimientos, batch_size)
+                _insertar_filas(conn, models.MovimientoDiario.__table__, [
+                    {"dia": dia, "producto_id": producto_id, "tipo_movimiento": tipo, "unidades": unidades, "movimientos": n}
+                    for (dia, producto_id, tipo), (unidades, n) in resumen.items()
+                ], batch_size)
+
+            total_movimientos += len(movimientos)
+            hechos = hasta - 1
+            transcurrido = time.perf_counter() - t0
+            restante = transcurrido / hechos * (n_productos - hechos)
+            print(f"  {hechos:,}/{n_productos:,} productos, {total_movimientos:,} movimientos "
+                  f"({total_movimientos / transcurrido:,.0f} mov/s, quedan ~{restante:,.0f} s)")
+
+        with conn.begin():
+            _ajustar_secuencias(conn, [
+                models.User.__table__, models.Category.__table__, models.Proveedor.__table__,
+                models.Product.__table__, models.MovimientoInventario.__table__,
+            ])
+
+    print(f"\n✅ Generados {n_productos:,} productos y {total_movimientos:,} movimientos "
+          f"en {time.perf_counter() - t0:,.1f} s (semilla {semilla}).")
+
+
+def _fecha(valor: str):
+    return datetime.strptime(valor, "%Y-%m-%d").date()
+
+
 if __name__ == "__main__":
-    print("Ejecutando script de siembra de datos avanzado, extenso e idempotente...")
-    seed_data()
-    print("Script de siembra avanzado, extenso e idempotente finalizado.")
\ No newline at end of file
+    parser = argparse.ArgumentParser(
+        description="Siembra la base de datos. Sin --products, crea el conjunto de datos de ejemplo; "
+                    "con --products, genera datos sintéticos a gran escala (borra los existentes)."
+    )
+    parser.add_argument("--products", type=int, help="Productos a generar (modo generador).")
+    parser.add_argument("--movements-per-product", type=int, default=20, help="Media de movimientos por producto.")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla: misma semilla y --end-date = mismos datos.")
+    parser.add_argument("--categories", type=int, default=50, help="Número de categorías.")
+    parser.add_argument("--suppliers", type=int, default=200, help="Número de proveedores.")
+    parser.add_argument("--users", type=int, default=20, help="Número de usuarios (responsables de los movimientos).")
+    parser.add_argument("--days", type=int, default=365, help="Días de historial de movimientos.")
+    parser.add_argument("--end-date", type=_fecha, help="Último día del historial YYYY-MM-DD (por defecto, hoy).")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Filas por lote de inserción.")
+    args = parser.parse_args()
+
+    if args.products is None:
+        print("Ejecutando script de siembra de datos avanzado, extenso e idempotente...")
+        seed_data()
+        print("Script de siembra avanzado, extenso e idempotente finalizado.")
+    else:
+        if min(args.products, args.movements_per_product, args.categories, args.suppliers, args.users, args.days, args.batch_size) < 1:
+            parser.error("Todos los valores numéricos deben ser mayores que cero.")
+        print(f"Generando {args.products:,} productos con ~{args.movements_per_product} movimientos cada uno (semilla {args.seed})...")
+        generar_datos_masivos(
+            args.products, args.movements_per_product, args.seed,
+            n_categorias=args.categories, n_proveedores=args.suppliers, n_usuarios=args.users,
+            dias=args.days, fecha_fin=args.end_date, batch_size=args.batch_size,
+        )
@@ -0,0 +1,58 @@
+# scl_backend_fastapi/snapshot_stock.py
+
+import sys
+import os
+import argparse
+from datetime import datetime, timedelta, timezone
+
+# --- Configuración de sys.path ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from app.crud.stock_snapshot_crud import generar_snapshots
+
+
+def _fecha(valor: str) -> datetime:
+    return datetime.strptime(valor, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+
+def _siguiente_corte(fecha: datetime, periodo: str) -> datetime:
+    if periodo == "diario":
+        return fecha + timedelta(days=1)
+    # mensual: primer día del mes siguiente
+    return (fecha.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def main() -> int:
+    hoy = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    parser = argparse.ArgumentParser(
+        description="Genera cierres de stock por producto (stock_snapshots) a las 00:00 UTC de la fecha indicada."
+    )
+    parser.add_argument("--fecha", type=_fecha, default=hoy,
+                        help="Fecha de corte YYYY-MM-DD (por defecto, hoy).")
+    parser.add_argument("--desde", type=_fecha, default=None,
+                        help="Genera también los cierres anteriores desde esta fecha (relleno histórico).")
+    parser.add_argument("--periodo", choices=["diario", "mensual"], default="diario",
+                        help="Periodicidad de los cierres al usar --desde.")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Productos por transacción.")
+    args = parser.parse_args()
+
+    cortes = []
+    corte = args.desde if args.desde else args.fecha
+    if args.desde and args.periodo == "mensual":
+        corte = corte.replace(day=1)
+    while corte < args.fecha:
+        cortes.append(corte)
+        corte = _siguiente_corte(corte, args.periodo)
+    cortes.append(args.fecha)
+
+    # En orden ascendente: cada cierre parte del anterior
+    for corte in cortes:
+        escritos = generar_snapshots(corte, chunk_size=args.chunk_size)
+        print(f"Cierre {corte.date().isoformat()}: {escritos} productos con movimientos.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# tests/conftest.py
+# Configuración común de los tests.
+#
+# Por defecto se usa una base de datos SQLite en un fichero temporal (no en memoria: los
+# tests de concurrencia abren varias conexiones). Con TEST_DATABASE_URL se puede usar otra,
+# por ejemplo PostgreSQL; debe ser una base de datos desechable, porque se crean y se
+# vacían todas las tablas. Las variables de entorno se fijan antes de importar 'app'.
+
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(TESTS_DIR)
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+_TMP_DIR = tempfile.mkdtemp(prefix="scl_tests_")
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}"
+os.environ.setdefault("JWT_SECRET_KEY", "clave-de-pruebas-" + "x" * 32)
+os.environ["DB_ASYNC_MODE"] = "false"
+# El inspector añade X-DB-Query-Count, que usan los tests de presupuesto de consultas
+os.environ["QUERY_INSPECTOR_ENABLED"] = "true"
+os.environ["QUERY_BUDGET"] = "0"
+# Los tests vacían las tablas directamente, sin pasar por los CRUD que invalidan la caché
+os.environ["CATALOG_CACHE_ENABLED"] = "false"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import models  # noqa: F401  (registra los modelos en Base.metadata)
+from app.db.database import Base, SessionLocal, engine, enable_sqlite_foreign_keys, get_async_database_url
+from app.main import app
+from app.security.principal_cache import principal_cache
+
+PASSWORD = "Password123!"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def _clean_tables():
+    yield
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(delete(table))
+    principal_cache.clear()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def run_with_async_session(fn):
+    """
+    Ejecuta fn(AsyncSession) en un event loop nuevo, con un motor asíncrono sobre la misma
+    base de datos: prueba app/crud/aio sin activar DB_ASYNC_MODE en la aplicación.
+    """
+    async def _run():
+        async_engine = create_async_engine(get_async_database_url(os.environ["DATABASE_URL"]))
+        enable_sqlite_foreign_keys(async_engine.sync_engine)
+        try:
+            async with async_sessionmaker(bind=async_engine, expire_on_commit=False)() as session:
+                return await fn(session)
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(_run())
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Uno para toda la sesión (no hace falta arrancar la aplicación en cada test)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    """
+    Registra un usuario nuevo y devuelve la cabecera Authorization con su token.
+    """
+    username = f"test_{uuid.uuid4().hex[:10]}"
+    response = client.post("/api/v1/auth/register", json={"username": username, "password": PASSWORD})
+    assert response.status_code == 201, response.text
+    response = client.post("/api/v1/auth/token", data={"username": username, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,36 @@
+# tests/test_auth.py
+# Registro y login: endpoints async, con bcrypt en el pool de contraseñas y la base de datos
+# en el threadpool.
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from conftest import PASSWORD
+
+
+def test_registro_login_y_duplicados(client):
+    usuario = {"username": "usuario_auth", "email": "usuario_auth@example.com", "password": PASSWORD}
+    response = client.post("/api/v1/auth/register", json=usuario)
+    assert response.status_code == 201, response.text
+    assert response.json()["username"] == "usuario_auth"
+
+    response = client.post("/api/v1/auth/register", json={**usuario, "email": "otro@example.com"})
+    assert response.status_code == 400, response.text
+
+    response = client.post("/api/v1/auth/token", data={"username": "usuario_auth", "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    response = client.post("/api/v1/auth/token", data={"username": "usuario_auth", "password": PASSWORD + "x"})
+    assert response.status_code == 401
+
+
+def test_registro_tras_reiniciar_la_aplicacion(client):
+    # El apagado de un TestClient cierra el pool de contraseñas; el siguiente arranque debe poder usarlo
+    with TestClient(app):
+        pass
+    with TestClient(app) as otro:
+        response = otro.post("/api/v1/auth/register", json={
+            "username": "usuario_reinicio", "email": "usuario_reinicio@example.com", "password": PASSWORD,
+        })
+        assert response.status_code == 201, response.text
+    response = client.post("/api/v1/auth/token", data={"username": "usuario_reinicio", "password": PASSWORD})
+    assert response.status_code == 200, response.text
@@ -0,0 +1,59 @@
+# tests/test_movimiento_rollup.py
+# Resumen diario (movimientos_diarios): cada movimiento se suma al día UTC de la fecha que
+# guardó la base de datos (la del RETURNING de su INSERT), también cerca de medianoche.
+
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import select
+
+from app.crud import movimiento_rollup_crud
+from app.db import models
+
+
+def test_filas_incremento_usa_el_dia_de_cada_fecha():
+    medianoche = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    movimientos = [
+        SimpleNamespace(producto_id=1, tipo_movimiento="entrada", cantidad=2, fecha=medianoche - timedelta(microseconds=1)),
+        SimpleNamespace(producto_id=1, tipo_movimiento="ENTRADA", cantidad=3, fecha=medianoche),
+        # SQLite devuelve la fecha sin zona horaria (en UTC); PostgreSQL, en la zona de la sesión
+        SimpleNamespace(producto_id=1, tipo_movimiento="ENTRADA", cantidad=4, fecha=medianoche.replace(tzinfo=None)),
+        SimpleNamespace(producto_id=1, tipo_movimiento="ENTRADA", cantidad=5,
+                        fecha=medianoche.astimezone(timezone(timedelta(hours=-5)))),
+    ]
+    assert movimiento_rollup_crud.filas_incremento(movimientos) == [
+        {"dia": date(2026, 2, 28), "producto_id": 1, "tipo_movimiento": "ENTRADA", "unidades": 2, "movimientos": 1},
+        {"dia": date(2026, 3, 1), "producto_id": 1, "tipo_movimiento": "ENTRADA", "unidades": 12, "movimientos": 3},
+    ]
+
+
+def test_el_resumen_coincide_con_los_movimientos(client, auth_headers, db):
+    response = client.post(
+        "/api/v1/products/", headers=auth_headers, json={"name": "Producto resumen", "price": 1.0, "stock_actual": 10},
+    )
+    assert response.status_code == 201, response.text
+    producto_id = response.json()["id"]
+    response = client.post(
+        "/api/v1/movimientos/", headers=auth_headers,
+        json={"producto_id": producto_id, "tipo_movimiento": "SALIDA", "cantidad": 3},
+    )
+    assert response.status_code == 201, response.text
+    response = client.post("/api/v1/movimientos/batch", headers=auth_headers, json={"movimientos": [
+        {"producto_id": producto_id, "tipo_movimiento": "ENTRADA", "cantidad": 2},
+        {"producto_id": producto_id, "tipo_movimiento": "SALIDA", "cantidad": 1},
+    ]})
+    assert response.status_code == 201, response.text
+
+    unidades, cuenta = Counter(), Counter()
+    for fecha, tipo, cantidad in db.execute(
+        select(models.MovimientoInventario.fecha, models.MovimientoInventario.tipo_movimiento, models.MovimientoInventario.cantidad)
+    ):
+        clave = (movimiento_rollup_crud.dia_utc(fecha), producto_id, tipo)
+        unidades[clave] += cantidad
+        cuenta[clave] += 1
+    resumen = models.MovimientoDiario
+    assert {
+        (fila.dia, fila.producto_id, fila.tipo_movimiento): (fila.unidades, fila.movimientos)
+        for fila in db.scalars(select(resumen))
+    } == {clave: (unidades[clave], cuenta[clave]) for clave in unidades}
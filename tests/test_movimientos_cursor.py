@@ -0,0 +1,81 @@
+# tests/test_movimientos_cursor.py
+# Paginación por cursor (fecha, id) del historial de movimientos de un producto.
+# Regresión: en SQLite la fecha guardada por CURRENT_TIMESTAMP no lleva microsegundos y el
+# cursor sí, así que la página siguiente volvía a incluir las filas ya devueltas.
+
+from sqlalchemy import select
+
+from app.crud.aio import movimiento_inventario_crud as aio_movimiento_inventario_crud
+from app.db import models
+from conftest import run_with_async_session
+
+MOVIMIENTOS = 7
+LIMIT = 3
+
+
+def _producto_con_movimientos(client, auth_headers, db) -> tuple:
+    response = client.post(
+        "/api/v1/products/", headers=auth_headers,
+        json={"name": "Producto historial", "price": 1.5, "codigo_sku": "SKU-HIST"},
+    )
+    assert response.status_code == 201, response.text
+    producto_id = response.json()["id"]
+    for _ in range(MOVIMIENTOS):
+        response = client.post(
+            "/api/v1/movimientos/", headers=auth_headers,
+            json={"producto_id": producto_id, "tipo_movimiento": "ENTRADA", "cantidad": 1},
+        )
+        assert response.status_code == 201, response.text
+    ids = db.scalars(
+        select(models.MovimientoInventario.id)
+        .where(models.MovimientoInventario.producto_id == producto_id)
+        .order_by(models.MovimientoInventario.fecha.desc(), models.MovimientoInventario.id.desc())
+    ).all()
+    return producto_id, list(ids)
+
+
+def _recorrer(pagina) -> list:
+    """
+    Recorre las páginas con pagina(cursor) -> (ids, next_cursor) hasta el final.
+    Falla si hay más páginas de las posibles (el cursor no avanza).
+    """
+    ids, cursor = pagina(None)
+    for _ in range(MOVIMIENTOS):
+        if cursor is None:
+            return ids
+        nuevos, cursor = pagina(cursor)
+        ids += nuevos
+    raise AssertionError(f"La paginación no termina: {len(ids)} elementos devueltos")
+
+
+def test_cursor_recorre_el_historial_hasta_el_final(client, auth_headers, db):
+    producto_id, esperados = _producto_con_movimientos(client, auth_headers, db)
+
+    def pagina(cursor, **params):
+        params = {"pagination": "cursor", "limit": LIMIT, **params}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(f"/api/v1/movimientos/producto/{producto_id}", params=params)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        return [item["id"] for item in body["items"]], body["next_cursor"]
+
+    assert _recorrer(pagina) == esperados
+    assert _recorrer(lambda cursor: pagina(cursor, fields="id,fecha")) == esperados
+
+
+def test_cursor_async_recorre_el_historial_hasta_el_final(client, auth_headers, db):
+    producto_id, esperados = _producto_con_movimientos(client, auth_headers, db)
+
+    async def recorrer(session):
+        ids, cursor = [], None
+        for _ in range(MOVIMIENTOS + 1):
+            movimientos, cursor = await aio_movimiento_inventario_crud.get_movimientos_por_producto_keyset(
+                session, producto_id, limit=LIMIT, cursor=cursor
+            )
+            ids += [movimiento.id for movimiento in movimientos]
+            if cursor is None:
+                return ids
+        raise AssertionError(f"La paginación no termina: {len(ids)} elementos devueltos")
+
+    assert run_with_async_session(recorrer) == esperados
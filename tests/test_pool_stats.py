@@ -0,0 +1,28 @@
+# tests/test_pool_stats.py
+# Estadísticas del pool de conexiones (/health/ready): solo las esperas agotadas cuentan
+# como timeouts, no los fallos al abrir la conexión.
+
+import sqlite3
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from app.db.pool_stats import timed_pool_class
+
+
+def test_solo_las_esperas_agotadas_cuentan_como_timeout():
+    pool = timed_pool_class(QueuePool)(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.01)
+    conexion = pool.connect()
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+    conexion.close()
+    assert (pool.wait_stats.total_checkouts, pool.wait_stats.timeouts) == (1, 1)
+
+    def conectar():
+        raise sqlite3.OperationalError("no se puede conectar")
+
+    fallido = timed_pool_class(QueuePool)(conectar, pool_size=1, max_overflow=0, timeout=0.01)
+    with pytest.raises(sqlite3.OperationalError):
+        fallido.connect()
+    assert fallido.wait_stats.timeouts == 0
@@ -0,0 +1,23 @@
+# tests/test_product_import.py
+# Importación masiva (POST /products/import): las filas inválidas se devuelven en 'errors'
+# sin detener la importación, aunque sus valores no tengan el tipo esperado.
+
+
+def test_importacion_con_filas_invalidas(client, auth_headers):
+    ndjson_data = (
+        '{"name": "Producto válido", "price": 1.0, "codigo_sku": "SKU-NDJ-1"}\n'
+        '{"name": "abc", "price": 1, "codigo_sku": 123}\n'
+        '{"name": "Sin precio", "codigo_sku": "SKU-NDJ-3"}\n'
+        '[1, 2]\n'
+        'no es json\n'
+    )
+    response = client.post(
+        "/api/v1/products/import", headers=auth_headers, params={"chunk_size": 1},
+        files={"file": ("productos.ndjson", ndjson_data, "application/x-ndjson")},
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["total_rows"], body["created"]) == (5, 1)
+    assert [(e["row"], e["codigo_sku"]) for e in body["errors"]] == [
+        (2, "123"), (3, "SKU-NDJ-3"), (4, None), (5, None),
+    ]
@@ -0,0 +1,70 @@
+# tests/test_query_budgets.py
+# Presupuesto de consultas de los listados (app/db/query_inspector.py): los productos se
+# listan con su categoría en una sola consulta (joinedload o JOIN de columnas). Si vuelve
+# una carga perezosa de la categoría (un N+1), estos tests fallan.
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import product_crud
+from app.db import models
+from app.db.query_inspector import assert_max_queries, assert_response_max_queries
+
+PRODUCTOS = 6
+
+
+@pytest.fixture
+def catalogo(client, auth_headers) -> list:
+    """Tres categorías y PRODUCTOS productos repartidos entre ellas; devuelve los ids de las categorías."""
+    categorias = []
+    for i in range(3):
+        response = client.post("/api/v1/categories/", headers=auth_headers, json={"name": f"Categoría {i}"})
+        assert response.status_code == 201, response.text
+        categorias.append(response.json()["id"])
+    for i in range(PRODUCTOS):
+        response = client.post(
+            "/api/v1/products/", headers=auth_headers,
+            json={"name": f"Producto {i}", "price": 1.0, "category_id": categorias[i % len(categorias)]},
+        )
+        assert response.status_code == 201, response.text
+    return categorias
+
+
+@pytest.mark.parametrize("fast", [True, False], ids=["filas", "orm"])
+@pytest.mark.parametrize("params", [{}, {"pagination": "cursor", "limit": 4}, {"fields": "id,name,category"}],
+                         ids=["offset", "cursor", "fields"])
+def test_listado_de_productos_en_una_consulta(client, catalogo, monkeypatch, fast, params):
+    monkeypatch.setattr(settings, "FAST_LIST_SERIALIZATION", fast)
+    response = client.get("/api/v1/products/", params=params)
+    assert response.status_code == 200, response.text
+    assert_response_max_queries(response, 1)
+    body = response.json()
+    items = body["items"] if isinstance(body, dict) else body
+    assert items and all(item["category"]["id"] in catalogo for item in items)
+
+
+def test_historial_de_movimientos_sin_n_mas_1(client, auth_headers, catalogo):
+    producto_id = client.get("/api/v1/products/").json()[0]["id"]
+    for _ in range(3):
+        response = client.post(
+            "/api/v1/movimientos/", headers=auth_headers,
+            json={"producto_id": producto_id, "tipo_movimiento": "ENTRADA", "cantidad": 1},
+        )
+        assert response.status_code == 201, response.text
+    for params in ({}, {"pagination": "cursor"}):
+        response = client.get(f"/api/v1/movimientos/producto/{producto_id}", params=params)
+        assert response.status_code == 200, response.text
+        assert_response_max_queries(response, 2) # Existencia del producto + historial
+
+
+def test_el_presupuesto_detecta_la_carga_perezosa(db: Session, catalogo):
+    with assert_max_queries(1):
+        productos = product_crud.get_products(db)
+        assert all(p.category is not None for p in productos)
+
+    db.expire_all()
+    with pytest.raises(AssertionError, match="como máximo 1 consultas"):
+        with assert_max_queries(1):
+            productos = db.query(models.Product).all() # Sin joinedload: una consulta por categoría
+            assert all(p.category is not None for p in productos)
@@ -0,0 +1,47 @@
+# tests/test_retencion_movimientos.py
+# Retención de movimientos (movimiento_particion_crud.archivar_movimientos): los anteriores
+# al corte se sustituyen por un saldo de apertura por producto, con cantidad positiva aunque
+# la suma archivada sea negativa, y el historial, el stock y la reconciliación siguen funcionando.
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.crud import movimiento_particion_crud, stock_reconciliation_crud
+from app.db import models
+
+
+def _producto_con_movimientos(client, auth_headers, nombre: str, movimientos: list) -> int:
+    response = client.post("/api/v1/products/", headers=auth_headers, json={"name": nombre, "price": 1.0})
+    assert response.status_code == 201, response.text
+    producto_id = response.json()["id"]
+    response = client.post("/api/v1/movimientos/batch", headers=auth_headers, json={"movimientos": [
+        {"producto_id": producto_id, "tipo_movimiento": tipo, "cantidad": cantidad} for tipo, cantidad in movimientos
+    ]})
+    assert response.status_code == 201, response.text
+    return producto_id
+
+
+def test_historial_tras_archivar(client, auth_headers, db, tmp_path):
+    # Sin la guarda (STOCK_NEGATIVE_GUARD, desactivada por defecto) el stock puede quedar en negativo
+    negativo = _producto_con_movimientos(client, auth_headers, "Producto negativo", [("ENTRADA", 2), ("SALIDA", 5)])
+    positivo = _producto_con_movimientos(client, auth_headers, "Producto positivo", [("ENTRADA", 4)])
+
+    corte = movimiento_particion_crud.inicio_mes(datetime.now(timezone.utc).date())
+    mes_anterior = datetime.combine(corte, datetime.min.time(), tzinfo=timezone.utc) - timedelta(days=10)
+    db.execute(update(models.MovimientoInventario).values(fecha=mes_anterior))
+    db.commit()
+
+    resultado = movimiento_particion_crud.archivar_movimientos(db, corte, str(tmp_path))
+    assert (resultado.movimientos, resultado.saldos) == (3, 2)
+
+    for producto_id, saldo, stock in ((negativo, ("SALDO_APERTURA_NEGATIVO", 3), -3), (positivo, ("SALDO_APERTURA", 4), 4)):
+        response = client.get(f"/api/v1/movimientos/producto/{producto_id}")
+        assert response.status_code == 200, response.text
+        assert [(m["tipo_movimiento"], m["cantidad"]) for m in response.json()] == [saldo]
+        response = client.get(f"/api/v1/products/{producto_id}/stock")
+        assert response.status_code == 200, response.text
+        assert response.json()["stock"] == stock
+
+    _, drifts = stock_reconciliation_crud.reconciliar_rango(db, 0, 10**9, completa=True, corregir=False)
+    assert drifts == []
@@ -0,0 +1,34 @@
+# tests/test_stock_as_of.py
+# Stock a una fecha: incluye el stock inicial (su movimiento AJUSTE_INICIAL) y la existencia
+# del producto se comprueba en la misma consulta (corte de la retención + stock).
+
+from app.db.query_inspector import assert_response_max_queries
+
+
+def test_stock_as_of_incluye_el_stock_inicial(client, auth_headers):
+    response = client.post(
+        "/api/v1/products/", headers=auth_headers,
+        json={"name": "Producto as_of", "price": 1.0, "stock_actual": 10, "codigo_sku": "SKU-ASOF"},
+    )
+    assert response.status_code == 201, response.text
+    producto_id = response.json()["id"]
+    response = client.post(
+        "/api/v1/movimientos/", headers=auth_headers,
+        json={"producto_id": producto_id, "tipo_movimiento": "SALIDA", "cantidad": 3},
+    )
+    assert response.status_code == 201, response.text
+
+    response = client.get(f"/api/v1/products/{producto_id}/stock")
+    assert response.status_code == 200, response.text
+    assert response.json()["stock"] == 7
+    assert_response_max_queries(response, 2)
+
+    response = client.get("/api/v1/products/stock")
+    assert response.status_code == 200, response.text
+    assert [(p["producto_id"], p["stock"]) for p in response.json()] == [(producto_id, 7)]
+
+
+def test_stock_as_of_de_un_producto_inexistente(client):
+    response = client.get("/api/v1/products/999999/stock")
+    assert response.status_code == 404
+    assert_response_max_queries(response, 2)
@@ -0,0 +1,142 @@
+# tests/test_stock_concurrency.py
+# Muchos hilos registran movimientos a la vez sobre el mismo producto, cada uno con su
+# sesión: el stock final debe ser la suma de los movimientos (ningún ajuste perdido) y,
+# con la guarda activa, nunca negativo. Protege el UPDATE ... RETURNING de
+# ajuste_producto_stmt y la variación por producto del lote (con sus bloqueos en orden de
+# id). Usa la base de datos de los tests (SQLite en fichero; PostgreSQL con TEST_DATABASE_URL).
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import func, select
+
+from app.crud import movimiento_inventario_crud, product_crud
+from app.db import models
+from app.db.database import SessionLocal
+from app.schemas import product_schemas
+from app.schemas.movimiento_inventario_schemas import MovimientoInventarioCreate
+
+HILOS = 8
+OPERACIONES_POR_HILO = 25
+
+
+def _crear_producto(db, stock: int) -> int:
+    return product_crud.create_product(
+        db, product_schemas.ProductCreate(name="Producto concurrencia", price=1.0, stock_actual=stock)
+    )["id"]
+
+
+def _en_paralelo(operacion) -> list:
+    """
+    Ejecuta operacion(db, hilo, i) OPERACIONES_POR_HILO veces en cada uno de HILOS hilos,
+    arrancados a la vez. Devuelve los resultados (o las excepciones) de todas las llamadas.
+    """
+    salida = threading.Barrier(HILOS)
+
+    def trabajador(hilo: int) -> list:
+        db = SessionLocal()
+        resultados = []
+        try:
+            salida.wait()
+            for i in range(OPERACIONES_POR_HILO):
+                try:
+                    resultados.append(operacion(db, hilo, i))
+                except (LookupError, ValueError) as e:
+                    resultados.append(e)
+        finally:
+            db.close()
+        return resultados
+
+    with ThreadPoolExecutor(max_workers=HILOS) as pool:
+        return [r for resultados in pool.map(trabajador, range(HILOS)) for r in resultados]
+
+
+def _stock_y_saldo(db, producto_id: int) -> tuple:
+    db.expire_all()
+    stock = db.scalar(select(models.Product.stock_actual).where(models.Product.id == producto_id))
+    saldo = db.scalar(
+        select(func.coalesce(func.sum(movimiento_inventario_crud.expresion_ajuste_stock()), 0))
+        .where(models.MovimientoInventario.producto_id == producto_id)
+    )
+    return stock, saldo
+
+
+def test_movimientos_concurrentes_no_pierden_ajustes(db):
+    producto_id = _crear_producto(db, stock=100)
+
+    def operacion(session, hilo, i):
+        if i % 5 == 4: # Uno de cada cinco, por el lote
+            return movimiento_inventario_crud.create_movimientos_batch(session, [
+                MovimientoInventarioCreate(producto_id=producto_id, tipo_movimiento="ENTRADA", cantidad=2),
+                MovimientoInventarioCreate(producto_id=producto_id, tipo_movimiento="SALIDA", cantidad=1),
+            ], responsable_id=None, guard_negative=False)
+        tipo = "ENTRADA" if (hilo + i) % 2 else "SALIDA"
+        return movimiento_inventario_crud.create_movimiento_inventario(
+            session, MovimientoInventarioCreate(producto_id=producto_id, tipo_movimiento=tipo, cantidad=3),
+            responsable_id=None, guard_negative=False,
+        )
+
+    resultados = _en_paralelo(operacion)
+    errores = [r for r in resultados if isinstance(r, Exception)]
+    assert errores == []
+
+    esperado = 100 + sum(
+        1 if i % 5 == 4 else (3 if (hilo + i) % 2 else -3)
+        for hilo in range(HILOS) for i in range(OPERACIONES_POR_HILO)
+    )
+    assert _stock_y_saldo(db, producto_id) == (esperado, esperado)
+
+
+def test_la_guarda_no_deja_stock_negativo_con_concurrencia(db):
+    stock_inicial = 60
+    producto_id = _crear_producto(db, stock=stock_inicial)
+
+    def operacion(session, hilo, i):
+        return movimiento_inventario_crud.create_movimiento_inventario(
+            session, MovimientoInventarioCreate(producto_id=producto_id, tipo_movimiento="SALIDA", cantidad=1),
+            responsable_id=None, guard_negative=True,
+        )
+
+    resultados = _en_paralelo(operacion)
+    rechazados = [r for r in resultados if isinstance(r, Exception)]
+    assert all(isinstance(r, ValueError) for r in rechazados)
+    assert len(resultados) - len(rechazados) == stock_inicial
+    assert _stock_y_saldo(db, producto_id) == (0, 0)
+
+
+def test_lotes_concurrentes_con_productos_en_comun(db):
+    # Cada lote toca los mismos productos en distinto orden: se bloquean por id, sin deadlocks
+    productos = [_crear_producto(db, stock=100) for _ in range(3)]
+
+    def operacion(session, hilo, i):
+        orden = productos if (hilo + i) % 2 else productos[::-1]
+        return movimiento_inventario_crud.create_movimientos_batch(session, [
+            MovimientoInventarioCreate(producto_id=producto_id, tipo_movimiento="ENTRADA", cantidad=k + 1)
+            for k, producto_id in enumerate(orden)
+        ], responsable_id=None, guard_negative=False)
+
+    resultados = _en_paralelo(operacion)
+    assert [r for r in resultados if isinstance(r, Exception)] == []
+    for producto_id in productos:
+        esperado = 100 + sum(
+            (productos if (hilo + i) % 2 else productos[::-1]).index(producto_id) + 1
+            for hilo in range(HILOS) for i in range(OPERACIONES_POR_HILO)
+        )
+        assert _stock_y_saldo(db, producto_id) == (esperado, esperado)
+
+
+def test_la_guarda_del_lote_se_aplica_al_stock_final(db):
+    producto_id = _crear_producto(db, stock=1)
+
+    def lote(*movimientos):
+        return movimiento_inventario_crud.create_movimientos_batch(db, [
+            MovimientoInventarioCreate(producto_id=producto_id, tipo_movimiento=tipo, cantidad=cantidad)
+            for tipo, cantidad in movimientos
+        ], responsable_id=None, guard_negative=True)
+
+    # La SALIDA deja el stock en -2 a mitad del lote, pero el resultado neto es 3
+    assert lote(("SALIDA", 3), ("ENTRADA", 5)).productos[0].stock_actual == 3
+    with pytest.raises(ValueError): # Stock final -1
+        lote(("ENTRADA", 1), ("SALIDA", 5))
+    assert _stock_y_saldo(db, producto_id) == (3, 3)
@@ -0,0 +1,94 @@
+# tests/test_stock_ledger.py
+# El stock de cada producto es la suma de sus movimientos: el alta con stock inicial, la
+# importación y la edición de stock_actual registran su movimiento y la reconciliación
+# no encuentra drift (ni --fix cambia nada).
+
+from sqlalchemy import select
+
+from app.crud import stock_reconciliation_crud
+from app.crud.aio import product_crud as aio_product_crud
+from app.db import models
+from app.schemas import product_schemas
+from conftest import run_with_async_session
+
+
+def _movimientos(db, producto_id: int) -> list:
+    db.expire_all()
+    return db.execute(
+        select(models.MovimientoInventario.tipo_movimiento, models.MovimientoInventario.cantidad)
+        .where(models.MovimientoInventario.producto_id == producto_id)
+        .order_by(models.MovimientoInventario.id)
+    ).all()
+
+
+def _sin_drift(db) -> None:
+    revisados, drifts = stock_reconciliation_crud.reconciliar_rango(db, 0, 10**9, completa=True, corregir=True)
+    assert revisados > 0
+    assert drifts == []
+
+
+def test_alta_y_edicion_de_stock_registran_movimientos(client, auth_headers, db):
+    response = client.post(
+        "/api/v1/products/", headers=auth_headers,
+        json={"name": "Producto ledger", "price": 2.0, "stock_actual": 10, "codigo_sku": "SKU-LEDGER"},
+    )
+    assert response.status_code == 201, response.text
+    producto_id = response.json()["id"]
+    assert _movimientos(db, producto_id) == [("AJUSTE_INICIAL", 10)]
+
+    for stock in (4, 4, 9):
+        response = client.put(f"/api/v1/products/{producto_id}", headers=auth_headers, json={"stock_actual": stock})
+        assert response.status_code == 200, response.text
+        assert response.json()["stock_actual"] == stock
+    assert _movimientos(db, producto_id) == [
+        ("AJUSTE_INICIAL", 10), ("AJUSTE_CONTEO_MENOS", 6), ("AJUSTE_CONTEO_MAS", 5),
+    ]
+    _sin_drift(db)
+
+    response = client.put("/api/v1/products/999999", headers=auth_headers, json={"stock_actual": 3})
+    assert response.status_code == 404
+
+
+def test_importacion_registra_movimientos(client, auth_headers, db):
+    response = client.post(
+        "/api/v1/products/", headers=auth_headers,
+        json={"name": "Producto existente", "price": 2.0, "stock_actual": 3, "codigo_sku": "SKU-IMP-1"},
+    )
+    assert response.status_code == 201, response.text
+    existente_id = response.json()["id"]
+
+    csv_data = (
+        "name,price,stock_actual,codigo_sku\n"
+        "Producto existente,2.0,8,SKU-IMP-1\n"
+        "Producto nuevo,1.0,5,SKU-IMP-2\n"
+        "Producto sin stock,1.0,0,SKU-IMP-3\n"
+    )
+    response = client.post(
+        "/api/v1/products/import", headers=auth_headers, params={"on_duplicate": "update"},
+        files={"file": ("productos.csv", csv_data, "text/csv")},
+    )
+    assert response.status_code == 200, response.text
+    assert (response.json()["created"], response.json()["updated"]) == (2, 1)
+
+    nuevo_id, sin_stock_id = db.scalars(
+        select(models.Product.id).where(models.Product.codigo_sku.in_(["SKU-IMP-2", "SKU-IMP-3"])).order_by(models.Product.codigo_sku)
+    ).all()
+    assert _movimientos(db, existente_id) == [("AJUSTE_INICIAL", 3), ("AJUSTE_CONTEO_MAS", 5)]
+    assert _movimientos(db, nuevo_id) == [("AJUSTE_INICIAL", 5)]
+    assert _movimientos(db, sin_stock_id) == []
+    _sin_drift(db)
+
+
+def test_alta_y_edicion_async_registran_movimientos(db):
+    async def alta_y_edicion(session):
+        creado = await aio_product_crud.create_product(
+            session, product_schemas.ProductCreate(name="Producto async", price=1.0, stock_actual=7)
+        )
+        await aio_product_crud.update_product(
+            session, creado["id"], product_schemas.ProductUpdate(stock_actual=2)
+        )
+        return creado["id"]
+
+    producto_id = run_with_async_session(alta_y_edicion)
+    assert _movimientos(db, producto_id) == [("AJUSTE_INICIAL", 7), ("AJUSTE_CONTEO_MENOS", 5)]
+    _sin_drift(db)
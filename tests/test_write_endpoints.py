@@ -0,0 +1,119 @@
+# tests/test_write_endpoints.py
+# Escrituras de productos, categorías y movimientos: presupuesto de consultas por petición
+# (cabecera X-DB-Query-Count del inspector, ver app/db/query_inspector.py) y traducción de
+# las violaciones de restricciones (app/crud/integrity.py) a 404 / 400.
+# Los presupuestos son los de las escrituras con RETURNING: si una vuelve a leer antes de
+# escribir (o después, para responder), el test falla.
+
+import pytest
+
+from app.core.config import settings
+from app.db.query_inspector import assert_response_max_queries
+
+
+@pytest.fixture
+def api(client, auth_headers):
+    """
+    call(method, url, status, max_queries, json=...) -> cuerpo de la respuesta.
+    Primero una petición autenticada, para que la consulta del usuario quede en la caché
+    de principales y no cuente en los presupuestos.
+    """
+    client.put("/api/v1/categories/999999", headers=auth_headers, json={"description": "-"})
+
+    def call(method: str, url: str, status: int, max_queries: int, **kwargs):
+        response = client.request(method, f"/api/v1{url}", headers=auth_headers, **kwargs)
+        assert response.status_code == status, response.text
+        assert_response_max_queries(response, max_queries)
+        return response.json()
+
+    return call
+
+
+def test_escrituras_de_categorias(api):
+    categoria = api("POST", "/categories/", 201, 1, json={"name": "Categoría A"})
+    api("POST", "/categories/", 201, 1, json={"name": "Categoría B"})
+    assert api("POST", "/categories/", 400, 1, json={"name": "Categoría A"})["detail"] == (
+        "Category with name 'Categoría A' already exists."
+    )
+
+    assert api("PUT", f"/categories/{categoria['id']}", 200, 1, json={"description": "d"})["description"] == "d"
+    api("PUT", f"/categories/{categoria['id']}", 400, 1, json={"name": "Categoría B"})
+    api("PUT", "/categories/999999", 404, 1, json={"description": "d"})
+
+    assert api("DELETE", f"/categories/{categoria['id']}", 200, 2)["id"] == categoria["id"]
+    api("DELETE", f"/categories/{categoria['id']}", 404, 2)
+
+
+def test_escrituras_de_productos(api):
+    categoria = api("POST", "/categories/", 201, 1, json={"name": "Categoría productos"})
+    datos = {"name": "Producto A", "price": 1.5, "codigo_sku": "SKU-A", "numero_serie": "NS-A"}
+    # INSERT del producto, movimiento AJUSTE_INICIAL, resumen diario y categoría
+    producto = api("POST", "/products/", 201, 4, json={**datos, "category_id": categoria["id"], "stock_actual": 5})
+    assert producto["category"]["id"] == categoria["id"]
+    otro = api("POST", "/products/", 201, 1, json={"name": "Producto B", "price": 1.0, "codigo_sku": "SKU-B"})
+
+    assert api("POST", "/products/", 400, 1, json={**datos, "numero_serie": None})["detail"] == (
+        "Product with SKU 'SKU-A' already exists."
+    )
+    assert api("POST", "/products/", 400, 1, json={**datos, "codigo_sku": None})["detail"] == (
+        "Product with serial number 'NS-A' already exists."
+    )
+    assert api("POST", "/products/", 404, 1, json={"name": "Producto C", "price": 1.0, "category_id": 999999})["detail"] == (
+        "Category with ID 999999 not found. Cannot create product."
+    )
+
+    producto_id = producto["id"]
+    assert api("PUT", f"/products/{producto_id}", 200, 2, json={"price": 2.5})["price"] == 2.5
+    # Movimiento de ajuste, resumen diario, UPDATE y categoría
+    assert api("PUT", f"/products/{producto_id}", 200, 4, json={"stock_actual": 9})["stock_actual"] == 9
+    assert api("PUT", f"/products/{producto_id}", 400, 1, json={"codigo_sku": otro["codigo_sku"]})["detail"] == (
+        "Another product with SKU 'SKU-B' already exists."
+    )
+    api("PUT", f"/products/{producto_id}", 404, 1, json={"category_id": 999999})
+    api("PUT", "/products/999999", 404, 1, json={"price": 2.5})
+
+    assert api("DELETE", f"/products/{producto_id}", 200, 3)["id"] == producto_id
+    api("DELETE", f"/products/{producto_id}", 404, 1)
+
+
+def test_escrituras_de_movimientos(api):
+    producto = api("POST", "/products/", 201, 1, json={"name": "Producto movimientos", "price": 1.0})
+    producto_id = producto["id"]
+
+    # UPDATE ... RETURNING del stock, INSERT ... RETURNING del movimiento y resumen diario
+    movimiento = api("POST", "/movimientos/", 201, 3, json={"producto_id": producto_id, "tipo_movimiento": "ENTRADA", "cantidad": 4})
+    assert movimiento["producto"]["id"] == producto_id
+    api("POST", "/movimientos/", 404, 2, json={"producto_id": 999999, "tipo_movimiento": "ENTRADA", "cantidad": 1})
+
+    lote = api("POST", "/movimientos/batch", 201, 4, json={"movimientos": [
+        {"producto_id": producto_id, "tipo_movimiento": "ENTRADA", "cantidad": 2},
+        {"producto_id": producto_id, "tipo_movimiento": "SALIDA", "cantidad": 5},
+    ]})
+    assert lote["productos"] == [{"producto_id": producto_id, "delta": -3, "stock_actual": 1}]
+    api("POST", "/movimientos/batch", 404, 1, json={"movimientos": [
+        {"producto_id": 999999, "tipo_movimiento": "ENTRADA", "cantidad": 1},
+    ]})
+
+
+@pytest.mark.parametrize("tipo", ["SALDO_APERTURA", "saldo_apertura_negativo"])
+def test_tipos_internos_no_se_aceptan(api, tipo):
+    producto_id = api("POST", "/products/", 201, 1, json={"name": "Producto tipos internos", "price": 1.0})["id"]
+    movimiento = {"producto_id": producto_id, "tipo_movimiento": tipo, "cantidad": 5}
+    api("POST", "/movimientos/", 422, 0, json=movimiento)
+    api("POST", "/movimientos/batch", 422, 0, json={"movimientos": [
+        {"producto_id": producto_id, "tipo_movimiento": "ENTRADA", "cantidad": 1}, movimiento,
+    ]})
+
+
+def test_ajuste_inicial_se_sigue_aceptando(api):
+    producto_id = api("POST", "/products/", 201, 1, json={"name": "Producto ajuste inicial", "price": 1.0})["id"]
+    movimiento = api("POST", "/movimientos/", 201, 3, json={"producto_id": producto_id, "tipo_movimiento": "AJUSTE_INICIAL", "cantidad": 5})
+    assert movimiento["tipo_movimiento"] == "AJUSTE_INICIAL"
+
+
+def test_stock_insuficiente_es_400_en_alta_y_lote(api, monkeypatch):
+    monkeypatch.setattr(settings, "STOCK_NEGATIVE_GUARD", True)
+    producto_id = api("POST", "/products/", 201, 4, json={"name": "Producto guarda", "price": 1.0, "stock_actual": 2})["id"]
+    salida = {"producto_id": producto_id, "tipo_movimiento": "SALIDA", "cantidad": 3}
+    assert "Stock insuficiente" in api("POST", "/movimientos/", 400, 2, json=salida)["detail"]
+    assert "Stock insuficiente" in api("POST", "/movimientos/batch", 400, 2, json={"movimientos": [salida]})["detail"]